@@ -1,6 +1,10 @@
 import logging
 import os
+import queue
+import threading
+import numpy as np
 import cupy
+from multiprocessing.pool import ThreadPool
 from chainer import cuda
 from chainer import using_config, Variable
 from chainer.function import no_backprop_mode
@@ -30,13 +34,24 @@ class Predictor(object):
         Base model.
     transform : callable, optional
         A function that transforms the image.
+    num_workers : int, default 0
+        Number of threads for transforming images into a preallocated batch array (0 for stacking of images transformed
+        on the calling thread).
+    num_prefetch : int, default 1
+        Number of batches preprocessed ahead of the model forward in `iterate`.
     """
     def __init__(self,
                  model,
-                 transform=None):
+                 transform=None,
+                 num_workers=0,
+                 num_prefetch=1):
         super(Predictor, self).__init__()
         self.model = model
         self.transform = transform
+        self.pool = ThreadPool(num_workers) if num_workers > 0 else None
+        self.num_prefetch = max(num_prefetch, 1)
+        self.buffers = []
+        self.buffers_lock = threading.Lock()
 
     def do_transform(self, img):
         if self.transform is not None:
@@ -44,8 +59,58 @@ class Predictor(object):
         else:
             return img
 
-    def __call__(self, imgs):
-        imgs = self.model.xp.asarray([self.do_transform(img) for img in imgs])
+    def get_buffer(self, shape, dtype):
+        """
+        Get a free batch array of the given shape (new one if there isn't any).
+        """
+        with self.buffers_lock:
+            for i, buffer in enumerate(self.buffers):
+                if (buffer.shape == shape) and (buffer.dtype == dtype):
+                    return self.buffers.pop(i)
+        return np.empty(shape, dtype=dtype)
+
+    def release_buffer(self, buffer):
+        """
+        Return a batch array for reuse (only a few last ones are kept, as input shapes can vary).
+        """
+        with self.buffers_lock:
+            self.buffers.append(buffer)
+            if len(self.buffers) > self.num_prefetch + 1:
+                self.buffers.pop(0)
+
+    def preprocess(self, imgs):
+        """
+        Transform images into a preallocated batch array (on the worker pool if any).
+
+        Parameters
+        ----------
+        imgs : list of np.array
+            Images.
+
+        Returns
+        -------
+        np.array
+            Batch array (to be returned via `release_buffer` after usage).
+        """
+        first = np.asarray(self.do_transform(imgs[0]))
+        batch = self.get_buffer((len(imgs),) + first.shape, first.dtype)
+        batch[0] = first
+
+        def fill(i):
+            batch[i] = self.do_transform(imgs[i])
+
+        if self.pool is not None:
+            self.pool.map(fill, range(1, len(imgs)))
+        else:
+            for i in range(1, len(imgs)):
+                fill(i)
+        return batch
+
+    def forward(self, imgs):
+        """
+        Calculate model predictions for a batch array.
+        """
+        imgs = self.model.xp.asarray(imgs)
 
         with using_config("train", False), no_backprop_mode():
             imgs = Variable(imgs)
@@ -54,6 +119,81 @@ class Predictor(object):
         output = to_cpu(predictions.array if hasattr(predictions, "array") else cupy.asnumpy(predictions))
         return output
 
+    def __call__(self, imgs):
+        if self.pool is None:
+            return self.forward(self.model.xp.asarray([self.do_transform(img) for img in imgs]))
+        batch = self.preprocess(imgs)
+        try:
+            return self.forward(batch)
+        finally:
+            self.release_buffer(batch)
+
+    def iterate(self,
+                iterator,
+                hook=None):
+        """
+        Streaming prediction over a batch iterator. Fetching and preprocessing of next batches (up to `num_prefetch`)
+        run on a background thread while the model processes the current one.
+
+        Parameters
+        ----------
+        iterator : Iterator
+            Non-repeating iterator over batches of `(img, ...)` tuples.
+        hook : callable, optional
+            A function called as `hook(in_values, out_values, rest_values)` after each batch (as in
+            `chainercv.utils.apply_to_iterator`).
+
+        Yields
+        ------
+        np.array
+            Predictions for a batch.
+        tuple of lists
+            The rest values (e.g. labels) for the batch.
+        """
+        batch_queue = queue.Queue(maxsize=self.num_prefetch)
+        stop_event = threading.Event()
+
+        def put(item):
+            while not stop_event.is_set():
+                try:
+                    batch_queue.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    pass
+
+        def produce():
+            try:
+                for batch in iterator:
+                    if stop_event.is_set():
+                        break
+                    values = tuple(list(v) for v in zip(*batch)) if isinstance(batch[0], tuple) else (list(batch),)
+                    put((values[0], self.preprocess(values[0]), values[1:]))
+            except Exception as e:
+                put(e)
+            finally:
+                put(None)
+
+        producer = threading.Thread(target=produce, daemon=True)
+        producer.start()
+        try:
+            while True:
+                item = batch_queue.get()
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                imgs, batch, rest_values = item
+                try:
+                    predictions = self.forward(batch)
+                finally:
+                    self.release_buffer(batch)
+                if hook is not None:
+                    hook((imgs,), (list(predictions),), rest_values)
+                yield predictions, rest_values
+        finally:
+            stop_event.set()
+            producer.join()
+
 
 def prepare_model(model_name,
                   use_pretrained,
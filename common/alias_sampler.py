@@ -0,0 +1,184 @@
+"""
+    Framework-agnostic weighted random sampling (with replacement) by the alias method.
+"""
+
+__all__ = ['AliasSampler']
+
+import weakref
+import threading
+import numpy as np
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+
+class AliasSampler(object):
+    """
+    Weighted random sampler of indices from [0, length) with replacement, based on Vose's alias method: O(n) table
+    setup and O(1) per draw. Draws are vectorized by numpy. Index streams for the next epochs can be precomputed in a
+    background thread, which is stopped by `close` or when the sampler is deleted.
+
+    Parameters:
+    ----------
+    weights : np.array of float
+        Weights of samples (not necessarily normalized).
+    num_samples : int or None, default None
+        Number of samples drawn per epoch (the number of weights if None).
+    prefetch_epochs : int, default 0
+        Number of epochs for which index streams are precomputed in a background thread (0 means drawing on demand).
+    seed : int or None, default None
+        Seed for the internal random generator (drawn from the global numpy generator if None).
+    """
+    def __init__(self,
+                 weights,
+                 num_samples=None,
+                 prefetch_epochs=0,
+                 seed=None):
+        weights = np.asarray(weights, dtype=np.float64)
+        assert (weights.ndim == 1) and (weights.size > 0)
+        assert (weights.min() >= 0.0) and (weights.sum() > 0.0)
+        assert (prefetch_epochs >= 0)
+        self.num_samples = num_samples if num_samples is not None else weights.size
+        self.prob, self.alias = self._create_alias_table(weights)
+        self.rng = np.random.RandomState(seed if seed is not None else np.random.randint(np.iinfo(np.int32).max))
+
+        self.prefetch_epochs = prefetch_epochs
+        if self.prefetch_epochs > 0:
+            self._queue = queue.Queue(maxsize=prefetch_epochs)
+            self._stop_event = threading.Event()
+            # The thread holds a weak reference only, so the sampler can be garbage collected:
+            self._thread = threading.Thread(
+                target=AliasSampler._prefetch_worker,
+                args=(weakref.ref(self), self._queue, self._stop_event))
+            self._thread.daemon = True
+            self._thread.start()
+
+    @staticmethod
+    def _create_alias_table(weights):
+        """
+        Create alias table by Vose's method.
+
+        Parameters:
+        ----------
+        weights : np.array of float
+            Weights of samples.
+
+        Returns
+        -------
+        np.array of float
+            Probabilities of keeping the drawn bucket.
+        np.array of int
+            Alias indices.
+        """
+        length = weights.size
+        scaled = weights * (length / weights.sum())
+        prob = np.ones((length,), dtype=np.float64)
+        alias = np.arange(length, dtype=np.int64)
+        small = list(np.nonzero(scaled < 1.0)[0])
+        large = list(np.nonzero(scaled >= 1.0)[0])
+        while small and large:
+            small_ind = small.pop()
+            large_ind = large[-1]
+            prob[small_ind] = scaled[small_ind]
+            alias[small_ind] = large_ind
+            scaled[large_ind] -= (1.0 - scaled[small_ind])
+            if scaled[large_ind] < 1.0:
+                small.append(large.pop())
+        return prob, alias
+
+    def sample(self, size):
+        """
+        Draw indices.
+
+        Parameters:
+        ----------
+        size : int
+            Number of indices.
+
+        Returns
+        -------
+        np.array of int
+            Sampled indices.
+        """
+        buckets = self.rng.randint(self.prob.size, size=size)
+        keep = self.rng.random_sample(size) < self.prob[buckets]
+        return np.where(keep, buckets, self.alias[buckets])
+
+    @staticmethod
+    def _prefetch_worker(sampler_ref, index_queue, stop_event):
+        while not stop_event.is_set():
+            sampler = sampler_ref()
+            if sampler is None:
+                return
+            indices = sampler.sample(sampler.num_samples)
+            del sampler
+            while not stop_event.is_set():
+                try:
+                    index_queue.put(indices, timeout=0.1)
+                    break
+                except queue.Full:
+                    pass
+
+    def close(self):
+        """
+        Stop the prefetching thread.
+        """
+        if self.prefetch_epochs > 0:
+            self._stop_event.set()
+            if self._thread is not threading.current_thread():
+                self._thread.join()
+
+    def __del__(self):
+        if getattr(self, "prefetch_epochs", 0) > 0:
+            self._stop_event.set()
+
+    def next_epoch(self):
+        """
+        Get index stream for the next epoch.
+
+        Returns
+        -------
+        np.array of int
+            Sampled indices.
+        """
+        if self.prefetch_epochs > 0:
+            assert not self._stop_event.is_set()
+            return self._queue.get()
+        else:
+            return self.sample(self.num_samples)
+
+    def __iter__(self):
+        return iter(self.next_epoch().tolist())
+
+    def __len__(self):
+        return self.num_samples
+
+
+def _test():
+    weights = np.array([0.1, 0.0, 0.5, 0.2, 0.2])
+    for prefetch_epochs in [0, 2]:
+        sampler = AliasSampler(
+            weights=weights,
+            num_samples=200000,
+            prefetch_epochs=prefetch_epochs,
+            seed=1)
+        for _ in range(3):
+            indices = np.array(list(sampler))
+            assert (len(indices) == len(sampler))
+            freqs = np.bincount(indices, minlength=weights.size) / float(len(indices))
+            assert (np.abs(freqs - weights).max() < 0.01)
+        if prefetch_epochs > 0:
+            thread = sampler._thread
+            del sampler
+            thread.join(timeout=5.0)
+            assert not thread.is_alive()
+
+    sampler = AliasSampler(weights=weights, prefetch_epochs=2)
+    sampler.close()
+    assert not sampler._thread.is_alive()
+    print("ok")
+
+
+if __name__ == "__main__":
+    _test()
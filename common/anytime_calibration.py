@@ -0,0 +1,132 @@
+"""
+    Framework-agnostic calibration of confidence thresholds for anytime (early-exit) inference.
+"""
+
+__all__ = ['simulate_early_exit', 'calc_exit_thresholds', 'calibrate_exit_thresholds']
+
+import numpy as np
+
+
+def simulate_early_exit(confidences,
+                        thresholds):
+    """
+    Calculate exit classifier indices for samples with the given thresholds.
+
+    Parameters:
+    ----------
+    confidences : np.array of float
+        Maximal softmax probabilities of all classifiers for all samples (shape is (num_samples, num_exits)).
+    thresholds : np.array of float
+        Confidence thresholds for all classifiers but the last one.
+
+    Returns
+    -------
+    np.array of int
+        Exit classifier index for each sample.
+    """
+    num_exits = confidences.shape[1]
+    done = (confidences[:, :-1] >= np.asarray(thresholds)[np.newaxis, :num_exits - 1])
+    done = np.concatenate((done, np.ones((confidences.shape[0], 1), dtype=np.bool_)), axis=1)
+    return np.argmax(done, axis=1)
+
+
+def calc_exit_thresholds(confidences,
+                         exit_fractions):
+    """
+    Calculate confidence thresholds that provide the given fractions of samples exiting at each classifier.
+
+    Parameters:
+    ----------
+    confidences : np.array of float
+        Maximal softmax probabilities of all classifiers for all samples (shape is (num_samples, num_exits)).
+    exit_fractions : np.array of float
+        Target fractions of samples exiting at each classifier (sum is 1).
+
+    Returns
+    -------
+    np.array of float
+        Confidence thresholds for all classifiers but the last one.
+    """
+    num_samples, num_exits = confidences.shape
+    thresholds = np.full((num_exits - 1,), np.inf)
+    remaining = np.ones((num_samples,), dtype=np.bool_)
+    for i in range(num_exits - 1):
+        num_exited = min(int(round(exit_fractions[i] * num_samples)), int(remaining.sum()))
+        if num_exited == 0:
+            continue
+        conf_i = np.sort(confidences[remaining, i])[::-1]
+        thresholds[i] = conf_i[num_exited - 1]
+        remaining &= (confidences[:, i] < thresholds[i])
+    return thresholds
+
+
+def calibrate_exit_thresholds(confidences,
+                              exit_flops,
+                              target_flops,
+                              num_iters=50):
+    """
+    Calibrate confidence thresholds on validation data for a target average computational cost. Exit fractions follow
+    the geometric distribution from the MSDNet paper (fraction at the k-th classifier is proportional to `q^k`), and
+    `q` is found by the bisection on the simulated average cost.
+
+    Parameters:
+    ----------
+    confidences : np.array of float
+        Maximal softmax probabilities of all classifiers for all samples (shape is (num_samples, num_exits)).
+    exit_flops : np.array of float
+        Cumulative computational cost of a sample exiting at each classifier.
+    target_flops : float
+        Target average computational cost per sample.
+    num_iters : int, default 50
+        Number of bisection iterations.
+
+    Returns
+    -------
+    np.array of float
+        Confidence thresholds for all classifiers but the last one.
+    float
+        Simulated average computational cost per sample.
+    """
+    exit_flops = np.asarray(exit_flops, dtype=np.float64)
+    num_exits = confidences.shape[1]
+    assert (exit_flops.shape == (num_exits,))
+    powers = np.arange(num_exits, dtype=np.float64)
+
+    def thresholds_for(log_q):
+        exit_fractions = np.exp(log_q * powers - np.max(log_q * powers))
+        exit_fractions /= exit_fractions.sum()
+        thresholds = calc_exit_thresholds(confidences, exit_fractions)
+        avg_flops = exit_flops[simulate_early_exit(confidences, thresholds)].mean()
+        return thresholds, avg_flops
+
+    low, high = -20.0, 20.0
+    best = thresholds_for(low)
+    for _ in range(num_iters):
+        middle = 0.5 * (low + high)
+        thresholds, avg_flops = thresholds_for(middle)
+        if avg_flops <= target_flops:
+            best = (thresholds, avg_flops)
+            low = middle
+        else:
+            high = middle
+    return best
+
+
+def _test():
+    rng = np.random.RandomState(0)
+    num_samples, num_exits = 10000, 5
+    confidences = np.sort(rng.rand(num_samples, num_exits), axis=1)
+    exit_flops = np.cumsum(np.full((num_exits,), 100.0))
+
+    thresholds = calc_exit_thresholds(confidences, np.full((num_exits,), 1.0 / num_exits))
+    exit_counts = np.bincount(simulate_early_exit(confidences, thresholds), minlength=num_exits)
+    assert (np.abs(exit_counts - num_samples / num_exits).max() <= 1)
+
+    for target_flops in [150.0, 300.0, 450.0]:
+        thresholds, avg_flops = calibrate_exit_thresholds(confidences, exit_flops, target_flops)
+        assert (target_flops - 5.0 <= avg_flops <= target_flops)
+    print("ok")
+
+
+if __name__ == "__main__":
+    _test()
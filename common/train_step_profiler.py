@@ -0,0 +1,218 @@
+"""
+    Step-level training profiler with data-stall detection.
+"""
+
+__all__ = ['TrainStepProfiler']
+
+import time
+import logging
+from collections import deque, OrderedDict
+import numpy as np
+
+
+class TrainStepProfiler(object):
+    """
+    Step-level training profiler. It splits each training step into phases (data wait, host-to-device copy, forward,
+    backward, optimizer step, metric update), keeps the last durations of each phase in a rolling window and reports
+    percentiles for them. An alert is raised when the data loader becomes the bottleneck.
+
+    Usage inside a training loop:
+
+        for i, batch in enumerate(profiler.wrap(train_data)):
+            ...                         # copy to device
+            profiler.mark("h2d")
+            ...                         # forward pass
+            profiler.mark("forward")
+            ...
+
+    The time spent in `next()` of the wrapped iterator is recorded as the `data` phase. A step is closed when the
+    next batch is requested (or when the iterator is exhausted). If the profiler is disabled, `wrap` returns the
+    source iterable as is and `mark` does nothing, so the loop runs without overhead.
+
+    Parameters:
+    ----------
+    enabled : bool, default True
+        Whether the profiler is active.
+    window_size : int, default 200
+        Number of the last steps used for percentile calculation.
+    percentiles : tuple of int, default (50, 90, 99)
+        Percentiles to report.
+    sync_fn : func or None, default None
+        Device synchronization function (e.g. `torch.cuda.synchronize` or `mx.nd.waitall`) called before each mark.
+        Without it asynchronous device work is attributed to the phase where it is awaited.
+    stall_ratio : float, default 0.3
+        Share of the median step time spent waiting for data that is treated as a data stall.
+    step_callbacks : list of func or None, default None
+        Functions called without arguments at the end of each step (e.g. `torch.profiler.profile.step`).
+    """
+    phase_names = ("data", "h2d", "forward", "backward", "optimizer", "metric")
+
+    def __init__(self,
+                 enabled=True,
+                 window_size=200,
+                 percentiles=(50, 90, 99),
+                 sync_fn=None,
+                 stall_ratio=0.3,
+                 step_callbacks=None):
+        assert (window_size > 0)
+        assert (0.0 < stall_ratio < 1.0)
+        self.enabled = enabled
+        self.window_size = window_size
+        self.percentiles = percentiles
+        self.sync_fn = sync_fn
+        self.stall_ratio = stall_ratio
+        self.step_callbacks = step_callbacks if step_callbacks is not None else []
+
+        self.phase_times = OrderedDict([(name, deque(maxlen=window_size)) for name in self.phase_names])
+        self.step_times = deque(maxlen=window_size)
+        self.step_count = 0
+        self.stall_alert_count = 0
+
+        self._step_tic = None
+        self._mark_tic = None
+        self._step_phase_times = None
+
+    def reset(self):
+        """
+        Clear all collected statistics.
+        """
+        for times in self.phase_times.values():
+            times.clear()
+        self.step_times.clear()
+        self.step_count = 0
+        self.stall_alert_count = 0
+        self._step_tic = None
+
+    def wrap(self, data_source):
+        """
+        Wrap data source for measuring of data waiting time.
+
+        Parameters:
+        ----------
+        data_source : iterable
+            Data loader or other batch iterable.
+
+        Returns
+        -------
+        iterable
+            Wrapped data source.
+        """
+        if not self.enabled:
+            return data_source
+        return self._iterate(data_source)
+
+    def _iterate(self, data_source):
+        data_iter = iter(data_source)
+        while True:
+            if self._step_tic is not None:
+                self._end_step()
+            tic = time.time()
+            try:
+                batch = next(data_iter)
+            except StopIteration:
+                return
+            self._step_tic = tic
+            self._mark_tic = time.time()
+            self._step_phase_times = {"data": self._mark_tic - tic}
+            yield batch
+
+    def mark(self, phase):
+        """
+        Finish the current phase of the step.
+
+        Parameters:
+        ----------
+        phase : str
+            Phase name (one of `phase_names`).
+        """
+        if (not self.enabled) or (self._step_tic is None):
+            return
+        if self.sync_fn is not None:
+            self.sync_fn()
+        toc = time.time()
+        self._step_phase_times[phase] = self._step_phase_times.get(phase, 0.0) + (toc - self._mark_tic)
+        self._mark_tic = toc
+
+    def _end_step(self):
+        for name, value in self._step_phase_times.items():
+            self.phase_times[name].append(value)
+        self.step_times.append(time.time() - self._step_tic)
+        self.step_count += 1
+        self._step_tic = None
+        for callback in self.step_callbacks:
+            callback()
+
+    def is_data_stalled(self):
+        """
+        Check whether the data loader is the bottleneck on the current window.
+
+        Returns
+        -------
+        bool
+            Whether the data waiting time exceeds the stall ratio of the step time.
+        """
+        if len(self.step_times) == 0:
+            return False
+        data_time = np.median(self.phase_times["data"])
+        step_time = np.median(self.step_times)
+        return (step_time > 0.0) and (data_time / step_time > self.stall_ratio)
+
+    def report(self):
+        """
+        Make report string with phase time percentiles (in milliseconds) and check data stall.
+
+        Returns
+        -------
+        str
+            Report string.
+        """
+        if (not self.enabled) or (len(self.step_times) == 0):
+            return ""
+        step_time_median = np.median(self.step_times)
+        items = []
+        for name, times in list(self.phase_times.items()) + [("step", self.step_times)]:
+            if len(times) == 0:
+                continue
+            values = np.percentile(np.array(times), self.percentiles) * 1000.0
+            share = np.median(times) / step_time_median if step_time_median > 0.0 else 0.0
+            items.append("{}: {} ms ({:.0%})".format(
+                name, "/".join(["{:.1f}".format(v) for v in values]), share))
+        msg = "Step profile (p{}, last {} steps): {}".format(
+            "/p".join([str(p) for p in self.percentiles]), len(self.step_times), ", ".join(items))
+
+        if self.is_data_stalled():
+            self.stall_alert_count += 1
+            logging.warning("Data loader is the bottleneck: {:.0%} of step time is spent waiting for data. Consider "
+                            "increasing the number of data workers or simplifying the input pipeline.".format(
+                                np.median(self.phase_times["data"]) / step_time_median))
+        return msg
+
+
+def _test():
+    profiler = TrainStepProfiler(window_size=10, percentiles=(50, 90))
+
+    def slow_loader():
+        for i in range(20):
+            time.sleep(0.004)
+            yield i
+
+    for _ in profiler.wrap(slow_loader()):
+        time.sleep(0.001)
+        profiler.mark("forward")
+        profiler.mark("backward")
+    assert (profiler.step_count == 20)
+    assert (len(profiler.step_times) == 10)
+    assert profiler.is_data_stalled()
+    msg = profiler.report()
+    print(msg)
+    assert (profiler.stall_alert_count == 1)
+
+    disabled = TrainStepProfiler(enabled=False)
+    data = [1, 2, 3]
+    assert (disabled.wrap(data) is data)
+    disabled.mark("forward")
+    assert (disabled.report() == "")
+
+
+if __name__ == "__main__":
+    _test()
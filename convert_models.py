@@ -2,9 +2,12 @@
     Script for converting models between frameworks (MXNet, Gluon, PyTroch, Chainer, Keras, TensorFlow).
 """
 
+import os
+import re
+import json
+import hashlib
 import argparse
 import logging
-import re
 import numpy as np
 from common.logger_utils import initialize_logging
 
@@ -68,6 +71,17 @@ def parse_args():
         default=3,
         help='number of input channels for destination model')
 
+    parser.add_argument(
+        '--streaming',
+        action='store_true',
+        help='convert parameters tensor by tensor without instantiating of models with weights (Gluon/PyTorch to '
+             'PyTorch only)')
+    parser.add_argument(
+        '--key-map-cache-dir',
+        type=str,
+        default=os.path.join('~', '.imgclsmob', 'key_maps'),
+        help='directory for cached parameter key mappings (empty for disabling the cache)')
+
     parser.add_argument(
         '--save-dir',
         type=str,
@@ -82,6 +96,75 @@ def parse_args():
     return args
 
 
+def filter_gl_src_param_keys(src_model,
+                             src_param_keys):
+    """
+    Remove Gluon source parameter keys, which are absent in destination models.
+
+    Parameters
+    ----------
+    src_model : str
+        Source model name.
+    src_param_keys : list of str
+        Source parameter keys.
+
+    Returns
+    -------
+    list of str
+        Filtered keys.
+    """
+    if src_model in ["oth_resnet50_v1", "oth_resnet101_v1", "oth_resnet152_v1", "oth_resnet50_v1b",
+                     "oth_resnet101_v1b", "oth_resnet152_v1b"]:
+        src_param_keys = [key for key in src_param_keys if
+                          not (key.startswith("features.") and key.endswith(".bias"))]
+
+    if src_model.startswith("wrn20_10_1bit") or src_model.startswith("wrn20_10_32bit"):
+        src_param_keys = [key for key in src_param_keys if
+                          not (key.startswith("features.") and
+                               (key.endswith(".bn.gamma") or key.endswith(".bn.beta")))]
+    return src_param_keys
+
+
+def filter_pt_src_param_keys(src_model,
+                             src_param_keys,
+                             dst_fwk):
+    """
+    Remove PyTorch source parameter keys, which are absent in destination models, and reorder the rest.
+
+    Parameters
+    ----------
+    src_model : str
+        Source model name.
+    src_param_keys : list of str
+        Source parameter keys.
+    dst_fwk : str
+        Destination framework name.
+
+    Returns
+    -------
+    list of str
+        Filtered keys.
+    """
+    if dst_fwk != "pytorch":
+        src_param_keys = [key for key in src_param_keys if not key.endswith("num_batches_tracked")]
+    if src_model in ["oth_shufflenetv2_wd2"]:
+        src_param_keys = [key for key in src_param_keys if not key.startswith("network.0.")]
+    if src_model.startswith("oth_dla"):
+        src1 = list(filter(re.compile("\.project").search, src_param_keys))
+        src1n = list(filter(lambda key: not re.search("\.project", key), src_param_keys))
+        src2 = []
+        for i in range(2, 6):
+            src1_i = list(filter(re.compile("level{}".format(i)).search, src1))
+            if len(src1_i) == 0:
+                continue
+            max_len = max([len(k) for k in src1_i])
+            pattern_i = [k for k in src1_i if len(k) == max_len][0][:-21]
+            src2_i = list(filter(re.compile(pattern_i).search, src1))
+            src2 += src2_i
+        src_param_keys = src2 + src1n
+    return src_param_keys
+
+
 def prepare_src_model(src_fwk,
                       src_model,
                       src_params_file_path,
@@ -107,22 +190,7 @@ def prepare_src_model(src_fwk,
             in_channels=in_channels,
             ctx=ctx)
         src_params = src_net._collect_params_with_prefix()
-        src_param_keys = list(src_params.keys())
-
-        if src_model in ["oth_resnet50_v1", "oth_resnet101_v1", "oth_resnet152_v1", "oth_resnet50_v1b",
-                         "oth_resnet101_v1b", "oth_resnet152_v1b"]:
-            src_param_keys = [key for key in src_param_keys if
-                              not (key.startswith("features.") and key.endswith(".bias"))]
-
-        if src_model in ["oth_resnet50_v1", "oth_resnet101_v1", "oth_resnet152_v1", "oth_resnet50_v1b",
-                         "oth_resnet101_v1b", "oth_resnet152_v1b"]:
-            src_param_keys = [key for key in src_param_keys if
-                              not (key.startswith("features.") and key.endswith(".bias"))]
-
-        if src_model.startswith("wrn20_10_1bit") or src_model.startswith("wrn20_10_32bit"):
-            src_param_keys = [key for key in src_param_keys if
-                              not (key.startswith("features.") and
-                                   (key.endswith(".bn.gamma") or key.endswith(".bn.beta")))]
+        src_param_keys = filter_gl_src_param_keys(src_model, list(src_params.keys()))
 
         if dst_fwk == "chainer":
             src_param_keys_ = src_param_keys.copy()
@@ -152,26 +220,11 @@ def prepare_src_model(src_fwk,
             remove_module=remove_module)
         src_params = src_net.state_dict()
         src_param_keys = list(src_params.keys())
-        if dst_fwk != "pytorch":
-            src_param_keys = [key for key in src_param_keys if not key.endswith("num_batches_tracked")]
-        if src_model in ["oth_shufflenetv2_wd2"]:
-            src_param_keys = [key for key in src_param_keys if not key.startswith("network.0.")]
-        if src_model.startswith("oth_dla"):
-            src1 = list(filter(re.compile("\.project").search, src_param_keys))
-            src1n = [key for key in src_param_keys if key not in src1]
-            src2 = []
-            for i in range(2, 6):
-                src1_i = list(filter(re.compile("level{}".format(i)).search, src1))
-                if len(src1_i) == 0:
-                    continue
-                max_len = max([len(k) for k in src1_i])
-                pattern_i = [k for k in src1_i if len(k) == max_len][0][:-21]
-                src2_i = list(filter(re.compile(pattern_i).search, src1))
-                src2 += src2_i
-            src_param_keys = src2 + src1n
+        src_param_keys = filter_pt_src_param_keys(src_model, src_param_keys, dst_fwk)
 
     elif src_fwk == "mxnet":
         import mxnet as mx
+        src_net = None
         src_sym, src_arg_params, src_aux_params = mx.model.load_checkpoint(
             prefix=src_params_file_path,
             epoch=0)
@@ -196,7 +249,7 @@ def prepare_src_model(src_fwk,
     else:
         raise ValueError("Unsupported src fwk: {}".format(src_fwk))
 
-    return src_params, src_param_keys, ext_src_param_keys, ext_src_param_keys2
+    return src_params, src_param_keys, ext_src_param_keys, ext_src_param_keys2, src_net
 
 
 def prepare_dst_model(dst_fwk,
@@ -289,6 +342,161 @@ def prepare_dst_model(dst_fwk,
     return dst_params, dst_param_keys, dst_net
 
 
+def compile_key_rules(rules):
+    """
+    Compile all regexes of parameter key reordering rules.
+
+    Parameters
+    ----------
+    rules : list of dict
+        Rules. Each rule is matched by optional `src_model`/`dst_model` regexes and contains optional `src`/`dst` lists
+        of key regexes (`None` is for unmatched keys) and optional `last_match` flag.
+
+    Returns
+    -------
+    list of dict
+        Compiled rules.
+    """
+    compiled_rules = []
+    for rule in rules:
+        compiled_rule = dict(rule)
+        for name in ["src_model", "dst_model"]:
+            if name in rule:
+                compiled_rule[name] = re.compile(rule[name])
+        for name in ["src", "dst"]:
+            if name in rule:
+                compiled_rule[name] = [(re.compile(pattern) if pattern is not None else None) for pattern in rule[name]]
+        compiled_rules.append(compiled_rule)
+    return compiled_rules
+
+
+def reorder_keys(keys,
+                 patterns,
+                 last_match=False):
+    """
+    Reorder parameter keys by buckets in one pass. Each key goes into the bucket of the first matching regex, the
+    bucket `None` is for unmatched keys. The initial order of keys is kept inside buckets. In the `last_match` mode
+    regexes are treated as successive moves of matched keys to their bucket positions (the last move wins).
+
+    Parameters
+    ----------
+    keys : list of str
+        Parameter keys.
+    patterns : list of Pattern or None
+        Compiled regexes of buckets.
+    last_match : bool, default False
+        Whether to use successive moves of keys.
+
+    Returns
+    -------
+    list of str
+        Reordered keys.
+    """
+    rest_id = patterns.index(None)
+    checked = [(i, pattern) for i, pattern in enumerate(patterns) if pattern is not None]
+    if last_match:
+        checked = checked[::-1]
+        orders = [tuple(i for i, pattern in checked if pattern.search(key)) + (rest_id, j) for j, key in enumerate(keys)]
+        return [keys[j] for j in sorted(range(len(keys)), key=orders.__getitem__)]
+    buckets = [[] for _ in patterns]
+    for key in keys:
+        bucket_id = next((i for i, pattern in checked if pattern.search(key)), rest_id)
+        buckets[bucket_id].append(key)
+    return [key for bucket in buckets for key in bucket]
+
+
+def apply_key_rules(rules,
+                    src_model,
+                    dst_model,
+                    src_param_keys,
+                    dst_param_keys,
+                    fwk_pair,
+                    cache_dir=""):
+    """
+    Reorder source and destination parameter keys by the first rule matched by model names. The resulted mapping is
+    cached to disk for the model pair and the exact lists of keys.
+
+    Parameters
+    ----------
+    rules : list of dict
+        Compiled rules.
+    src_model : str
+        Source model name.
+    dst_model : str
+        Destination model name.
+    src_param_keys : list of str
+        Source parameter keys.
+    dst_param_keys : list of str
+        Destination parameter keys.
+    fwk_pair : str
+        Name of framework pair (like `pt2pt`).
+    cache_dir : str, default ''
+        Directory for cached mappings (empty for disabling the cache).
+
+    Returns
+    -------
+    list of str
+        Reordered source parameter keys.
+    list of str
+        Reordered destination parameter keys.
+    """
+    rule = next((rule for rule in rules if
+                 (("src_model" not in rule) or rule["src_model"].search(src_model)) and
+                 (("dst_model" not in rule) or rule["dst_model"].search(dst_model))), None)
+    if rule is None:
+        return src_param_keys, dst_param_keys
+
+    cache_file_path = None
+    if cache_dir:
+        digest = hashlib.sha1("\n".join(src_param_keys + [""] + dst_param_keys).encode("utf-8")).hexdigest()
+        cache_file_path = os.path.join(os.path.expanduser(cache_dir), "{}_{}_{}_{}.json".format(
+            fwk_pair, src_model, dst_model, digest[:16]))
+        if os.path.exists(cache_file_path):
+            with open(cache_file_path, "r") as f:
+                key_map = json.load(f)
+            return key_map["src"], key_map["dst"]
+
+    last_match = rule.get("last_match", False)
+    if "src" in rule:
+        src_param_keys = reorder_keys(src_param_keys, rule["src"], last_match)
+    if "dst" in rule:
+        dst_param_keys = reorder_keys(dst_param_keys, rule["dst"], last_match)
+
+    if cache_file_path is not None:
+        os.makedirs(os.path.dirname(cache_file_path), exist_ok=True)
+        with open(cache_file_path, "w") as f:
+            json.dump({"src": src_param_keys, "dst": dst_param_keys}, f)
+    return src_param_keys, dst_param_keys
+
+
+_gl2gl_key_rules = compile_key_rules([
+    {"src_model": r"^oth_icnet_resnet50_citys",
+     "last_match": True,
+     "src": [r"^conv_sub1", None, r"^head"]},
+])
+
+_pt2pt_key_rules = compile_key_rules([
+    {"src_model": r"^oth_dla",
+     "src": [r"\.project", None],
+     "dst": [r"\.project_conv", None]},
+    {"dst_model": r"^ntsnet$",
+     "src": [r"^proposal_net", None],
+     "dst": [r"^navigator_unit\.branch\d+\.down", r"^navigator_unit\.branch\d+\.tidy", None]},
+    {"dst_model": r"^fishnet150$",
+     "src": [r"^(conv|fish\.fish\.[0-2])", r"^fish\.fish\.6\.1", r"^fish\.fish\.5\.1", r"^fish\.fish\.4\.1",
+             r"^fish\.fish\.3\.[0-1]", r"^fish\.fish\.3\.3", r"^fish\.fish\.[3-6]", r"^fish\.fish\.9\.1",
+             r"^fish\.fish\.8\.1", r"^fish\.fish\.7\.1", None]},
+    {"dst_model": r"^bam_resnet50$",
+     "src": [None, r"^bam"],
+     "dst": [None, r"^features.stage[0-9].unit1.bam."]},
+    {"dst_model": r"^sinet",
+     "last_match": True,
+     "src": [None, r"\.vertical.weight", r"\.horizontal.weight", r"\.B_v\.", r"\.B_h\.", r"bn_4\.", r"bn_3\."],
+     "dst": [None, r"\.v_conv.conv\.", r"\.h_conv.conv\.", r"\.v_conv.bn\.", r"\.h_conv.bn\.", r"decoder.decode1.bn\.",
+             r"decoder.decode2.bn\."]},
+])
+
+
 def convert_mx2gl(dst_net,
                   dst_params_file_path,
                   dst_params,
@@ -449,8 +657,8 @@ def convert_mx2gl(dst_net,
     elif src_model in ["preresnet269b"]:
 
         dst_net.features[1][0].body.conv1.bn.initialize(ctx=ctx, verbose=True, force_reinit=True)
-        dst1 = list(filter(re.compile("^features.1.0.body.conv1.bn.").search, dst_param_keys))
-        dst_param_keys = [key for key in dst_param_keys if key not in dst1]
+        dst1 = re.compile("^features.1.0.body.conv1.bn.")
+        dst_param_keys = [key for key in dst_param_keys if not dst1.search(key)]
 
         src_param_keys.sort()
         src_param_keys.sort(key=lambda var: ["{:10}".format(int(x)) if
@@ -505,9 +713,8 @@ def convert_gl2ch(dst_net,
                   src_model):
 
     if src_model.startswith("diares") or src_model.startswith("diapreres"):
-        src1 = list(filter(re.compile("^features\.[0-9]*\.\d*[1-9]\d*\.attention").search, src_param_keys))
-        src1n = [key for key in src_param_keys if key not in src1]
-        src_param_keys = src1n
+        src1 = re.compile("^features\.[0-9]*\.\d*[1-9]\d*\.attention")
+        src_param_keys = [key for key in src_param_keys if not src1.search(key)]
         assert (len(src_param_keys) == len(dst_param_keys))
 
     dst_param_keys = [key.replace('/W', '/weight') for key in dst_param_keys]
@@ -634,15 +841,17 @@ def convert_gl2gl(dst_net,
                   src_param_keys,
                   finetune,
                   src_model,
-                  ctx):
-    if src_model.startswith("oth_icnet_resnet50_citys"):
-        src1 = list(filter(re.compile("^conv_sub1").search, src_param_keys))
-        src1n = [key for key in src_param_keys if key not in src1]
-        src_param_keys = src1 + src1n
-
-        src2 = list(filter(re.compile("^head").search, src_param_keys))
-        src2n = [key for key in src_param_keys if key not in src2]
-        src_param_keys = src2n + src2
+                  dst_model,
+                  ctx,
+                  key_map_cache_dir=""):
+    src_param_keys, dst_param_keys = apply_key_rules(
+        rules=_gl2gl_key_rules,
+        src_model=src_model,
+        dst_model=dst_model,
+        src_param_keys=src_param_keys,
+        dst_param_keys=dst_param_keys,
+        fwk_pair="gl2gl",
+        cache_dir=key_map_cache_dir)
 
     for i, (src_key, dst_key) in enumerate(zip(src_param_keys, dst_param_keys)):
         if dst_params[dst_key].shape != src_params[src_key].shape:
@@ -915,14 +1124,34 @@ def convert_gl2tf2(dst_net,
     dst_net.save_weights(dst_params_file_path)
 
 
-def convert_pt2pt(dst_params_file_path,
-                  dst_params,
-                  dst_param_keys,
-                  src_params,
-                  src_param_keys,
-                  src_model,
-                  dst_model):
-    import torch
+def reorder_pt2pt_keys(src_param_keys,
+                       dst_param_keys,
+                       src_model,
+                       dst_model,
+                       key_map_cache_dir=""):
+    """
+    Reorder PyTorch parameter keys for conversion between PyTorch models.
+
+    Parameters
+    ----------
+    src_param_keys : list of str
+        Source parameter keys.
+    dst_param_keys : list of str
+        Destination parameter keys.
+    src_model : str
+        Source model name.
+    dst_model : str
+        Destination model name.
+    key_map_cache_dir : str, default ''
+        Directory for cached key mappings.
+
+    Returns
+    -------
+    list of str
+        Reordered source parameter keys.
+    list of str
+        Reordered destination parameter keys.
+    """
     if src_model.startswith("oth_proxyless"):
         src1 = src_param_keys[5]
         del src_param_keys[5]
@@ -930,105 +1159,81 @@ def convert_pt2pt(dst_params_file_path,
         src2 = src_param_keys[-3]
         del src_param_keys[-3]
         src_param_keys.insert(-7, src2)
-    elif src_model.startswith("oth_dla"):
-        src1 = list(filter(re.compile("\.project").search, src_param_keys))
-        src1n = [key for key in src_param_keys if key not in src1]
-        src_param_keys = src1 + src1n
-        dst1 = list(filter(re.compile("\.project_conv").search, dst_param_keys))
-        dst1n = [key for key in dst_param_keys if key not in dst1]
-        dst_param_keys = dst1 + dst1n
-
-    elif dst_model == "ntsnet":
-        src1 = list(filter(re.compile("^proposal_net").search, src_param_keys))
-        src1n = [key for key in src_param_keys if key not in src1]
-        src_param_keys = src1 + src1n
-        dst1 = list(filter(re.compile("^navigator_unit\.branch\d+\.down").search, dst_param_keys))
-        dst1n = [key for key in dst_param_keys if key not in dst1]
-        dst2 = list(filter(re.compile("^navigator_unit\.branch\d+\.tidy").search, dst1n))
-        dst2n = [key for key in dst1n if key not in dst2]
-        dst_param_keys = dst1 + dst2 + dst2n
-
-    elif dst_model == "fishnet150":
-        src1 = list(filter(re.compile("^(conv|fish\.fish\.[0-2])").search, src_param_keys))
-        src1n = [key for key in src_param_keys if key not in src1]
-        src2 = list(filter(re.compile("^fish\.fish\.6\.1").search, src1n))
-        src2n = [key for key in src1n if key not in src2]
-        src3 = list(filter(re.compile("^fish\.fish\.5\.1").search, src2n))
-        src3n = [key for key in src2n if key not in src3]
-        src4 = list(filter(re.compile("^fish\.fish\.4\.1").search, src3n))
-        src4n = [key for key in src3n if key not in src4]
-        src5 = list(filter(re.compile("^fish\.fish\.3\.[0-1]").search, src4n))
-        src5n = [key for key in src4n if key not in src5]
-        src6 = list(filter(re.compile("^fish\.fish\.3\.3").search, src5n))
-        src6n = [key for key in src5n if key not in src6]
-        src7 = list(filter(re.compile("^fish\.fish\.[3-6]").search, src6n))
-        src7n = [key for key in src6n if key not in src7]
-        src8 = list(filter(re.compile("^fish\.fish\.9\.1").search, src7n))
-        src8n = [key for key in src7n if key not in src8]
-        src9 = list(filter(re.compile("^fish\.fish\.8\.1").search, src8n))
-        src9n = [key for key in src8n if key not in src9]
-        src10 = list(filter(re.compile("^fish\.fish\.7\.1").search, src9n))
-        src10n = [key for key in src9n if key not in src10]
-        src_param_keys = src1 + src2 + src3 + src4 + src5 + src6 + src7 + src8 + src9 + src10 + src10n
-
-    elif dst_model == "bam_resnet50":
-        src_bams = list(filter(re.compile("^bam").search, src_param_keys))
-        src_param_keys = [key for key in src_param_keys if key not in src_bams]
-        src_param_keys = src_param_keys + src_bams
-
-        dst_bams = list(filter(re.compile("^features.stage[0-9].unit1.bam.").search, dst_param_keys))
-        dst_param_keys = [key for key in dst_param_keys if key not in dst_bams]
-        dst_param_keys = dst_param_keys + dst_bams
-
-    elif dst_model.startswith("sinet"):
-        src1 = list(filter(re.compile("\.vertical.weight").search, src_param_keys))
-        src1n = [key for key in src_param_keys if key not in src1]
-        src_param_keys = src1n + src1
-        src2 = list(filter(re.compile("\.horizontal.weight").search, src_param_keys))
-        src2n = [key for key in src_param_keys if key not in src2]
-        src_param_keys = src2n + src2
-        src3 = list(filter(re.compile("\.B_v\.").search, src_param_keys))
-        src3n = [key for key in src_param_keys if key not in src3]
-        src_param_keys = src3n + src3
-        src4 = list(filter(re.compile("\.B_h\.").search, src_param_keys))
-        src4n = [key for key in src_param_keys if key not in src4]
-        src_param_keys = src4n + src4
-        src5 = list(filter(re.compile("bn_4\.").search, src_param_keys))
-        src5n = [key for key in src_param_keys if key not in src5]
-        src_param_keys = src5n + src5
-        src6 = list(filter(re.compile("bn_3\.").search, src_param_keys))
-        src6n = [key for key in src_param_keys if key not in src6]
-        src_param_keys = src6n + src6
-
-        dst1 = list(filter(re.compile("\.v_conv.conv\.").search, dst_param_keys))
-        dst1n = [key for key in dst_param_keys if key not in dst1]
-        dst_param_keys = dst1n + dst1
-        dst2 = list(filter(re.compile("\.h_conv.conv\.").search, dst_param_keys))
-        dst2n = [key for key in dst_param_keys if key not in dst2]
-        dst_param_keys = dst2n + dst2
-        dst3 = list(filter(re.compile("\.v_conv.bn\.").search, dst_param_keys))
-        dst3n = [key for key in dst_param_keys if key not in dst3]
-        dst_param_keys = dst3n + dst3
-        dst4 = list(filter(re.compile("\.h_conv.bn\.").search, dst_param_keys))
-        dst4n = [key for key in dst_param_keys if key not in dst4]
-        dst_param_keys = dst4n + dst4
-        dst5 = list(filter(re.compile("decoder.decode1.bn\.").search, dst_param_keys))
-        dst5n = [key for key in dst_param_keys if key not in dst5]
-        dst_param_keys = dst5n + dst5
-        dst6 = list(filter(re.compile("decoder.decode2.bn\.").search, dst_param_keys))
-        dst6n = [key for key in dst_param_keys if key not in dst6]
-        dst_param_keys = dst6n + dst6
+    else:
+        src_param_keys, dst_param_keys = apply_key_rules(
+            rules=_pt2pt_key_rules,
+            src_model=src_model,
+            dst_model=dst_model,
+            src_param_keys=src_param_keys,
+            dst_param_keys=dst_param_keys,
+            fwk_pair="pt2pt",
+            cache_dir=key_map_cache_dir)
+
+    return src_param_keys, dst_param_keys
+
+
+def convert_pt2pt_param(src_param,
+                        src_key,
+                        dst_shape,
+                        dst_key,
+                        src_model,
+                        dst_model):
+    """
+    Convert one PyTorch parameter for a destination PyTorch model.
+
+    Parameters
+    ----------
+    src_param : Tensor
+        Source parameter.
+    src_key : str
+        Source parameter key.
+    dst_shape : tuple of int
+        Destination parameter shape.
+    dst_key : str
+        Destination parameter key.
+    src_model : str
+        Source model name.
+    dst_model : str
+        Destination model name.
+
+    Returns
+    -------
+    Tensor
+        Destination parameter.
+    """
+    if (src_model == "oth_shufflenetv2_wd2" and dst_model == "shufflenetv2_wd2") and (src_key == "network.8.weight"):
+        return src_param[:, :, 0, 0]
+    assert (dst_shape == tuple(src_param.size())), \
+        "src_key={}, dst_key={}, src_shape={}, dst_shape={}".format(
+            src_key, dst_key, tuple(src_param.size()), dst_shape)
+    assert (dst_key.split('.')[-1] == src_key.split('.')[-1])
+    return src_param
+
+
+def convert_pt2pt(dst_params_file_path,
+                  dst_params,
+                  dst_param_keys,
+                  src_params,
+                  src_param_keys,
+                  src_model,
+                  dst_model,
+                  key_map_cache_dir=""):
+    import torch
+    src_param_keys, dst_param_keys = reorder_pt2pt_keys(
+        src_param_keys=src_param_keys,
+        dst_param_keys=dst_param_keys,
+        src_model=src_model,
+        dst_model=dst_model,
+        key_map_cache_dir=key_map_cache_dir)
 
     for i, (src_key, dst_key) in enumerate(zip(src_param_keys, dst_param_keys)):
-        if (src_model == "oth_shufflenetv2_wd2" and dst_model == "shufflenetv2_wd2") and \
-                (src_key == "network.8.weight"):
-            dst_params[dst_key] = torch.from_numpy(src_params[src_key].numpy()[:, :, 0, 0])
-        else:
-            assert (tuple(dst_params[dst_key].size()) == tuple(src_params[src_key].size())), \
-                "src_key={}, dst_key={}, src_shape={}, dst_shape={}".format(
-                    src_key, dst_key, tuple(src_params[src_key].size()), tuple(dst_params[dst_key].size()))
-            assert (dst_key.split('.')[-1] == src_key.split('.')[-1])
-            dst_params[dst_key] = torch.from_numpy(src_params[src_key].numpy())
+        dst_params[dst_key] = convert_pt2pt_param(
+            src_param=src_params[src_key],
+            src_key=src_key,
+            dst_shape=tuple(dst_params[dst_key].size()),
+            dst_key=dst_key,
+            src_model=src_model,
+            dst_model=dst_model)
     torch.save(
         obj=dst_params,
         f=dst_params_file_path)
@@ -1165,6 +1370,107 @@ def convert_tf2gl(dst_net,
     dst_net.save_parameters(dst_params_file_path)
 
 
+def get_peak_rss():
+    """
+    Get peak resident set size of the current process.
+
+    Returns
+    -------
+    float
+        Peak RSS in MB.
+    """
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+def convert_streaming(args):
+    """
+    Convert parameters into a PyTorch checkpoint tensor by tensor. Models are instantiated on the meta device only for
+    parameter names and shapes. Source tensors are read lazily from a memory mapped PyTorch checkpoint (or loaded Gluon
+    parameters are freed one by one), so only the converted tensors are kept in memory.
+
+    Parameters
+    ----------
+    args : ArgumentParser
+        Main script arguments.
+    """
+    import torch
+    from pytorch.pytorchcv.model_provider import get_model as get_model_pt
+
+    if (args.dst_fwk != "pytorch") or (args.src_fwk not in ["gluon", "pytorch"]):
+        raise ValueError("Streaming conversion isn't supported for {} -> {}".format(args.src_fwk, args.dst_fwk))
+    assert os.path.isfile(args.src_params)
+
+    def get_meta_params(model_name, num_classes, in_channels):
+        kwargs = {"num_classes": num_classes} if num_classes > 0 else {}
+        with torch.device("meta"):
+            net = get_model_pt(model_name, pretrained=False, in_channels=in_channels, **kwargs)
+        return {k: tuple(v.size()) for k, v in net.state_dict().items()}
+
+    dst_shapes = get_meta_params(args.dst_model, args.dst_num_classes, args.dst_in_channels)
+    dst_param_keys = list(dst_shapes.keys())
+
+    if args.src_fwk == "pytorch":
+        src_params = torch.load(args.src_params, map_location="cpu", mmap=True, weights_only=True)
+        if isinstance(src_params, dict) and ("state_dict" in src_params):
+            src_params = src_params["state_dict"]
+        if args.remove_module:
+            src_params = {(k[7:] if k.startswith("module.") else k): v for k, v in src_params.items()}
+        src_param_keys = list(get_meta_params(args.src_model, args.src_num_classes, args.src_in_channels).keys())
+        src_param_keys = filter_pt_src_param_keys(args.src_model, src_param_keys, args.dst_fwk)
+        if not any([key.endswith("num_batches_tracked") for key in src_params.keys()]):
+            # Old checkpoints don't contain these buffers, their initial values are used:
+            src_param_keys = [key for key in src_param_keys if not key.endswith("num_batches_tracked")]
+            dst_param_keys = [key for key in dst_param_keys if not key.endswith("num_batches_tracked")]
+        src_param_keys, dst_param_keys = reorder_pt2pt_keys(
+            src_param_keys=src_param_keys,
+            dst_param_keys=dst_param_keys,
+            src_model=args.src_model,
+            dst_model=args.dst_model,
+            key_map_cache_dir=args.key_map_cache_dir)
+    else:
+        import mxnet as mx
+        from gluon.gluoncv2.model_provider import get_model as get_model_gl
+        kwargs = {"classes": args.src_num_classes} if args.src_num_classes > 0 else {}
+        # Parameters aren't initialized, the model only gives the ordered parameter names (as in prepare_src_model):
+        src_net = get_model_gl(args.src_model, pretrained=False, in_channels=args.src_in_channels, **kwargs)
+        src_param_keys = filter_gl_src_param_keys(args.src_model, list(src_net._collect_params_with_prefix().keys()))
+        del src_net
+        src_params = mx.nd.load(args.src_params)
+        dst_param_keys = [key for key in dst_param_keys if not key.endswith("num_batches_tracked")]
+
+    assert (len(src_param_keys) == len(dst_param_keys))
+    absent_keys = [key for key in src_param_keys if key not in src_params]
+    if absent_keys:
+        raise ValueError("Parameters absent in the source file: {}".format(absent_keys))
+
+    dst_params = {}
+    for src_key, dst_key in zip(src_param_keys, dst_param_keys):
+        src_param = src_params.pop(src_key)
+        if args.src_fwk == "pytorch":
+            dst_params[dst_key] = convert_pt2pt_param(
+                src_param=src_param,
+                src_key=src_key,
+                dst_shape=dst_shapes[dst_key],
+                dst_key=dst_key,
+                src_model=args.src_model,
+                dst_model=args.dst_model)
+        else:
+            assert (dst_shapes[dst_key] == src_param.shape)
+            dst_params[dst_key] = torch.from_numpy(src_param.asnumpy())
+        del src_param
+    for key in dst_shapes.keys():
+        if (key not in dst_params) and key.endswith("num_batches_tracked"):
+            # As in the initial state of the destination model (saved by the regular conversion):
+            dst_params[key] = torch.tensor(0, dtype=torch.long)
+    missing_keys = [key for key in dst_shapes.keys() if key not in dst_params]
+    if missing_keys:
+        raise ValueError("Parameters without source values: {}".format(missing_keys))
+    torch.save(
+        obj=dst_params,
+        f=args.dst_params)
+
+
 def _init_ctx(args):
     ctx = None
     if args.src_fwk in ("gluon", "mxnet", "keras") or args.dst_fwk in ("gluon", "mxnet", "keras"):
@@ -1234,22 +1540,39 @@ def update_and_initialize_logging(args):
         log_pip_packages=pip_packages)
 
 
-def main():
-    args = parse_args()
-
-    ctx = None
-    use_cuda = False
-
-    if args.dst_fwk == "tf2":
-        dst_params, dst_param_keys, dst_net = _prepare_dst_model(args, ctx, use_cuda)
-
-    update_and_initialize_logging(args=args)
-
-    ctx = _init_ctx(args)
-    src_params, src_param_keys, ext_src_param_keys, ext_src_param_keys2 = _prepare_src_model(args, ctx, use_cuda)
-    if args.dst_fwk != "tf2":
-        dst_params, dst_param_keys, dst_net = _prepare_dst_model(args, ctx, use_cuda)
+def convert_params(args,
+                   ctx,
+                   src_params,
+                   src_param_keys,
+                   ext_src_param_keys,
+                   ext_src_param_keys2,
+                   dst_params,
+                   dst_param_keys,
+                   dst_net):
+    """
+    Convert parameters of the prepared source model into the destination model and save them.
 
+    Parameters
+    ----------
+    args : ArgumentParser
+        Main script arguments.
+    ctx : Context or None
+        MXNet context.
+    src_params : dict
+        Source model parameters.
+    src_param_keys : list of str
+        Ordered keys of source model parameters.
+    ext_src_param_keys : list of str or None
+        Extra keys of source model parameters (for Chainer).
+    ext_src_param_keys2 : list of str or None
+        Second extra keys of source model parameters (for Chainer).
+    dst_params : dict
+        Destination model parameters.
+    dst_param_keys : list of str
+        Ordered keys of destination model parameters.
+    dst_net : object
+        Destination model.
+    """
     if ((args.dst_fwk in ["keras", "tensorflow", "tf2"]) and any([s.find("convgroup") >= 0 for s in dst_param_keys]))\
             or ((args.src_fwk == "mxnet") and (args.src_model in ["crunet56", "crunet116", "preresnet269b"])):
         assert (len(src_param_keys) <= len(dst_param_keys))
@@ -1269,7 +1592,9 @@ def main():
             src_param_keys=src_param_keys,
             finetune=((args.src_num_classes != args.dst_num_classes) or (args.src_in_channels != args.dst_in_channels)),
             src_model=args.src_model,
-            ctx=ctx)
+            dst_model=args.dst_model,
+            ctx=ctx,
+            key_map_cache_dir=args.key_map_cache_dir)
     elif args.src_fwk == "pytorch" and args.dst_fwk == "pytorch":
         convert_pt2pt(
             dst_params_file_path=args.dst_params,
@@ -1278,7 +1603,8 @@ def main():
             src_params=src_params,
             src_param_keys=src_param_keys,
             src_model=args.src_model,
-            dst_model=args.dst_model)
+            dst_model=args.dst_model,
+            key_map_cache_dir=args.key_map_cache_dir)
     elif args.src_fwk == "gluon" and args.dst_fwk == "pytorch":
         convert_gl2pt(
             dst_params_file_path=args.dst_params,
@@ -1359,8 +1685,43 @@ def main():
     else:
         raise NotImplementedError
 
-    logging.info('Convert {}-model {} into {}-model {}'.format(
-        args.src_fwk, args.src_model, args.dst_fwk, args.dst_model))
+
+def main():
+    args = parse_args()
+
+    ctx = None
+    use_cuda = False
+
+    if args.streaming:
+        update_and_initialize_logging(args=args)
+        convert_streaming(args)
+        logging.info('Convert {}-model {} into {}-model {} (streaming), peak RSS: {:.1f} MB'.format(
+            args.src_fwk, args.src_model, args.dst_fwk, args.dst_model, get_peak_rss()))
+        return
+
+    if args.dst_fwk == "tf2":
+        dst_params, dst_param_keys, dst_net = _prepare_dst_model(args, ctx, use_cuda)
+
+    update_and_initialize_logging(args=args)
+
+    ctx = _init_ctx(args)
+    src_params, src_param_keys, ext_src_param_keys, ext_src_param_keys2, _ = _prepare_src_model(args, ctx, use_cuda)
+    if args.dst_fwk != "tf2":
+        dst_params, dst_param_keys, dst_net = _prepare_dst_model(args, ctx, use_cuda)
+
+    convert_params(
+        args=args,
+        ctx=ctx,
+        src_params=src_params,
+        src_param_keys=src_param_keys,
+        ext_src_param_keys=ext_src_param_keys,
+        ext_src_param_keys2=ext_src_param_keys2,
+        dst_params=dst_params,
+        dst_param_keys=dst_param_keys,
+        dst_net=dst_net)
+
+    logging.info('Convert {}-model {} into {}-model {}, peak RSS: {:.1f} MB'.format(
+        args.src_fwk, args.src_model, args.dst_fwk, args.dst_model, get_peak_rss()))
 
 
 if __name__ == '__main__':
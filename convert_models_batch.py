@@ -0,0 +1,387 @@
+"""
+    Script for bulk converting of models between frameworks in a pool of processes (see convert_models.py).
+"""
+
+import os
+import re
+import time
+import argparse
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from convert_models import prepare_src_model, prepare_dst_model, convert_params, _init_ctx
+from convert_models import update_and_initialize_logging
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Bulk convert models (Gluon/PyTorch/Chainer/MXNet/Keras/TF/TF2)',
+                                     formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument(
+        '--src-fwk',
+        type=str,
+        required=True,
+        help='source model framework name')
+    parser.add_argument(
+        '--dst-fwk',
+        type=str,
+        required=True,
+        help='destination model framework name')
+    parser.add_argument(
+        '--models',
+        type=str,
+        default='',
+        help='comma-separated list of model names or src_model:dst_model pairs')
+    parser.add_argument(
+        '--model-filter',
+        type=str,
+        default='',
+        help='regular expression for model names from the destination framework model registry')
+    parser.add_argument(
+        '--src-params-template',
+        type=str,
+        default='',
+        help='source model parameter file path template with {} for the model name (empty for random weights)')
+    parser.add_argument(
+        '--dst-params-ext',
+        type=str,
+        default='',
+        help='extension of destination model parameter files (default is chosen by the framework)')
+    parser.add_argument(
+        '--remove-module',
+        action='store_true',
+        help='enable if stored PyTorch model has module')
+    parser.add_argument(
+        '--num-classes',
+        type=int,
+        default=1000,
+        help='number of classes')
+    parser.add_argument(
+        '--in-channels',
+        type=int,
+        default=3,
+        help='number of input channels')
+    parser.add_argument(
+        '--key-map-cache-dir',
+        type=str,
+        default=os.path.join('~', '.imgclsmob', 'key_maps'),
+        help='directory for cached parameter key mappings (empty for disabling the cache)')
+
+    parser.add_argument(
+        '--num-workers',
+        type=int,
+        default=2,
+        help='number of worker processes')
+    parser.add_argument(
+        '--skip-parity',
+        action='store_true',
+        help='skip numeric parity check of converted models')
+
+    parser.add_argument(
+        '--save-dir',
+        type=str,
+        default='',
+        help='directory of saved models and log-files')
+    parser.add_argument(
+        '--logging-file-name',
+        type=str,
+        default='convert.log',
+        help='filename of conversion log')
+    args = parser.parse_args()
+    return args
+
+
+def get_model_registry(fwk):
+    """
+    Get names of all models for the framework.
+
+    Parameters
+    ----------
+    fwk : str
+        Framework name.
+
+    Returns
+    -------
+    list of str
+        Model names.
+    """
+    if fwk == "gluon":
+        from gluon.gluoncv2.model_provider import _models
+    elif fwk == "pytorch":
+        from pytorch.pytorchcv.model_provider import _models
+    elif fwk == "chainer":
+        from chainer_.chainercv2.model_provider import _models
+    elif fwk == "keras":
+        from keras_.kerascv.model_provider import _models
+    elif fwk == "tensorflow":
+        from tensorflow_.tensorflowcv.model_provider import _models
+    elif fwk == "tf2":
+        from tensorflow2.tf2cv.model_provider import _models
+    else:
+        raise ValueError("Unsupported fwk: {}".format(fwk))
+    return list(_models.keys())
+
+
+def prepare_tasks(args):
+    """
+    Prepare conversion tasks grouped by source models (so each source model is instantiated once).
+
+    Parameters
+    ----------
+    args : ArgumentParser
+        Main script arguments.
+
+    Returns
+    -------
+    list of tuple of str and list of str
+        Source model names with lists of destination model names.
+    """
+    pairs = []
+    if args.models:
+        for name in args.models.split(","):
+            src_model, _, dst_model = name.strip().partition(":")
+            pairs.append((src_model, dst_model if dst_model else src_model))
+    if args.model_filter:
+        pattern = re.compile(args.model_filter)
+        pairs += [(name, name) for name in get_model_registry(args.dst_fwk) if pattern.search(name)]
+    tasks = {}
+    for src_model, dst_model in pairs:
+        dst_models = tasks.setdefault(src_model, [])
+        if dst_model not in dst_models:
+            dst_models.append(dst_model)
+    return list(tasks.items())
+
+
+def get_dst_params_file_path(args,
+                             dst_model):
+    """
+    Get destination model parameter file path.
+    """
+    if args.dst_params_ext:
+        ext = args.dst_params_ext
+    else:
+        ext = {"gluon": "params", "pytorch": "pth", "chainer": "npz", "keras": "h5", "tensorflow": "tf.npz",
+               "tf2": "tf2.h5"}[args.dst_fwk]
+    return os.path.join(args.save_dir, "{}.{}".format(dst_model, ext))
+
+
+_worker_ctx = None
+
+
+def init_worker(args):
+    """
+    Initialize worker process: import frameworks once, so the process is warm for all its tasks.
+    """
+    global _worker_ctx
+    _worker_ctx = _init_ctx(args)
+    for fwk in [args.src_fwk, args.dst_fwk]:
+        if fwk in ["gluon", "pytorch", "chainer", "keras", "tf2"]:
+            get_model_registry(fwk)
+    if args.dst_fwk == "tf2":
+        import tensorflow as tf
+        gpus = tf.config.experimental.list_physical_devices("GPU")
+        if gpus:
+            for gpu in gpus:
+                tf.config.experimental.set_memory_growth(gpu, True)
+
+
+def run_net(fwk,
+            net,
+            x,
+            ctx):
+    """
+    Calculate model output for numeric parity check.
+
+    Parameters
+    ----------
+    fwk : str
+        Framework name.
+    net : object
+        Model.
+    x : np.array
+        Input data in NCHW layout.
+    ctx : Context or None
+        MXNet context.
+
+    Returns
+    -------
+    np.array or None
+        Model output (None if the framework isn't supported).
+    """
+    if fwk == "pytorch":
+        import torch
+        net.eval()
+        with torch.no_grad():
+            y = net(torch.from_numpy(x))
+    elif fwk == "gluon":
+        import mxnet as mx
+        y = net(mx.nd.array(x, ctx))
+    elif fwk == "chainer":
+        import chainer
+        with chainer.using_config("train", False), chainer.no_backprop_mode():
+            y = net(x)
+    elif fwk == "tf2":
+        if net.data_format != "channels_first":
+            x = x.transpose((0, 2, 3, 1))
+        y = net(x, training=False)
+    else:
+        return None
+    if isinstance(y, (tuple, list)):
+        y = y[0]
+    if fwk == "pytorch":
+        return y.numpy()
+    elif fwk == "gluon":
+        return y.asnumpy()
+    elif fwk == "chainer":
+        return y.array
+    return y.numpy()
+
+
+def load_dst_params(fwk,
+                    net,
+                    file_path,
+                    ctx):
+    """
+    Load converted parameters into the destination model.
+    """
+    if fwk == "pytorch":
+        import torch
+        net.load_state_dict(torch.load(file_path, map_location="cpu"))
+    elif fwk == "gluon":
+        net.load_parameters(file_path, ctx=ctx)
+    elif fwk == "chainer":
+        from chainer.serializers import load_npz
+        load_npz(file_path, net)
+    elif fwk == "tf2":
+        net.load_weights(file_path)
+
+
+def convert_group(args,
+                  src_model,
+                  dst_models):
+    """
+    Convert one source model into destination models (in a worker process).
+
+    Parameters
+    ----------
+    args : ArgumentParser
+        Main script arguments.
+    src_model : str
+        Source model name.
+    dst_models : list of str
+        Destination model names.
+
+    Returns
+    -------
+    list of dict
+        Conversion results.
+    """
+    ctx = _worker_ctx
+    use_cuda = False
+    results = []
+    try:
+        tic = time.time()
+        src_params, src_param_keys, ext_src_param_keys, ext_src_param_keys2, src_net = prepare_src_model(
+            src_fwk=args.src_fwk,
+            src_model=src_model,
+            src_params_file_path=(args.src_params_template.format(src_model) if args.src_params_template else ""),
+            dst_fwk=args.dst_fwk,
+            ctx=ctx,
+            use_cuda=use_cuda,
+            remove_module=args.remove_module,
+            num_classes=args.num_classes,
+            in_channels=args.in_channels)
+        src_time = time.time() - tic
+    except Exception as e:
+        return [{"src_model": src_model, "dst_model": dst_model, "status": "src error: {}: {}".format(type(e).__name__, e),
+                 "time": 0.0, "max_diff": None} for dst_model in dst_models]
+
+    src_outputs = {}
+    for dst_model in dst_models:
+        result = {"src_model": src_model, "dst_model": dst_model, "status": "ok", "time": src_time, "max_diff": None}
+        results.append(result)
+        model_args = argparse.Namespace(
+            src_fwk=args.src_fwk,
+            dst_fwk=args.dst_fwk,
+            src_model=src_model,
+            dst_model=dst_model,
+            dst_params=get_dst_params_file_path(args, dst_model),
+            src_num_classes=args.num_classes,
+            dst_num_classes=args.num_classes,
+            src_in_channels=args.in_channels,
+            dst_in_channels=args.in_channels,
+            key_map_cache_dir=args.key_map_cache_dir)
+        try:
+            tic = time.time()
+            dst_params, dst_param_keys, dst_net = prepare_dst_model(
+                dst_fwk=args.dst_fwk,
+                dst_model=dst_model,
+                src_fwk=args.src_fwk,
+                ctx=ctx,
+                use_cuda=use_cuda,
+                num_classes=args.num_classes,
+                in_channels=args.in_channels)
+            convert_params(
+                args=model_args,
+                ctx=ctx,
+                src_params=src_params,
+                src_param_keys=list(src_param_keys),
+                ext_src_param_keys=ext_src_param_keys,
+                ext_src_param_keys2=ext_src_param_keys2,
+                dst_params=dst_params,
+                dst_param_keys=dst_param_keys,
+                dst_net=dst_net)
+            result["time"] += time.time() - tic
+            src_time = 0.0
+
+            if (not args.skip_parity) and (src_net is not None):
+                in_size = dst_net.in_size if hasattr(dst_net, "in_size") else (224, 224)
+                if in_size not in src_outputs:
+                    x = np.random.RandomState(0).randn(1, args.in_channels, in_size[0], in_size[1]).astype(np.float32)
+                    src_outputs[in_size] = (x, run_net(args.src_fwk, src_net, x, ctx))
+                x, src_y = src_outputs[in_size]
+                load_dst_params(args.dst_fwk, dst_net, model_args.dst_params, ctx)
+                dst_y = run_net(args.dst_fwk, dst_net, x, ctx)
+                if (src_y is not None) and (dst_y is not None):
+                    result["max_diff"] = float(np.abs(src_y - dst_y).max())
+        except Exception as e:
+            result["status"] = "error: {}: {}".format(type(e).__name__, str(e).split("\n")[0])
+    return results
+
+
+def main():
+    args = parse_args()
+
+    update_and_initialize_logging(args)
+
+    tasks = prepare_tasks(args)
+    num_models = sum([len(dst_models) for _, dst_models in tasks])
+    logging.info("Converting {} models ({} source models) with {} workers".format(
+        num_models, len(tasks), args.num_workers))
+
+    tic = time.time()
+    results = {}
+    with ProcessPoolExecutor(max_workers=args.num_workers,
+                             mp_context=multiprocessing.get_context("spawn"),
+                             initializer=init_worker,
+                             initargs=(args,)) as executor:
+        futures = {executor.submit(convert_group, args, src_model, dst_models): src_model
+                   for src_model, dst_models in tasks}
+        for future in as_completed(futures):
+            for result in future.result():
+                results[(result["src_model"], result["dst_model"])] = result
+                logging.info("{} -> {}: {}".format(result["src_model"], result["dst_model"], result["status"]))
+
+    logging.info("{:>32} {:>32} {:>8} {:>12}  {}".format("src_model", "dst_model", "time, s", "max_diff", "status"))
+    for src_model, dst_models in tasks:
+        for dst_model in dst_models:
+            result = results[(src_model, dst_model)]
+            logging.info("{:>32} {:>32} {:>8.2f} {:>12}  {}".format(
+                src_model, dst_model, result["time"],
+                "{:.6g}".format(result["max_diff"]) if result["max_diff"] is not None else "-", result["status"]))
+    num_ok = sum([result["status"] == "ok" for result in results.values()])
+    logging.info("Converted {}/{} models in {:.1f} s".format(num_ok, num_models, time.time() - tic))
+
+
+if __name__ == '__main__':
+    main()
@@ -64,6 +64,16 @@ def add_eval_parser_arguments(parser):
         default=4,
         type=int,
         help="number of preprocessing workers")
+    parser.add_argument(
+        "--predictor-workers",
+        type=int,
+        default=0,
+        help="number of predictor threads for stacking of batches into preallocated arrays")
+    parser.add_argument(
+        "--predictor-prefetch",
+        type=int,
+        default=0,
+        help="number of batches prefetched while the model processes the current one (0 for sequential processing)")
 
     parser.add_argument(
         "--batch-size",
@@ -148,7 +158,9 @@ def calc_model_accuracy(net,
                         metric,
                         calc_weight_count=False,
                         calc_flops_only=True,
-                        extended_log=False):
+                        extended_log=False,
+                        num_predictor_workers=0,
+                        num_prefetch=0):
     """
     Main test routine.
 
@@ -166,6 +178,10 @@ def calc_model_accuracy(net,
         Whether to log more precise accuracy values.
     ml_type : str, default 'imgcls'
         Machine learning type.
+    num_predictor_workers : int, default 0
+        Number of predictor threads for stacking of batches.
+    num_prefetch : int, default 0
+        Number of batches prefetched while the model processes the current one (0 for sequential processing).
 
     Returns
     -------
@@ -176,35 +192,45 @@ def calc_model_accuracy(net,
 
     predictor = Predictor(
         model=net,
-        transform=None)
+        transform=None,
+        num_workers=num_predictor_workers,
+        num_prefetch=num_prefetch)
 
     if calc_weight_count:
         weight_count = net.count_params()
         logging.info("Model: {} trainable parameters".format(weight_count))
 
     if not calc_flops_only:
-        in_values, out_values, rest_values = apply_to_iterator(
-            func=predictor,
-            iterator=test_data["iterator"],
-            hook=ProgressHook(test_data["ds_len"]))
-        assert (len(rest_values) == 1)
-        assert (len(out_values) == 1)
-        assert (len(in_values) == 1)
-
-        if True:
-            labels = iter(rest_values[0])
-            preds = iter(out_values[0])
-            inputs = iter(in_values[0])
-            for label, pred, inputi in zip(labels, preds, inputs):
-                metric.update(label, pred)
-                del label
-                del pred
-                del inputi
+        if num_prefetch > 0:
+            for preds, rest_values in predictor.iterate(
+                    iterator=test_data["iterator"],
+                    hook=ProgressHook(test_data["ds_len"])):
+                assert (len(rest_values) == 1)
+                for label, pred in zip(rest_values[0], preds):
+                    metric.update(label, pred)
         else:
-            import numpy as np
-            metric.update(
-                labels=np.array(list(rest_values[0])),
-                preds=np.array(list(out_values[0])))
+            in_values, out_values, rest_values = apply_to_iterator(
+                func=predictor,
+                iterator=test_data["iterator"],
+                hook=ProgressHook(test_data["ds_len"]))
+            assert (len(rest_values) == 1)
+            assert (len(out_values) == 1)
+            assert (len(in_values) == 1)
+
+            if True:
+                labels = iter(rest_values[0])
+                preds = iter(out_values[0])
+                inputs = iter(in_values[0])
+                for label, pred, inputi in zip(labels, preds, inputs):
+                    metric.update(label, pred)
+                    del label
+                    del pred
+                    del inputi
+            else:
+                import numpy as np
+                metric.update(
+                    labels=np.array(list(rest_values[0])),
+                    preds=np.array(list(out_values[0])))
 
         accuracy_msg = report_accuracy(
             metric=metric,
@@ -274,7 +300,9 @@ def test_model(args):
         metric=test_metric,
         calc_weight_count=True,
         calc_flops_only=args.calc_flops_only,
-        extended_log=True)
+        extended_log=True,
+        num_predictor_workers=args.predictor_workers,
+        num_prefetch=args.predictor_prefetch)
     return acc_values[ds_metainfo.saver_acc_ind] if len(acc_values) > 0 else None
 
 
@@ -6,10 +6,11 @@ import os
 import time
 import logging
 import argparse
+from functools import partial
 from sys import version_info
 from common.logger_utils import initialize_logging
 from gluon.utils import prepare_mx_context, prepare_model
-from gluon.utils import calc_net_weight_count, validate
+from gluon.utils import calc_net_weight_count, validate, validate_async
 from gluon.utils import get_composite_metric
 from gluon.utils import report_accuracy
 from gluon.dataset_utils import get_dataset_metainfo
@@ -62,12 +63,27 @@ def add_eval_parser_arguments(parser):
         type=str,
         default="val",
         help="data subset. options are val and test")
+    parser.add_argument(
+        "--symbol-cache-dir",
+        type=str,
+        default="",
+        help="directory for cached hybridized models (empty for disabling the cache)")
 
     parser.add_argument(
         "--num-gpus",
         type=int,
         default=0,
         help="number of gpus to use")
+    parser.add_argument(
+        "--num-cpu-contexts",
+        type=int,
+        default=1,
+        help="number of CPU contexts to use (if there is no GPU)")
+    parser.add_argument(
+        "--num-inflight",
+        type=int,
+        default=0,
+        help="number of batches in flight with background metric updating (0 for synchronous evaluation)")
     parser.add_argument(
         "-j",
         "--num-data-workers",
@@ -166,7 +182,8 @@ def calc_model_accuracy(net,
                         calc_weight_count=False,
                         calc_flops=False,
                         calc_flops_only=True,
-                        extended_log=False):
+                        extended_log=False,
+                        num_inflight=0):
     """
     Main test routine.
 
@@ -198,6 +215,8 @@ def calc_model_accuracy(net,
         Whether to only calculate FLOPs without testing.
     extended_log : bool, default False
         Whether to log more precise accuracy values.
+    num_inflight : int, default 0
+        Number of batches in flight with background metric updating (0 for synchronous evaluation).
 
     Returns
     -------
@@ -206,7 +225,8 @@ def calc_model_accuracy(net,
     """
     if not calc_flops_only:
         tic = time.time()
-        validate(
+        validate_fn = partial(validate_async, num_inflight=num_inflight) if num_inflight > 0 else validate
+        validate_fn(
             metric=metric,
             net=net,
             val_data=test_data,
@@ -264,7 +284,8 @@ def test_model(args):
 
     ctx, batch_size = prepare_mx_context(
         num_gpus=args.num_gpus,
-        batch_size=args.batch_size)
+        batch_size=args.batch_size,
+        num_cpu_contexts=args.num_cpu_contexts)
 
     net = prepare_model(
         model_name=args.model,
@@ -276,7 +297,10 @@ def test_model(args):
         classes=(args.num_classes if ds_metainfo.ml_type != "hpe" else None),
         in_channels=args.in_channels,
         do_hybridize=(ds_metainfo.allow_hybridize and (not args.calc_flops)),
-        ctx=ctx)
+        ctx=ctx,
+        symbol_cache_dir=args.symbol_cache_dir,
+        input_shape=((args.batch_size, args.in_channels) + tuple(ds_metainfo.input_image_size)
+                     if ds_metainfo.input_image_size is not None else None))
     assert (hasattr(net, "in_size"))
     input_image_size = net.in_size
 
@@ -314,7 +338,8 @@ def test_model(args):
         calc_weight_count=True,
         calc_flops=args.calc_flops,
         calc_flops_only=args.calc_flops_only,
-        extended_log=True)
+        extended_log=True,
+        num_inflight=args.num_inflight)
     return acc_values[ds_metainfo.saver_acc_ind] if len(acc_values) > 0 else None
 
 
@@ -11,7 +11,9 @@ import tensorflow as tf
 from common.logger_utils import initialize_logging
 from tensorflow2.utils import prepare_model
 from tensorflow2.tf2cv.models.model_store import _model_sha1
+from tensorflow2.compiled_steps import ShapeBucketer, get_eval_step
 from tensorflow2.dataset_utils import get_dataset_metainfo, get_val_data_source, get_test_data_source
+from tensorflow2.dataset_utils import get_val_data_pipeline, get_test_data_pipeline
 from tensorflow2.utils import get_composite_metric
 from tensorflow2.utils import report_accuracy
 
@@ -62,6 +64,29 @@ def add_eval_parser_arguments(parser):
         default=4,
         type=int,
         help="number of preprocessing workers")
+    parser.add_argument(
+        "--use-tfdata",
+        action="store_true",
+        help="use tf.data pipeline instead of Keras generators")
+    parser.add_argument(
+        "--tfdata-cache-mode",
+        type=str,
+        default="",
+        help="caching of decoded samples in tf.data pipeline. options are memory, disk, and snapshot")
+    parser.add_argument(
+        "--tfdata-cache-dir",
+        type=str,
+        default="",
+        help="directory for disk/snapshot cache of tf.data pipeline")
+    parser.add_argument(
+        "--jit-compile",
+        action="store_true",
+        help="compile step functions with XLA")
+    parser.add_argument(
+        "--spatial-bucket",
+        type=int,
+        default=0,
+        help="bucket multiple for padding of spatial input dimensions in compiled steps (0 for no padding)")
 
     parser.add_argument(
         "--batch-size",
@@ -180,11 +205,21 @@ def test_model(args,
     if not args.calc_flops_only:
         tic = time.time()
 
-        get_test_data_source_class = get_val_data_source if args.data_subset == "val" else get_test_data_source
-        test_data, total_img_count = get_test_data_source_class(
-            ds_metainfo=ds_metainfo,
-            batch_size=args.batch_size,
-            data_format=data_format)
+        if args.use_tfdata:
+            get_test_data_pipeline_class = get_val_data_pipeline if args.data_subset == "val" else\
+                get_test_data_pipeline
+            test_data, total_img_count = get_test_data_pipeline_class(
+                ds_metainfo=ds_metainfo,
+                batch_size=args.batch_size,
+                data_format=data_format,
+                cache_mode=args.tfdata_cache_mode,
+                cache_dir=args.tfdata_cache_dir)
+        else:
+            get_test_data_source_class = get_val_data_source if args.data_subset == "val" else get_test_data_source
+            test_data, total_img_count = get_test_data_source_class(
+                ds_metainfo=ds_metainfo,
+                batch_size=args.batch_size,
+                data_format=data_format)
         if args.data_subset == "val":
             test_metric = get_composite_metric(
                 metric_names=ds_metainfo.val_metric_names,
@@ -198,9 +233,19 @@ def test_model(args,
             from tqdm import tqdm
             test_data = tqdm(test_data)
 
+        if args.jit_compile:
+            eval_step = get_eval_step(
+                net=net,
+                bucketer=ShapeBucketer(
+                    batch_size=args.batch_size,
+                    spatial_multiple=args.spatial_bucket,
+                    data_format=data_format))
+        else:
+            eval_step = net
+
         processed_img_count = 0
         for test_images, test_labels in test_data:
-            predictions = net(test_images)
+            predictions = eval_step(test_images)
             test_metric.update(test_labels, predictions)
             processed_img_count += len(test_images)
             if processed_img_count >= total_img_count:
@@ -212,6 +257,8 @@ def test_model(args,
         logging.info("Test: {}".format(accuracy_msg))
         logging.info("Time cost: {:.4f} sec".format(
             time.time() - tic))
+        if args.jit_compile:
+            logging.info("Eval step traces: {}".format(eval_step.compiled_step.num_traces))
         acc_values = test_metric.get()[1]
         acc_values = acc_values if type(acc_values) == list else [acc_values]
     else:
@@ -0,0 +1,132 @@
+"""
+    Script for benchmarking person-crop pipeline for AlphaPose-style top-down pose estimation.
+"""
+
+import time
+import argparse
+import numpy as np
+from multiprocessing.pool import ThreadPool
+from pytorch.datasets.coco_hpe_dataset import alpha_pose_image_cropper, cv_cropBox
+
+
+def parse_args():
+    """
+    Create python script parameters.
+
+    Returns
+    -------
+    ArgumentParser
+        Resulted args.
+    """
+    parser = argparse.ArgumentParser(
+        description="Benchmark person-crop pipeline for top-down pose estimation",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument(
+        "--num-boxes",
+        type=str,
+        default="1,4,16,64",
+        help="comma-separated list of numbers of person boxes per frame")
+    parser.add_argument(
+        "--image-size",
+        type=int,
+        nargs=2,
+        default=(720, 1280),
+        help="source image size (height, width)")
+    parser.add_argument(
+        "--output-shape",
+        type=int,
+        nargs=2,
+        default=(256, 192),
+        help="crop size (height, width)")
+    parser.add_argument(
+        "--num-threads",
+        type=int,
+        default=4,
+        help="number of threads for parallel cropping")
+    parser.add_argument(
+        "--num-iters",
+        type=int,
+        default=20,
+        help="number of measured iterations")
+    args = parser.parse_args()
+    return args
+
+
+def reference_cropper(source_img,
+                      boxes,
+                      output_shape):
+    """
+    Reference per-box cropper (full image copy and padding for each box).
+    """
+    img_width, img_height = source_img.shape[1], source_img.shape[0]
+    tensors = np.zeros([boxes.shape[0], 3, output_shape[0], output_shape[1]])
+    out_boxes = np.zeros([boxes.shape[0], 4])
+    for i, box in enumerate(boxes):
+        img = source_img.copy()
+        box_width = box[2] - box[0]
+        box_height = box[3] - box[1]
+        scale_rate = 0.2 if box_width > 100 else 0.3
+        left = int(max(0, box[0] - box_width * scale_rate / 2))
+        up = int(max(0, box[1] - box_height * scale_rate / 2))
+        right = int(min(img_width - 1, max(left + 5, box[2] + box_width * scale_rate / 2)))
+        bottom = int(min(img_height - 1, max(up + 5, box[3] + box_height * scale_rate / 2)))
+        if (right - left < 1) or (bottom - up < 1):
+            continue
+        img = cv_cropBox(img, np.array((left, up)), np.array((right, bottom)), output_shape[0], output_shape[1])
+        img = img.astype(np.float32) / 255.0
+        img = img.transpose((2, 0, 1))
+        img[0] -= 0.406
+        img[1] -= 0.457
+        img[2] -= 0.480
+        tensors[i] = img
+        out_boxes[i] = (left, up, right, bottom)
+    return tensors, out_boxes
+
+
+def measure(func, num_iters):
+    """
+    Measure average execution time of the function.
+    """
+    func()
+    tic = time.time()
+    for _ in range(num_iters):
+        func()
+    return (time.time() - tic) / num_iters
+
+
+def main():
+    """
+    Main body of script.
+    """
+    args = parse_args()
+    rng = np.random.RandomState(0)
+    img_height, img_width = args.image_size
+    source_img = rng.randint(0, 256, size=(img_height, img_width, 3)).astype(np.uint8)
+    output_shape = tuple(args.output_shape)
+    thread_pool = ThreadPool(args.num_threads)
+
+    print("{:>6} {:>12} {:>12} {:>12} {:>8} {:>10}".format(
+        "boxes", "ref, ms", "batch, ms", "threads, ms", "speedup", "max_diff"))
+    for num_boxes in [int(n) for n in args.num_boxes.split(",")]:
+        xy = rng.rand(num_boxes, 2) * np.array([img_width * 0.8, img_height * 0.6])
+        wh = rng.rand(num_boxes, 2) * np.array([img_width * 0.2, img_height * 0.4]) + 10
+        boxes = np.concatenate((xy, xy + wh), axis=1)
+
+        ref_time = measure(lambda: reference_cropper(source_img, boxes, output_shape), args.num_iters)
+        batch_time = measure(lambda: alpha_pose_image_cropper(source_img, boxes, output_shape), args.num_iters)
+        thread_time = measure(
+            lambda: alpha_pose_image_cropper(source_img, boxes, output_shape, thread_pool=thread_pool),
+            args.num_iters)
+        ref_tensors, _ = reference_cropper(source_img, boxes, output_shape)
+        tensors, _ = alpha_pose_image_cropper(source_img, boxes, output_shape, thread_pool=thread_pool)
+        max_diff = np.abs(ref_tensors - tensors).max()
+
+        print("{:>6} {:>12.2f} {:>12.2f} {:>12.2f} {:>8.2f} {:>10.5f}".format(
+            num_boxes, ref_time * 1000, batch_time * 1000, thread_time * 1000,
+            ref_time / min(batch_time, thread_time), max_diff))
+
+    thread_pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+    Script for comparing throughput of the sequential and pooled/prefetching Chainer predictors.
+"""
+
+import time
+import argparse
+import numpy as np
+from chainer import global_config
+from chainer.iterators import SerialIterator
+from chainercv.utils import apply_to_iterator
+from chainer_.utils import prepare_model, Predictor
+from chainer_.datasets.imagenet1k_cls_dataset import ImageNet1KMetaInfo, ImageNetValTransform
+
+
+def parse_args():
+    """
+    Create python script parameters.
+
+    Returns
+    -------
+    ArgumentParser
+        Resulted args.
+    """
+    parser = argparse.ArgumentParser(
+        description="Benchmark Chainer predictor modes",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument(
+        "--models",
+        type=str,
+        default="resnet18,mobilenetv2_w1",
+        help="comma-separated list of models")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=32,
+        help="batch size")
+    parser.add_argument(
+        "--num-images",
+        type=int,
+        default=256,
+        help="number of synthetic images")
+    parser.add_argument(
+        "--image-size",
+        type=int,
+        default=320,
+        help="spatial size of raw synthetic images")
+    parser.add_argument(
+        "--num-workers",
+        type=str,
+        default="0,2,4",
+        help="comma-separated list of numbers of predictor threads")
+    parser.add_argument(
+        "--num-prefetch",
+        type=int,
+        default=2,
+        help="number of prefetched batches")
+    args = parser.parse_args()
+    return args
+
+
+def main():
+    """
+    Main body of script.
+    """
+    args = parse_args()
+    global_config.train = False
+
+    ds_metainfo = ImageNet1KMetaInfo()
+    transform = ImageNetValTransform(ds_metainfo=ds_metainfo)
+    rs = np.random.RandomState(0)
+    dataset = [((rs.rand(3, args.image_size, args.image_size) * 255.0).astype(np.float32), rs.randint(0, 1000))
+               for _ in range(args.num_images)]
+
+    def get_iterator():
+        return SerialIterator(dataset=dataset, batch_size=args.batch_size, repeat=False, shuffle=False)
+
+    print("{:>20} {:>8} {:>10} {:>10} {:>8} {:>6}".format(
+        "model", "workers", "seq, i/s", "pool, i/s", "speedup", "same"))
+    for model_name in args.models.split(","):
+        net = prepare_model(
+            model_name=model_name,
+            use_pretrained=False,
+            pretrained_model_file_path="")
+
+        # Warm-up:
+        Predictor(model=net, transform=transform)([img for img, _ in dataset[:args.batch_size]])
+
+        tic = time.time()
+        _, out_values, _ = apply_to_iterator(
+            func=Predictor(model=net, transform=transform),
+            iterator=get_iterator())
+        y = np.stack(list(out_values[0]))
+        seq_speed = args.num_images / (time.time() - tic)
+
+        for num_workers in [int(n) for n in args.num_workers.split(",")]:
+            predictor = Predictor(
+                model=net,
+                transform=transform,
+                num_workers=num_workers,
+                num_prefetch=args.num_prefetch)
+            tic = time.time()
+            y_pool = np.concatenate([preds for preds, _ in predictor.iterate(get_iterator())])
+            pool_speed = args.num_images / (time.time() - tic)
+            print("{:>20} {:>8} {:>10.1f} {:>10.1f} {:>8.2f} {:>6}".format(
+                model_name, num_workers, seq_speed, pool_speed, pool_speed / seq_speed,
+                str(np.allclose(y, y_pool, atol=1e-5))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+    Script for comparing CPU latency of original models and models with folded channel shuffles on PyTorch.
+"""
+
+import time
+import argparse
+import torch
+from pytorch.pytorchcv.model_provider import get_model
+from pytorch.pytorchcv.models.common import ChannelShuffle, ChannelShuffle2, fold_channel_shuffles
+from pytorch.pytorchcv.models.common import concat_channel_shuffle, concat_channel_shuffle2
+
+
+def parse_args():
+    """
+    Create python script parameters.
+
+    Returns
+    -------
+    ArgumentParser
+        Resulted args.
+    """
+    parser = argparse.ArgumentParser(
+        description="Benchmark folding of channel shuffles for the ShuffleNet family",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument(
+        "--models",
+        type=str,
+        default="shufflenet_g1_w1,shufflenet_g3_w1,shufflenet_g8_w1,shufflenetv2_w1,shufflenetv2_w2,shufflenetv2b_w1,"
+                "menet108_8x1_g3,igcv3_w1",
+        help="comma-separated list of models")
+    parser.add_argument(
+        "--batch-sizes",
+        type=str,
+        default="1,8",
+        help="comma-separated list of batch sizes")
+    parser.add_argument(
+        "--num-iters",
+        type=int,
+        default=20,
+        help="number of measured iterations")
+    args = parser.parse_args()
+    return args
+
+
+def measure(net,
+            x,
+            num_iters):
+    """
+    Measure model output and the best inference time.
+    """
+    best_time = float("inf")
+    with torch.no_grad():
+        y = net(x)
+        for _ in range(num_iters):
+            tic = time.time()
+            net(x)
+            best_time = min(best_time, time.time() - tic)
+    return y, best_time
+
+
+def count_shuffles(net):
+    """
+    Count remaining and concatenation-merged channel shuffles in the converted model.
+    """
+    modules = dict(net.named_modules())
+    remaining = 0
+    merged = 0
+    for node in net.graph.nodes:
+        if (node.op == "call_module") and isinstance(modules[node.target], (ChannelShuffle, ChannelShuffle2)):
+            remaining += 1
+        elif (node.op == "call_function") and (node.target in (concat_channel_shuffle, concat_channel_shuffle2)):
+            merged += 1
+    return remaining, merged
+
+
+def main():
+    """
+    Main body of script.
+    """
+    args = parse_args()
+
+    print("{:>18} {:>6} {:>10} {:>10} {:>8} {:>8} {:>8} {:>8} {:>10}".format(
+        "model", "batch", "orig, ms", "fold, ms", "speedup", "folded", "merged", "kept", "max_diff"))
+    for model_name in args.models.split(","):
+        net = get_model(model_name, pretrained=False)
+        net.eval()
+        total = sum([isinstance(m, (ChannelShuffle, ChannelShuffle2)) for m in net.modules()])
+        folded_net = fold_channel_shuffles(net)
+        remaining, merged = count_shuffles(folded_net)
+        for batch_size in [int(b) for b in args.batch_sizes.split(",")]:
+            x = torch.randn(batch_size, 3, net.in_size[0], net.in_size[1])
+            y, orig_time = measure(net, x, args.num_iters)
+            y_folded, folded_time = measure(folded_net, x, args.num_iters)
+            print("{:>18} {:>6} {:>10.2f} {:>10.2f} {:>8.2f} {:>8} {:>8} {:>8} {:>10.6f}".format(
+                model_name, batch_size, orig_time * 1000, folded_time * 1000, orig_time / folded_time,
+                total - remaining - merged, merged, remaining, float((y - y_folded).abs().max())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+    Script for comparing throughput of synchronous and overlapped (multi-context, background metric) Gluon evaluation.
+"""
+
+import time
+import argparse
+from functools import partial
+import numpy as np
+import mxnet as mx
+from mxnet.gluon.utils import split_and_load
+from gluon.utils import prepare_mx_context, prepare_model, validate, validate_async, get_composite_metric
+
+
+def parse_args():
+    """
+    Create python script parameters.
+
+    Returns
+    -------
+    ArgumentParser
+        Resulted args.
+    """
+    parser = argparse.ArgumentParser(
+        description="Benchmark overlapped Gluon evaluation",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument(
+        "--models",
+        type=str,
+        default="resnet18,mobilenetv2_w1",
+        help="comma-separated list of models")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=32,
+        help="batch size per context")
+    parser.add_argument(
+        "--num-batches",
+        type=int,
+        default=20,
+        help="number of batches in the synthetic dataset")
+    parser.add_argument(
+        "--num-cpu-contexts",
+        type=str,
+        default="1,2",
+        help="comma-separated list of numbers of CPU contexts")
+    parser.add_argument(
+        "--num-inflight",
+        type=str,
+        default="2,4",
+        help="comma-separated list of numbers of batches in flight")
+    parser.add_argument(
+        "-j",
+        "--num-data-workers",
+        dest="num_workers",
+        default=4,
+        type=int,
+        help="number of preprocessing workers")
+    args = parser.parse_args()
+    return args
+
+
+def batch_fn(batch, ctx):
+    """
+    Split a batch between contexts.
+    """
+    data = split_and_load(batch[0], ctx_list=ctx, batch_axis=0)
+    label = split_and_load(batch[1], ctx_list=ctx, batch_axis=0)
+    return data, label
+
+
+def measure(validate_fn,
+            net,
+            val_data,
+            ctx,
+            num_images):
+    """
+    Measure evaluation throughput (images per second) and metric values.
+    """
+    metric = get_composite_metric(["Top1Error", "TopKError"], [{}, {"top_k": 5}])
+    tic = time.time()
+    validate_fn(
+        metric=metric,
+        net=net,
+        val_data=val_data,
+        batch_fn=batch_fn,
+        data_source_needs_reset=False,
+        dtype="float32",
+        ctx=ctx)
+    mx.nd.waitall()
+    return num_images / (time.time() - tic), metric.get()[1]
+
+
+def main():
+    """
+    Main body of script.
+    """
+    args = parse_args()
+
+    print("{:>20} {:>6} {:>9} {:>10} {:>10} {:>8} {:>6}".format(
+        "model", "ctxs", "inflight", "sync, i/s", "async, i/s", "speedup", "same"))
+    for model_name in args.models.split(","):
+        for num_cpu_contexts in [int(n) for n in args.num_cpu_contexts.split(",")]:
+            ctx, batch_size = prepare_mx_context(
+                num_gpus=0,
+                batch_size=args.batch_size,
+                num_cpu_contexts=num_cpu_contexts)
+            net = prepare_model(
+                model_name=model_name,
+                use_pretrained=False,
+                pretrained_model_file_path="",
+                dtype="float32",
+                ctx=ctx)
+            num_images = batch_size * args.num_batches
+            rs = np.random.RandomState(0)
+            dataset = mx.gluon.data.ArrayDataset(
+                rs.rand(num_images, 3, 224, 224).astype(np.float32),
+                rs.randint(0, 1000, num_images).astype(np.float32))
+            val_data = mx.gluon.data.DataLoader(
+                dataset=dataset,
+                batch_size=batch_size,
+                shuffle=False,
+                num_workers=args.num_workers)
+
+            # Warm-up (graph building and memory planning):
+            measure(validate, net, val_data, ctx, num_images)
+            sync_speed, sync_values = measure(validate, net, val_data, ctx, num_images)
+            for num_inflight in [int(n) for n in args.num_inflight.split(",")]:
+                async_speed, async_values = measure(
+                    partial(validate_async, num_inflight=num_inflight), net, val_data, ctx, num_images)
+                print("{:>20} {:>6} {:>9} {:>10.1f} {:>10.1f} {:>8.2f} {:>6}".format(
+                    model_name, num_cpu_contexts, num_inflight, sync_speed, async_speed, async_speed / sync_speed,
+                    str(np.allclose(sync_values, async_values))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+    Script for comparing startup time and throughput of regular and cached hybridized (SymbolBlock) Gluon models.
+"""
+
+import time
+import shutil
+import argparse
+import tempfile
+import mxnet as mx
+from gluon.utils import prepare_model
+
+
+def parse_args():
+    """
+    Create python script parameters.
+
+    Returns
+    -------
+    ArgumentParser
+        Resulted args.
+    """
+    parser = argparse.ArgumentParser(
+        description="Benchmark cached hybridized Gluon models",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument(
+        "--models",
+        type=str,
+        default="resnet18,mobilenetv2_w1,shufflenetv2_w1",
+        help="comma-separated list of models")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=16,
+        help="batch size")
+    parser.add_argument(
+        "--input-size",
+        type=int,
+        default=224,
+        help="spatial size of the input")
+    parser.add_argument(
+        "--dtype",
+        type=str,
+        default="float32",
+        help="base data type for tensors")
+    parser.add_argument(
+        "--num-iters",
+        type=int,
+        default=10,
+        help="number of measured iterations")
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default="",
+        help="directory for cached models (temporary directory if empty)")
+    args = parser.parse_args()
+    return args
+
+
+def startup(model_name,
+            args,
+            ctx,
+            cache_dir):
+    """
+    Measure time of model preparation and the first (graph building) forward pass.
+    """
+    tic = time.time()
+    net = prepare_model(
+        model_name=model_name,
+        use_pretrained=False,
+        pretrained_model_file_path="",
+        dtype=args.dtype,
+        ctx=ctx,
+        symbol_cache_dir=cache_dir,
+        input_shape=(args.batch_size, 3, args.input_size, args.input_size))
+    x = mx.nd.random.uniform(shape=(args.batch_size, 3, args.input_size, args.input_size), ctx=ctx).astype(args.dtype)
+    net(x).wait_to_read()
+    return net, x, time.time() - tic
+
+
+def measure(net,
+            x,
+            num_iters):
+    """
+    Measure model output and throughput (images per second).
+    """
+    y = net(x)
+    y.wait_to_read()
+    tic = time.time()
+    for _ in range(num_iters):
+        net(x).wait_to_read()
+    return y, num_iters * x.shape[0] / (time.time() - tic)
+
+
+def main():
+    """
+    Main body of script.
+    """
+    args = parse_args()
+    ctx = mx.cpu()
+    cache_dir = args.cache_dir if args.cache_dir else tempfile.mkdtemp()
+
+    print("{:>20} {:>10} {:>10} {:>10} {:>10} {:>10} {:>10}".format(
+        "model", "cold, s", "export, s", "cached, s", "img/s", "cached", "max_diff"))
+    try:
+        for model_name in args.models.split(","):
+            net, x, cold_time = startup(model_name, args, ctx, "")
+            exported_net, _, export_time = startup(model_name, args, ctx, cache_dir)
+            cached_net, _, cached_time = startup(model_name, args, ctx, cache_dir)
+            _, speed = measure(net, x, args.num_iters)
+            y_cached, cached_speed = measure(cached_net, x, args.num_iters)
+            # Weights are random, so the cached model is compared with the exported one:
+            max_diff = (exported_net(x) - y_cached).abs().max().asscalar()
+            print("{:>20} {:>10.2f} {:>10.2f} {:>10.2f} {:>10.1f} {:>10.1f} {:>10.6f}".format(
+                model_name, cold_time, export_time, cached_time, speed, cached_speed, max_diff))
+    finally:
+        if not args.cache_dir:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
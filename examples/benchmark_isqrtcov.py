@@ -0,0 +1,93 @@
+"""
+    Script for comparing separate and fused iSQRT-COV pooling implementations on PyTorch.
+"""
+
+import time
+import argparse
+import torch
+from pytorch.pytorchcv.models.isqrtcovresnet import iSQRTCOVPool
+
+
+def parse_args():
+    """
+    Create python script parameters.
+
+    Returns
+    -------
+    ArgumentParser
+        Resulted args.
+    """
+    parser = argparse.ArgumentParser(
+        description="Benchmark iSQRT-COV pooling",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=32,
+        help="batch size")
+    parser.add_argument(
+        "--channels",
+        type=str,
+        default="256,512",
+        help="comma-separated list of numbers of input channels")
+    parser.add_argument(
+        "--spatial-size",
+        type=int,
+        default=14,
+        help="spatial size of input features")
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=8,
+        help="batch chunk size for the chunked mode")
+    parser.add_argument(
+        "--num-iters",
+        type=int,
+        default=5,
+        help="number of measured iterations")
+    args = parser.parse_args()
+    return args
+
+
+def measure(pool,
+            x,
+            num_iters,
+            backward):
+    """
+    Measure average time of forward (and backward) pass.
+    """
+    def step():
+        if backward:
+            y = pool(x)
+            y.sum().backward()
+        else:
+            with torch.no_grad():
+                pool(x)
+
+    step()
+    tic = time.time()
+    for _ in range(num_iters):
+        step()
+    return (time.time() - tic) / num_iters
+
+
+def main():
+    """
+    Main body of script.
+    """
+    args = parse_args()
+
+    print("{:>8} {:>8} {:>12} {:>12} {:>12} {:>8}".format(
+        "channels", "mode", "separate, ms", "fused, ms", "chunked, ms", "speedup"))
+    for channels in [int(c) for c in args.channels.split(",")]:
+        x = torch.randn(args.batch_size, channels, args.spatial_size, args.spatial_size, requires_grad=True)
+        pools = [iSQRTCOVPool(fused=False), iSQRTCOVPool(), iSQRTCOVPool(chunk_size=args.chunk_size)]
+        for backward in [False, True]:
+            times = [measure(pool, x, args.num_iters, backward) for pool in pools]
+            print("{:>8} {:>8} {:>12.2f} {:>12.2f} {:>12.2f} {:>8.2f}".format(
+                channels, "fwd+bwd" if backward else "fwd", times[0] * 1000, times[1] * 1000, times[2] * 1000,
+                times[0] / times[1]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+    Script for comparing execution modes of mixed convolutions (split, fused, autotuned) for MixNet models on PyTorch.
+"""
+
+import time
+import argparse
+import torch
+from pytorch.pytorchcv.model_provider import get_model
+from pytorch.pytorchcv.models.mixnet import MixConv, autotune_mixconv
+
+
+def parse_args():
+    """
+    Create python script parameters.
+
+    Returns
+    -------
+    ArgumentParser
+        Resulted args.
+    """
+    parser = argparse.ArgumentParser(
+        description="Benchmark MixConv execution modes for MixNet",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument(
+        "--models",
+        type=str,
+        default="mixnet_s,mixnet_m,mixnet_l",
+        help="comma-separated list of models")
+    parser.add_argument(
+        "--batch-sizes",
+        type=str,
+        default="1,8",
+        help="comma-separated list of batch sizes")
+    parser.add_argument(
+        "--num-iters",
+        type=int,
+        default=10,
+        help="number of measured iterations")
+    args = parser.parse_args()
+    return args
+
+
+def measure(net,
+            x,
+            num_iters):
+    """
+    Measure model output and average inference time.
+    """
+    with torch.no_grad():
+        y = net(x)
+        tic = time.time()
+        for _ in range(num_iters):
+            net(x)
+    return y, (time.time() - tic) / num_iters
+
+
+def set_mode(net,
+             mode):
+    """
+    Set execution mode for all fusable mixed convolutions.
+    """
+    for module in net.modules():
+        if isinstance(module, MixConv) and module.fusable:
+            module.mode = mode
+
+
+def main():
+    """
+    Main body of script.
+    """
+    args = parse_args()
+
+    print("{:>10} {:>6} {:>10} {:>10} {:>10} {:>12} {:>8} {:>10}".format(
+        "model", "batch", "split, ms", "fused, ms", "tuned, ms", "fused/total", "speedup", "max_diff"))
+    for model_name in args.models.split(","):
+        net = get_model(model_name, pretrained=False)
+        net.eval()
+        for batch_size in [int(b) for b in args.batch_sizes.split(",")]:
+            x = torch.randn(batch_size, 3, net.in_size[0], net.in_size[1])
+            set_mode(net, "split")
+            y, split_time = measure(net, x, args.num_iters)
+            set_mode(net, "fused")
+            y_fused, fused_time = measure(net, x, args.num_iters)
+            modes = autotune_mixconv(net, x)
+            y_tuned, tuned_time = measure(net, x, args.num_iters)
+            num_fused = sum([mode == "fused" for mode in modes.values()])
+            print("{:>10} {:>6} {:>10.2f} {:>10.2f} {:>10.2f} {:>12} {:>8.2f} {:>10.6f}".format(
+                model_name, batch_size, split_time * 1000, fused_time * 1000, tuned_time * 1000,
+                "{}/{}".format(num_fused, len(modes)), split_time / tuned_time,
+                float(max((y - y_fused).abs().max(), (y - y_tuned).abs().max()))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+    Script for comparing CPU latency of original and converted (fused) Oct-ResNet models on PyTorch.
+"""
+
+import copy
+import time
+import argparse
+import torch
+from pytorch.pytorchcv.model_provider import get_model
+from pytorch.pytorchcv.models.octresnet import convert_octresnet_for_inference
+
+
+def parse_args():
+    """
+    Create python script parameters.
+
+    Returns
+    -------
+    ArgumentParser
+        Resulted args.
+    """
+    parser = argparse.ArgumentParser(
+        description="Benchmark fused inference conversion for Oct-ResNet",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument(
+        "--models",
+        type=str,
+        default="octresnet10_ad2,octresnet50b_ad2",
+        help="comma-separated list of models")
+    parser.add_argument(
+        "--batch-sizes",
+        type=str,
+        default="1,8",
+        help="comma-separated list of batch sizes")
+    parser.add_argument(
+        "--num-iters",
+        type=int,
+        default=10,
+        help="number of measured iterations")
+    parser.add_argument(
+        "--use-pretrained",
+        action="store_true",
+        help="use pretrained weights (random weights otherwise)")
+    args = parser.parse_args()
+    return args
+
+
+def measure(net,
+            x,
+            num_iters):
+    """
+    Measure model output and average inference time.
+    """
+    with torch.no_grad():
+        y = net(x)
+        tic = time.time()
+        for _ in range(num_iters):
+            net(x)
+    return y, (time.time() - tic) / num_iters
+
+
+def main():
+    """
+    Main body of script.
+    """
+    args = parse_args()
+
+    print("{:>22} {:>6} {:>10} {:>12} {:>8} {:>10}".format(
+        "model", "batch", "orig, ms", "fused, ms", "speedup", "max_diff"))
+    for model_name in args.models.split(","):
+        net = get_model(model_name, pretrained=args.use_pretrained)
+        net.eval()
+        fused_net = convert_octresnet_for_inference(copy.deepcopy(net))
+        for batch_size in [int(b) for b in args.batch_sizes.split(",")]:
+            x = torch.randn(batch_size, 3, net.in_size[0], net.in_size[1])
+            y, orig_time = measure(net, x, args.num_iters)
+            y_fused, fused_time = measure(fused_net, x, args.num_iters)
+            print("{:>22} {:>6} {:>10.2f} {:>12.2f} {:>8.2f} {:>10.6f}".format(
+                model_name, batch_size, orig_time * 1000, fused_time * 1000, orig_time / fused_time,
+                float((y - y_fused).abs().max())))
+
+
+if __name__ == "__main__":
+    main()
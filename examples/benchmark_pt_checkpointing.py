@@ -0,0 +1,145 @@
+"""
+    Script for measuring memory/throughput trade-off of activation checkpointing on PyTorch.
+"""
+
+import time
+import argparse
+import torch
+from torch.autograd.graph import saved_tensors_hooks
+from pytorch.pytorchcv.model_provider import get_model
+from pytorch.activation_checkpointing import enable_checkpointing, disable_checkpointing
+
+
+def parse_args():
+    """
+    Create python script parameters.
+
+    Returns
+    -------
+    ArgumentParser
+        Resulted args.
+    """
+    parser = argparse.ArgumentParser(
+        description="Benchmark activation checkpointing for PyTorch models",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument(
+        "--models",
+        type=str,
+        default="resnet152,densenet201,nasnet_6a4032",
+        help="comma-separated list of models")
+    parser.add_argument(
+        "--segments",
+        type=int,
+        default=1,
+        help="number of checkpointed segments per stage")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=4,
+        help="batch size")
+    parser.add_argument(
+        "--input-size",
+        type=int,
+        default=0,
+        help="spatial size of the input (default is the model input size)")
+    parser.add_argument(
+        "--num-iters",
+        type=int,
+        default=3,
+        help="number of measured training iterations")
+    parser.add_argument(
+        "--num-gpus",
+        type=int,
+        default=0,
+        help="number of gpus to use (0 or 1)")
+    args = parser.parse_args()
+    return args
+
+
+def measure(net,
+            x,
+            num_iters,
+            use_cuda):
+    """
+    Measure peak activation memory and training step time.
+
+    Parameters:
+    ----------
+    net : Module
+        Model.
+    x : Tensor
+        Input tensor.
+    num_iters : int
+        Number of measured iterations.
+    use_cuda : bool
+        Whether to use CUDA.
+
+    Returns
+    -------
+    float
+        Peak memory (MB). Peak allocated memory for CUDA or peak size of tensors saved for backward for CPU.
+    float
+        Training step time (sec).
+    """
+    saved_bytes = [0, 0]
+
+    def pack_hook(tensor):
+        saved_bytes[0] += tensor.numel() * tensor.element_size()
+        saved_bytes[1] = max(saved_bytes[1], saved_bytes[0])
+        return tensor
+
+    def unpack_hook(tensor):
+        return tensor
+
+    def step():
+        saved_bytes[0] = 0
+        net.zero_grad()
+        with saved_tensors_hooks(pack_hook, unpack_hook):
+            y = net(x)
+        y.sum().backward()
+
+    step()
+    if use_cuda:
+        torch.cuda.synchronize()
+        torch.cuda.reset_peak_memory_stats()
+    saved_bytes[1] = 0
+    tic = time.time()
+    for _ in range(num_iters):
+        step()
+    if use_cuda:
+        torch.cuda.synchronize()
+    step_time = (time.time() - tic) / num_iters
+    peak_bytes = torch.cuda.max_memory_allocated() if use_cuda else saved_bytes[1]
+    return peak_bytes / 2 ** 20, step_time
+
+
+def main():
+    """
+    Main body of script.
+    """
+    args = parse_args()
+    use_cuda = (args.num_gpus > 0)
+
+    print("{:>20} {:>12} {:>12} {:>8} {:>10} {:>10} {:>8}".format(
+        "model", "mem, MB", "mem_ckpt, MB", "mem_x", "step, s", "step_ckpt", "slowdown"))
+    for model_name in args.models.split(","):
+        net = get_model(model_name, pretrained=False)
+        net.train()
+        if use_cuda:
+            net = net.cuda()
+        in_size = (args.input_size, args.input_size) if args.input_size > 0 else net.in_size
+        x = torch.randn(args.batch_size, 3, in_size[0], in_size[1])
+        if use_cuda:
+            x = x.cuda()
+
+        mem, step_time = measure(net, x, args.num_iters, use_cuda)
+        enable_checkpointing(net, segments=args.segments)
+        mem_ckpt, step_time_ckpt = measure(net, x, args.num_iters, use_cuda)
+        disable_checkpointing(net)
+
+        print("{:>20} {:>12.1f} {:>12.1f} {:>8.2f} {:>10.3f} {:>10.3f} {:>8.2f}".format(
+            model_name, mem, mem_ckpt, mem / mem_ckpt, step_time, step_time_ckpt, step_time_ckpt / step_time))
+
+
+if __name__ == "__main__":
+    main()
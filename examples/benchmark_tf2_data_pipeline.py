@@ -0,0 +1,121 @@
+"""
+    Script for comparing throughput of Keras generator data sources and tf.data pipelines for TensorFlow 2.0 datasets.
+"""
+
+import os
+import time
+import argparse
+from tensorflow2.dataset_utils import get_dataset_metainfo, get_data_pipeline
+from tensorflow2.dataset_utils import get_train_data_source, get_val_data_source, get_test_data_source
+
+
+def parse_args():
+    """
+    Create python script parameters.
+
+    Returns
+    -------
+    ArgumentParser
+        Resulted args.
+    """
+    parser = argparse.ArgumentParser(
+        description="Benchmark data sources for TensorFlow 2.0 datasets",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument(
+        "--dataset",
+        type=str,
+        default="ImageNet1K",
+        help="dataset name. options are ImageNet1K, CUB200_2011, CIFAR10, CIFAR100, SVHN, VOC, ADE20K, Cityscapes, "
+             "CocoSeg")
+    parser.add_argument(
+        "--work-dir",
+        type=str,
+        default=os.path.join("..", "imgclsmob_data"),
+        help="path to working directory only for dataset root path preset")
+
+    args, _ = parser.parse_known_args()
+    dataset_metainfo = get_dataset_metainfo(dataset_name=args.dataset)
+    dataset_metainfo.add_dataset_parser_arguments(
+        parser=parser,
+        work_dir_path=args.work_dir)
+
+    parser.add_argument(
+        "--data-subset",
+        type=str,
+        default="val",
+        help="data subset. options are train, val, and test")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=32,
+        help="batch size")
+    parser.add_argument(
+        "--num-batches",
+        type=int,
+        default=50,
+        help="number of measured batches")
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default="",
+        help="directory for disk/snapshot cache (empty for skipping these modes)")
+    args = parser.parse_args()
+    return args
+
+
+def measure(data,
+            num_batches,
+            warm_cache=False):
+    """
+    Measure throughput of a data source (after a full warm-up epoch if the pipeline is cached).
+    """
+    if warm_cache:
+        for _ in data:
+            pass
+    num_images = 0
+    tic = None
+    for i, (images, _) in enumerate(data):
+        if i == 0:
+            tic = time.time()
+        else:
+            num_images += int(images.shape[0])
+        if i == num_batches:
+            break
+    return num_images / (time.time() - tic) if num_images > 0 else 0.0
+
+
+def main():
+    """
+    Main body of script.
+    """
+    args = parse_args()
+
+    ds_metainfo = get_dataset_metainfo(dataset_name=args.dataset)
+    ds_metainfo.update(args=args)
+
+    get_data_source = {"train": get_train_data_source, "val": get_val_data_source,
+                       "test": get_test_data_source}[args.data_subset]
+    data, _ = get_data_source(
+        ds_metainfo=ds_metainfo,
+        batch_size=args.batch_size)
+    base_speed = measure(data, args.num_batches)
+
+    modes = [("tf.data", ""), ("tf.data+memory", "memory")]
+    if args.cache_dir:
+        modes += [("tf.data+disk", "disk"), ("tf.data+snapshot", "snapshot")]
+
+    print("{:>18} {:>10} {:>8}".format("source", "img/s", "speedup"))
+    print("{:>18} {:>10.1f} {:>8.2f}".format("generator", base_speed, 1.0))
+    for name, cache_mode in modes:
+        data, _ = get_data_pipeline(
+            ds_metainfo=ds_metainfo,
+            subset=args.data_subset,
+            batch_size=args.batch_size,
+            cache_mode=cache_mode,
+            cache_dir=args.cache_dir)
+        speed = measure(data, args.num_batches, warm_cache=bool(cache_mode))
+        print("{:>18} {:>10.1f} {:>8.2f}".format(name, speed, speed / base_speed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+    Script for comparing graph and XLA-compiled (`jit_compile`) step functions for TensorFlow 2.0 models on CPU.
+"""
+
+import re
+import time
+import argparse
+import numpy as np
+import tensorflow as tf
+from tensorflow2.tf2cv.model_provider import get_model, _models
+from tensorflow2.compiled_steps import ShapeBucketer, get_eval_step, get_train_step
+
+
+def parse_args():
+    """
+    Create python script parameters.
+
+    Returns
+    -------
+    ArgumentParser
+        Resulted args.
+    """
+    parser = argparse.ArgumentParser(
+        description="Benchmark XLA-compiled steps for TensorFlow 2.0 models",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument(
+        "--models",
+        type=str,
+        default="resnet18,mobilenetv2_w1,shufflenetv2_w1,squeezenet_v1_1",
+        help="comma-separated list of models")
+    parser.add_argument(
+        "--model-filter",
+        type=str,
+        default="",
+        help="regular expression for model names from the model zoo (instead of the list)")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=8,
+        help="batch size")
+    parser.add_argument(
+        "--num-iters",
+        type=int,
+        default=5,
+        help="number of measured iterations")
+    parser.add_argument(
+        "--train",
+        action="store_true",
+        help="measure training steps as well")
+    args = parser.parse_args()
+    return args
+
+
+def measure(step,
+            args,
+            num_iters):
+    """
+    Measure step output and best time of the step.
+    """
+    y = step(*args)
+    best_time = float("inf")
+    for _ in range(num_iters):
+        tic = time.time()
+        step(*args)
+        best_time = min(best_time, time.time() - tic)
+    return y, best_time
+
+
+def main():
+    """
+    Main body of script.
+    """
+    args = parse_args()
+
+    if args.model_filter:
+        pattern = re.compile(args.model_filter)
+        model_names = [name for name in _models.keys() if pattern.search(name)]
+    else:
+        model_names = args.models.split(",")
+
+    print("{:>24} {:>10} {:>10} {:>10} {:>8} {:>10} {:>7} {:>10} {:>10} {:>8}".format(
+        "model", "in_size", "graph, ms", "xla, ms", "speedup", "max_diff", "traces", "tr.graph", "tr.xla",
+        "speedup"))
+    for model_name in model_names:
+        try:
+            net = get_model(model_name, pretrained=False)
+            in_size = net.in_size
+            x = tf.random.uniform((args.batch_size, in_size[0], in_size[1], 3))
+
+            graph_step = tf.function(lambda images: net(images, training=False))
+            bucketer = ShapeBucketer(batch_size=args.batch_size)
+            xla_step = get_eval_step(net, bucketer=bucketer)
+            y, graph_time = measure(graph_step, (x,), args.num_iters)
+            y_xla, xla_time = measure(xla_step, (x,), args.num_iters)
+            # The last partial batch must reuse the compiled step:
+            xla_step(x[:max(args.batch_size // 2, 1)])
+            max_diff = float(np.abs(np.asarray(y) - np.asarray(y_xla)).max())
+
+            train_msg = "{:>10} {:>10} {:>8}".format("-", "-", "-")
+            if args.train:
+                labels = tf.zeros((args.batch_size,), dtype=tf.float32)
+                graph_train_step = get_train_step(
+                    net, tf.keras.optimizers.SGD(learning_rate=1e-6), jit_compile=False)
+                xla_train_step = get_train_step(
+                    net, tf.keras.optimizers.SGD(learning_rate=1e-6), bucketer=bucketer)
+                _, graph_train_time = measure(graph_train_step, (x, labels), args.num_iters)
+                _, xla_train_time = measure(xla_train_step, (x, labels), args.num_iters)
+                train_msg = "{:>10.2f} {:>10.2f} {:>8.2f}".format(
+                    graph_train_time * 1000, xla_train_time * 1000, graph_train_time / xla_train_time)
+
+            print("{:>24} {:>10} {:>10.2f} {:>10.2f} {:>8.2f} {:>10.6f} {:>7} {}".format(
+                model_name, "{}x{}".format(in_size[0], in_size[1]), graph_time * 1000, xla_time * 1000,
+                graph_time / xla_time, max_diff, xla_step.compiled_step.num_traces, train_msg))
+        except Exception as e:
+            print("{:>24} error: {}: {}".format(model_name, type(e).__name__, str(e).split("\n")[0]))
+        tf.keras.backend.clear_session()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+    Script for measuring storage size and latency of bit-packed WRN-1bit models on PyTorch (cached and per-call
+    unpacking of weights, reference popcount kernel).
+"""
+
+import copy
+import time
+import argparse
+import torch
+from pytorch.pytorchcv.model_provider import get_model
+from pytorch.bitpacked_inference import pack_binarized_convs, calc_model_memory
+
+
+def parse_args():
+    """
+    Create python script parameters.
+
+    Returns
+    -------
+    ArgumentParser
+        Resulted args.
+    """
+    parser = argparse.ArgumentParser(
+        description="Benchmark bit-packed inference for WRN-1bit models",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument(
+        "--models",
+        type=str,
+        default="wrn20_10_1bit_cifar10,wrn20_10_1bit_cifar100,wrn20_10_1bit_svhn",
+        help="comma-separated list of models")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1,
+        help="batch size")
+    parser.add_argument(
+        "--num-iters",
+        type=int,
+        default=3,
+        help="number of measured iterations")
+    parser.add_argument(
+        "--act-bits",
+        type=int,
+        default=8,
+        help="number of bits for activations in the popcount kernel")
+    args = parser.parse_args()
+    return args
+
+
+def measure(net,
+            x,
+            num_iters):
+    """
+    Measure model output and average inference time.
+    """
+    with torch.no_grad():
+        y = net(x)
+        tic = time.time()
+        for _ in range(num_iters):
+            net(x)
+    return y, (time.time() - tic) / num_iters
+
+
+def main():
+    """
+    Main body of script.
+    """
+    args = parse_args()
+
+    print("{:>24} {:>10} {:>10} {:>9} {:>9} {:>9} {:>9} {:>9} {:>6} {:>10} {:>6}".format(
+        "model", "mem, MB", "packed,MB", "mem_x", "fp32, s", "cached,s", "unpack,s", "popcnt,s", "exact", "popcnt_err",
+        "top1"))
+    for model_name in args.models.split(","):
+        net = get_model(model_name, pretrained=False)
+        net.eval()
+        x = torch.randn(args.batch_size, 3, net.in_size[0], net.in_size[1])
+
+        cached_net = copy.deepcopy(net)
+        pack_binarized_convs(cached_net)
+        unpack_net = copy.deepcopy(net)
+        pack_binarized_convs(unpack_net, cache_weight=False)
+        popcount_net = copy.deepcopy(net)
+        pack_binarized_convs(popcount_net, use_popcount=True, act_bits=args.act_bits)
+
+        y, fp32_time = measure(net, x, args.num_iters)
+        y_cached, cached_time = measure(cached_net, x, args.num_iters)
+        y_unpack, unpack_time = measure(unpack_net, x, args.num_iters)
+        y_popcount, popcount_time = measure(popcount_net, x, args.num_iters)
+        mem = calc_model_memory(net)
+        # Stored (state_dict) size, cached unpacked weights aren't included:
+        packed_mem = calc_model_memory(unpack_net)
+
+        print("{:>24} {:>10.2f} {:>10.2f} {:>9.2f} {:>9.3f} {:>9.3f} {:>9.3f} {:>9.3f} {:>6} {:>10.5f} {:>6.2f}".format(
+            model_name, mem / 2 ** 20, packed_mem / 2 ** 20, mem / packed_mem, fp32_time, cached_time, unpack_time,
+            popcount_time, str(torch.equal(y, y_cached) and torch.equal(y, y_unpack)), float((y - y_popcount).abs().max()),
+            float((y.argmax(dim=1) == y_popcount.argmax(dim=1)).float().mean())))
+
+
+if __name__ == "__main__":
+    main()
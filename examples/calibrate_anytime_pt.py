@@ -0,0 +1,152 @@
+"""
+    Script for calibrating confidence thresholds of anytime (early-exit) inference for MSDNet on PyTorch.
+"""
+
+import os
+import json
+import logging
+import argparse
+import numpy as np
+from common.logger_utils import initialize_logging
+from common.anytime_calibration import calibrate_exit_thresholds, simulate_early_exit
+from pytorch.utils import prepare_pt_context, prepare_model, report_accuracy
+from pytorch.dataset_utils import get_dataset_metainfo
+from pytorch.anytime_inference import calc_exit_flops, collect_exit_outputs, validate_anytime
+from eval_pt import add_eval_cls_parser_arguments, prepare_dataset_metainfo, prepare_data_source, prepare_metric
+
+
+def parse_args():
+    """
+    Parse python script parameters.
+
+    Returns
+    -------
+    ArgumentParser
+        Resulted args.
+    """
+    parser = argparse.ArgumentParser(
+        description="Calibrate anytime inference thresholds for MSDNet (PyTorch)",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument(
+        "--dataset",
+        type=str,
+        default="ImageNet1K",
+        help="dataset name. options are ImageNet1K, CIFAR10")
+    parser.add_argument(
+        "--work-dir",
+        type=str,
+        default=os.path.join("..", "imgclsmob_data"),
+        help="path to working directory only for dataset root path preset")
+
+    args, _ = parser.parse_known_args()
+    dataset_metainfo = get_dataset_metainfo(dataset_name=args.dataset)
+    dataset_metainfo.add_dataset_parser_arguments(
+        parser=parser,
+        work_dir_path=args.work_dir)
+
+    add_eval_cls_parser_arguments(parser)
+
+    parser.add_argument(
+        "--budgets",
+        type=str,
+        default="0.25,0.5,0.75",
+        help="comma-separated list of target average FLOPs as fractions of FLOPs of the full cascade")
+    parser.add_argument(
+        "--check-subset",
+        type=str,
+        default="",
+        help="data subset for checking of calibrated thresholds by real early-exit inference (empty for skipping)")
+    parser.add_argument(
+        "--thresholds-file",
+        type=str,
+        default="",
+        help="output JSON file for calibrated thresholds")
+
+    args = parser.parse_args()
+    return args
+
+
+def main():
+    """
+    Main body of script.
+    """
+    args = parse_args()
+
+    initialize_logging(
+        logging_dir_path=args.save_dir,
+        logging_file_name=args.logging_file_name,
+        script_args=args,
+        log_packages=args.log_packages,
+        log_pip_packages=args.log_pip_packages)
+
+    ds_metainfo = prepare_dataset_metainfo(args=args)
+    use_cuda, batch_size = prepare_pt_context(
+        num_gpus=args.num_gpus,
+        batch_size=args.batch_size)
+    net = prepare_model(
+        model_name=args.model,
+        use_pretrained=args.use_pretrained,
+        pretrained_model_file_path=args.resume.strip(),
+        use_cuda=use_cuda,
+        num_classes=args.num_classes,
+        in_channels=args.in_channels,
+        remove_module=args.remove_module)
+
+    exit_flops = calc_exit_flops(net, in_channels=args.in_channels)
+    logging.info("Exit FLOPs (M): {}".format(", ".join(["{:.1f}".format(f / 1e6) for f in exit_flops])))
+
+    data_source = prepare_data_source(
+        ds_metainfo=ds_metainfo,
+        data_subset=args.data_subset,
+        batch_size=batch_size,
+        num_workers=args.num_workers)
+    if args.show_progress:
+        from tqdm import tqdm
+        data_source = tqdm(data_source)
+    confidences, predictions, labels = collect_exit_outputs(
+        net=net,
+        data_source=data_source,
+        use_cuda=use_cuda)
+    exit_errors = (predictions != labels[:, np.newaxis]).mean(axis=0)
+    logging.info("Exit top-1 errors: {}".format(", ".join(["{:.4f}".format(e) for e in exit_errors])))
+
+    results = []
+    for budget in [float(b) for b in args.budgets.split(",")]:
+        thresholds, avg_flops = calibrate_exit_thresholds(
+            confidences=confidences,
+            exit_flops=exit_flops,
+            target_flops=budget * exit_flops[-1])
+        exits = simulate_early_exit(confidences, thresholds)
+        error = (predictions[np.arange(labels.size), exits] != labels).mean()
+        exit_fractions = np.bincount(exits, minlength=exit_flops.size) / float(labels.size)
+        logging.info("Budget: {:.2f}, avg FLOPs: {:.1f}M, top-1 error: {:.4f}, exits: [{}]".format(
+            budget, avg_flops / 1e6, error, ", ".join(["{:.3f}".format(f) for f in exit_fractions])))
+        results.append({
+            "budget": budget,
+            "avg_flops": float(avg_flops),
+            "top1_error": float(error),
+            "thresholds": [float(t) for t in thresholds]})
+
+        if args.check_subset:
+            check_data = prepare_data_source(
+                ds_metainfo=ds_metainfo,
+                data_subset=args.check_subset,
+                batch_size=batch_size,
+                num_workers=args.num_workers)
+            metric, exit_counts = validate_anytime(
+                metric=prepare_metric(ds_metainfo=ds_metainfo, data_subset=args.check_subset),
+                net=net,
+                val_data=check_data,
+                use_cuda=use_cuda,
+                thresholds=thresholds)
+            logging.info("Check ({}): {}, avg FLOPs: {:.1f}M".format(
+                args.check_subset, report_accuracy(metric=metric),
+                (exit_counts * exit_flops).sum() / float(exit_counts.sum()) / 1e6))
+
+    if args.thresholds_file:
+        with open(args.thresholds_file, "w") as f:
+            json.dump({"model": args.model, "exit_flops": exit_flops.tolist(), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -27,6 +27,7 @@ def parse_args():
         help="type of model to use. see model_provider for options")
     parser.add_argument(
         "--input-shape",
+        nargs=4,
         type=int,
         default=(1, 224, 224, 3),
         help="input tensor shape")
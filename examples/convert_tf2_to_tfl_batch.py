@@ -0,0 +1,259 @@
+"""
+    Script for bulk converting of models from TensorFlow 2.0 to TensorFlow Lite (with optional float16/int8
+    quantization) and benchmarking of converted models on CPU.
+"""
+
+import os
+import re
+import time
+import argparse
+import numpy as np
+import tensorflow as tf
+from tensorflow2.tf2cv.model_provider import get_model, _models
+
+
+def parse_args():
+    """
+    Create python script parameters.
+
+    Returns
+    -------
+    ArgumentParser
+        Resulted args.
+    """
+    parser = argparse.ArgumentParser(
+        description="Bulk converting models from TensorFlow 2.0 to TensorFlow Lite",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument(
+        "--models",
+        type=str,
+        default="resnet18,mobilenetv2_w1",
+        help="comma-separated list of models")
+    parser.add_argument(
+        "--model-filter",
+        type=str,
+        default="",
+        help="regular expression for model names from the model zoo (instead of the list)")
+    parser.add_argument(
+        "--use-pretrained",
+        action="store_true",
+        help="use pretrained weights (random weights otherwise)")
+    parser.add_argument(
+        "--quantizations",
+        type=str,
+        default="none,float16,int8",
+        help="comma-separated list of quantization modes. options are none, float16, and int8")
+    parser.add_argument(
+        "--data-dir",
+        type=str,
+        default="",
+        help="path to directory with ImageNet-1K dataset for int8 calibration and accuracy (random data if empty)")
+    parser.add_argument(
+        "--resize-inv-factor",
+        type=float,
+        default=0.875,
+        help="inverted ratio for input image crop")
+    parser.add_argument(
+        "--num-calib-images",
+        type=int,
+        default=100,
+        help="number of images for int8 calibration (representative dataset)")
+    parser.add_argument(
+        "--num-eval-images",
+        type=int,
+        default=100,
+        help="number of images for accuracy estimation")
+    parser.add_argument(
+        "--num-threads",
+        type=int,
+        default=1,
+        help="number of threads for TFLite interpreter")
+    parser.add_argument(
+        "--num-iters",
+        type=int,
+        default=10,
+        help="number of measured iterations")
+    parser.add_argument(
+        "--output-dir",
+        type=str,
+        default="",
+        help="path to dir for output TFL files (not saved if empty)")
+    args = parser.parse_args()
+    return args
+
+
+def get_val_images(args,
+                   in_size,
+                   num_images):
+    """
+    Get validation images (from ImageNet-1K tf.data pipeline or random ones) and labels.
+
+    Parameters:
+    ----------
+    args : ArgumentParser
+        Main script arguments.
+    in_size : tuple of 2 int
+        Spatial size of the input.
+    num_images : int
+        Number of images.
+
+    Returns
+    -------
+    np.array
+        Images (NHWC).
+    np.array or None
+        Labels (None for random images).
+    """
+    if not args.data_dir:
+        images = np.random.RandomState(0).rand(num_images, in_size[0], in_size[1], 3).astype(np.float32)
+        return images, None
+
+    from tensorflow2.dataset_utils import get_dataset_metainfo, get_val_data_pipeline
+    ds_metainfo = get_dataset_metainfo(dataset_name="ImageNet1K")
+    ds_metainfo.root_dir_path = args.data_dir
+    ds_metainfo.input_image_size = in_size
+    ds_metainfo.resize_inv_factor = args.resize_inv_factor
+    ds_metainfo.interpolation_msg = "{}:{}".format(ds_metainfo.interpolation, args.resize_inv_factor)
+    # Take images uniformly over the (class-ordered) validation subset:
+    _, data_size = ds_metainfo.tfdata_source(ds_metainfo=ds_metainfo, subset="val")[:2]
+    data, _ = get_val_data_pipeline(
+        ds_metainfo=ds_metainfo,
+        batch_size=1,
+        num_shards=max(data_size // num_images, 1))
+    images = []
+    labels = []
+    for image, label in data.take(num_images):
+        images.append(image.numpy()[0])
+        labels.append(int(label.numpy()[0]))
+    return np.stack(images), np.array(labels)
+
+
+def convert(net,
+            quantization,
+            calib_images):
+    """
+    Convert model to TensorFlow Lite.
+
+    Parameters:
+    ----------
+    net : Model
+        Model.
+    quantization : str
+        Quantization mode ('none', 'float16', or 'int8').
+    calib_images : np.array
+        Images for int8 calibration.
+
+    Returns
+    -------
+    bytes
+        TFLite model.
+    """
+    converter = tf.lite.TFLiteConverter.from_keras_model(net)
+    if quantization == "float16":
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.target_spec.supported_types = [tf.float16]
+    elif quantization == "int8":
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = lambda: ([image[np.newaxis]] for image in calib_images)
+    elif quantization != "none":
+        raise ValueError("Unsupported quantization: {}".format(quantization))
+    return converter.convert()
+
+
+def run_tfl(tflite_model,
+            images,
+            num_threads,
+            num_iters):
+    """
+    Run TFLite model on images and measure latency.
+
+    Parameters:
+    ----------
+    tflite_model : bytes
+        TFLite model.
+    images : np.array
+        Input images.
+    num_threads : int
+        Number of interpreter threads.
+    num_iters : int
+        Number of measured iterations.
+
+    Returns
+    -------
+    np.array
+        Outputs.
+    float
+        Best latency (in seconds).
+    """
+    interpreter = tf.lite.Interpreter(model_content=tflite_model, num_threads=num_threads)
+    interpreter.allocate_tensors()
+    input_index = interpreter.get_input_details()[0]["index"]
+    output_index = interpreter.get_output_details()[0]["index"]
+
+    outputs = []
+    for image in images:
+        interpreter.set_tensor(input_index, image[np.newaxis])
+        interpreter.invoke()
+        outputs.append(interpreter.get_tensor(output_index)[0])
+
+    interpreter.set_tensor(input_index, images[:1])
+    best_time = float("inf")
+    for _ in range(num_iters):
+        tic = time.time()
+        interpreter.invoke()
+        best_time = min(best_time, time.time() - tic)
+    return np.stack(outputs), best_time
+
+
+def main():
+    """
+    Main body of script.
+    """
+    args = parse_args()
+
+    if args.model_filter:
+        pattern = re.compile(args.model_filter)
+        model_names = [name for name in _models.keys() if pattern.search(name)]
+    else:
+        model_names = args.models.split(",")
+    quantizations = args.quantizations.split(",")
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    print("{:>24} {:>8} {:>9} {:>12} {:>8} {:>8} {:>8} {:>10}".format(
+        "model", "quant", "size, MB", "latency, ms", "tf_top1", "tfl_top1", "agree", "max_diff"))
+    for model_name in model_names:
+        try:
+            net = get_model(model_name, pretrained=args.use_pretrained)
+            in_size = net.in_size
+            images, labels = get_val_images(args, in_size, max(args.num_calib_images, args.num_eval_images))
+            calib_images = images[:args.num_calib_images]
+            eval_images = images[:args.num_eval_images]
+            y = np.concatenate([net(eval_images[i:(i + 16)], training=False).numpy()
+                                for i in range(0, len(eval_images), 16)])
+            tf_top1 = "{:.4f}".format((y.argmax(axis=1) == labels[:len(y)]).mean()) if labels is not None else "-"
+        except Exception as e:
+            print("{:>24} error: {}: {}".format(model_name, type(e).__name__, str(e).split("\n")[0]))
+            continue
+
+        for quantization in quantizations:
+            try:
+                tflite_model = convert(net, quantization, calib_images)
+                if args.output_dir:
+                    suffix = "" if quantization == "none" else "_{}".format(quantization)
+                    with open(os.path.join(args.output_dir, "{}{}.tflite".format(model_name, suffix)), "wb") as f:
+                        f.write(tflite_model)
+                y_tfl, latency = run_tfl(tflite_model, eval_images, args.num_threads, args.num_iters)
+                tfl_top1 = "{:.4f}".format((y_tfl.argmax(axis=1) == labels[:len(y_tfl)]).mean())\
+                    if labels is not None else "-"
+                print("{:>24} {:>8} {:>9.2f} {:>12.2f} {:>8} {:>8} {:>8.4f} {:>10.6f}".format(
+                    model_name, quantization, len(tflite_model) / 2 ** 20, latency * 1000, tf_top1, tfl_top1,
+                    (y_tfl.argmax(axis=1) == y.argmax(axis=1)).mean(), float(np.abs(y_tfl - y).max())))
+            except Exception as e:
+                print("{:>24} {:>8} error: {}: {}".format(
+                    model_name, quantization, type(e).__name__, str(e).split("\n")[0]))
+        tf.keras.backend.clear_session()
+
+
+if __name__ == "__main__":
+    main()
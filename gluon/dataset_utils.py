@@ -100,7 +100,8 @@ def get_train_data_source(ds_metainfo,
         else:
             sampler = WeightedRandomSampler(
                 length=len(dataset),
-                weights=dataset._data.sample_weights)
+                weights=dataset._data.sample_weights,
+                prefetch_epochs=2)
             return DataLoader(
                 dataset=dataset,
                 batch_size=batch_size,
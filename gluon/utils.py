@@ -4,7 +4,11 @@
 
 import os
 import re
+import json
+import queue
+import hashlib
 import logging
+import threading
 import numpy as np
 import mxnet as mx
 from .gluoncv2.model_provider import get_model
@@ -14,7 +18,8 @@ from .metrics.hpe_metrics import CocoHpeOksApMetric
 
 
 def prepare_mx_context(num_gpus,
-                       batch_size):
+                       batch_size,
+                       num_cpu_contexts=1):
     """
     Prepare MXNet context and correct batch size.
 
@@ -24,6 +29,8 @@ def prepare_mx_context(num_gpus,
         Number of GPU.
     batch_size : int
         Batch size for each GPU.
+    num_cpu_contexts : int, default 1
+        Number of CPU contexts (if there is no GPU), each of them has its own engine worker threads.
 
     Returns
     -------
@@ -32,8 +39,11 @@ def prepare_mx_context(num_gpus,
     int
         Batch size for all GPUs.
     """
-    ctx = [mx.gpu(i) for i in range(num_gpus)] if num_gpus > 0 else [mx.cpu()]
-    batch_size *= max(1, num_gpus)
+    if num_gpus > 0:
+        ctx = [mx.gpu(i) for i in range(num_gpus)]
+    else:
+        ctx = [mx.cpu(i) for i in range(max(1, num_cpu_contexts))]
+    batch_size *= len(ctx)
     return ctx, batch_size
 
 
@@ -75,7 +85,9 @@ def prepare_model(model_name,
                   in_channels=None,
                   do_hybridize=True,
                   initializer=mx.init.MSRAPrelu(),
-                  ctx=mx.cpu()):
+                  ctx=mx.cpu(),
+                  symbol_cache_dir="",
+                  input_shape=None):
     """
     Create and initialize model by name.
 
@@ -105,12 +117,36 @@ def prepare_model(model_name,
         Initializer.
     ctx : Context, default CPU
         MXNet context.
+    symbol_cache_dir : str, default ''
+        Directory for cached hybridized models (symbol and parameters), empty for disabling the cache. The cache is
+        used only for hybridized models without tuning.
+    input_shape : tuple of 4 int, default None
+        Input shape for the cached model (required for the cache).
 
     Returns
     -------
     HybridBlock
         Model.
     """
+    use_symbol_cache = symbol_cache_dir and do_hybridize and (not tune_layers) and (input_shape is not None)
+    if use_symbol_cache:
+        cache_prefix = get_symbol_cache_prefix(
+            cache_dir=symbol_cache_dir,
+            model_name=model_name,
+            input_shape=input_shape,
+            dtype=dtype,
+            use_pretrained=use_pretrained,
+            pretrained_model_file_path=pretrained_model_file_path,
+            net_extra_kwargs=net_extra_kwargs,
+            classes=classes,
+            in_channels=in_channels)
+        net = load_cached_model(
+            prefix=cache_prefix,
+            ctx=ctx)
+        if net is not None:
+            logging.info("Loaded cached model: {}".format(cache_prefix))
+            return net
+
     kwargs = {"ctx": ctx,
               "pretrained": use_pretrained}
     if classes is not None:
@@ -157,9 +193,124 @@ def prepare_model(model_name,
                 continue
             param.initialize(initializer, ctx=ctx)
 
+    if use_symbol_cache:
+        export_cached_model(
+            net=net,
+            prefix=cache_prefix,
+            input_shape=input_shape,
+            dtype=dtype,
+            ctx=ctx)
+        logging.info("Cached model: {}".format(cache_prefix))
+
+    return net
+
+
+def get_symbol_cache_prefix(cache_dir,
+                            model_name,
+                            input_shape,
+                            dtype,
+                            **kwargs):
+    """
+    Get path prefix of cached hybridized model for the model, input shape, dtype, and model options.
+
+    Parameters
+    ----------
+    cache_dir : str
+        Cache directory.
+    model_name : str
+        Model name.
+    input_shape : tuple of 4 int
+        Input shape.
+    dtype : str
+        Base data type for tensors.
+    **kwargs
+        Other model options (a file path is identified with its size and modification time).
+
+    Returns
+    -------
+    str
+        Path prefix.
+    """
+    options = {}
+    for key, value in sorted(kwargs.items()):
+        if isinstance(value, str) and value and os.path.isfile(value):
+            stat = os.stat(value)
+            value = [os.path.abspath(value), stat.st_size, stat.st_mtime]
+        options[key] = value
+    options_hash = hashlib.sha1(json.dumps(options, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:8]
+    return os.path.join(
+        os.path.expanduser(cache_dir),
+        "{}-{}-{}-{}".format(model_name, "x".join([str(d) for d in input_shape]), dtype, options_hash))
+
+
+def load_cached_model(prefix,
+                      ctx):
+    """
+    Load cached hybridized model as `SymbolBlock` with static memory allocation.
+
+    Parameters
+    ----------
+    prefix : str
+        Path prefix of cached model.
+    ctx : Context or list of Context
+        MXNet context.
+
+    Returns
+    -------
+    SymbolBlock or None
+        Model (None if there is no such model in the cache).
+    """
+    meta_file_path = prefix + "-meta.json"
+    if not os.path.exists(meta_file_path):
+        return None
+    with open(meta_file_path, "r") as f:
+        meta = json.load(f)
+    net = mx.gluon.SymbolBlock.imports(
+        symbol_file=prefix + "-symbol.json",
+        input_names=["data"],
+        param_file=prefix + "-0000.params",
+        ctx=ctx)
+    net.hybridize(
+        static_alloc=True,
+        static_shape=True)
+    for key, value in meta.items():
+        setattr(net, key, tuple(value) if isinstance(value, list) else value)
     return net
 
 
+def export_cached_model(net,
+                        prefix,
+                        input_shape,
+                        dtype,
+                        ctx):
+    """
+    Export hybridized model (symbol and parameters) into the cache.
+
+    Parameters
+    ----------
+    net : HybridBlock
+        Model.
+    prefix : str
+        Path prefix of cached model.
+    input_shape : tuple of 4 int
+        Input shape.
+    dtype : str
+        Base data type for tensors.
+    ctx : Context or list of Context
+        MXNet context.
+    """
+    cache_dir = os.path.dirname(prefix)
+    if cache_dir and not os.path.exists(cache_dir):
+        os.makedirs(cache_dir, exist_ok=True)
+    ctx0 = ctx[0] if isinstance(ctx, (list, tuple)) else ctx
+    net(mx.nd.zeros(input_shape, ctx=ctx0, dtype=dtype))
+    net.export(prefix)
+    meta = {key: getattr(net, key) for key in ["in_size", "in_channels", "classes"] if hasattr(net, key)}
+    # The meta file is written last, so it marks a complete cache entry:
+    with open(prefix + "-meta.json", "w") as f:
+        json.dump(meta, f)
+
+
 def calc_net_weight_count(net):
     """
     Calculate number of model trainable parameters.
@@ -225,6 +376,79 @@ def validate(metric,
     return metric
 
 
+def validate_async(metric,
+                   net,
+                   val_data,
+                   batch_fn,
+                   data_source_needs_reset,
+                   dtype,
+                   ctx,
+                   num_inflight=2):
+    """
+    Validation/testing routine with overlapped computation and metric updating. Forward passes for all contexts are
+    pushed to the (asynchronous) MXNet engine on the main thread, while metric updates (with their NDArray->numpy
+    synchronization) run on a background thread, so up to `num_inflight` batches are in flight.
+
+    Parameters:
+    ----------
+    metric : EvalMetric
+        Metric object instance.
+    net : HybridBlock
+        Model.
+    val_data : DataLoader or ImageRecordIter
+        Data loader or ImRec-iterator.
+    batch_fn : func
+        Function for splitting data after extraction from data loader.
+    data_source_needs_reset : bool
+        Whether to reset data (if test_data is ImageRecordIter).
+    dtype : str
+        Base data type for tensors.
+    ctx : Context
+        MXNet context.
+    num_inflight : int, default 2
+        Maximal number of batches in flight.
+
+    Returns
+    -------
+    EvalMetric
+        Metric object instance.
+    """
+    if data_source_needs_reset:
+        val_data.reset()
+    metric.reset()
+
+    batch_queue = queue.Queue(maxsize=max(1, num_inflight))
+    errors = []
+
+    def update_metric():
+        while True:
+            item = batch_queue.get()
+            if item is None:
+                break
+            if not errors:
+                try:
+                    metric.update(*item)
+                except Exception as e:
+                    errors.append(e)
+
+    metric_thread = threading.Thread(target=update_metric)
+    metric_thread.daemon = True
+    metric_thread.start()
+    try:
+        for batch in val_data:
+            if errors:
+                break
+            data_list, labels_list = batch_fn(batch, ctx)
+            outputs_list = [net(X.astype(dtype, copy=False)) for X in data_list]
+            batch_queue.put((labels_list, outputs_list))
+    finally:
+        batch_queue.put(None)
+        metric_thread.join()
+    if errors:
+        raise errors[0]
+    return metric
+
+
 def report_accuracy(metric,
                     extended_log=False):
     """
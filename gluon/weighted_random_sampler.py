@@ -5,34 +5,37 @@
 __all__ = ['WeightedRandomSampler']
 
 import numpy as np
-import mxnet as mx
 from mxnet.gluon.data import Sampler
+from common.alias_sampler import AliasSampler
 
 
 class WeightedRandomSampler(Sampler):
     """
-    Samples elements from [0, length) randomly without replacement.
+    Samples elements from [0, length) randomly with replacement according to weights (by the alias method).
 
-    Parameters
+    Parameters:
     ----------
     length : int
         Length of the sequence.
     weights : np.array of float
         Normalized weights of samples.
+    prefetch_epochs : int, default 0
+        Number of epochs for which index streams are precomputed in a background thread.
     """
     def __init__(self,
                  length,
-                 weights):
+                 weights,
+                 prefetch_epochs=0):
         assert (isinstance(length, int) and length > 0)
         assert (len(weights) == length)
         assert (np.abs(weights.sum() - 1.0) <= 1e-5)
-        self._length = length
-        self._weights = weights.copy()
+        self._sampler = AliasSampler(
+            weights=weights,
+            num_samples=length,
+            prefetch_epochs=prefetch_epochs)
 
     def __iter__(self):
-        indices = mx.nd.random.multinomial(mx.nd.array(self._weights), shape=self._length).asnumpy()
-        np.random.shuffle(indices)
-        return iter(indices)
+        return iter(self._sampler)
 
     def __len__(self):
-        return self._length
+        return len(self._sampler)
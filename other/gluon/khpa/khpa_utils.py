@@ -92,7 +92,8 @@ def get_train_data_loader(data_dir_path,
         train=True)
     sampler = WeightedRandomSampler(
         length=len(dataset),
-        weights=dataset.sample_weights)
+        weights=dataset.sample_weights,
+        prefetch_epochs=2)
     return gluon.data.DataLoader(
         dataset=dataset,
         batch_size=batch_size,
@@ -0,0 +1,200 @@
+"""
+    Activation checkpointing (gradient checkpointing) for models with `features.stageN` containers.
+"""
+
+__all__ = ['enable_checkpointing', 'disable_checkpointing', 'CheckpointedStageMixin']
+
+import re
+import inspect
+import torch
+import torch.nn as nn
+from torch.utils.checkpoint import checkpoint
+
+_use_reentrant_supported = ("use_reentrant" in inspect.signature(checkpoint).parameters)
+
+
+def _checkpoint(function, modules, *args):
+    """
+    Run function with activation checkpointing.
+    """
+    function = _RecomputedFunction(function, modules)
+    if _use_reentrant_supported:
+        return checkpoint(function, *args, use_reentrant=False)
+    else:
+        return checkpoint(function, *args)
+
+
+def _get_stages(net):
+    """
+    Get stage containers of the model (`features.stageN`).
+
+    Parameters:
+    ----------
+    net : Module
+        Model.
+
+    Returns
+    -------
+    list of Module
+        Stage containers.
+    """
+    net = net.module if hasattr(net, "module") else net
+    if not hasattr(net, "features"):
+        return []
+    return [module for name, module in net.features.named_children() if re.match(r"^stage\d+$", name)]
+
+
+class CheckpointedStageMixin(object):
+    """
+    Mixin for stage containers with activation checkpointing. It's injected as a dynamic subclass of the original
+    container class, so the model structure and parameter names are kept (and `DataParallel` replicas keep working).
+    """
+    def forward(self, *args):
+        forward = super(CheckpointedStageMixin, self).forward
+        if not (self.training and torch.is_grad_enabled()):
+            return forward(*args)
+        segments = self.checkpoint_segments
+        if (not isinstance(self, nn.Sequential)) or (type(self).__mro__[2].forward is not nn.Sequential.forward) or\
+                (segments <= 1):
+            return _checkpoint(forward, [self], *args)
+        assert (len(args) == 1)
+        x = args[0]
+        children = list(self.children())
+        segment_size = (len(children) + segments - 1) // segments
+        for start in range(0, len(children), segment_size):
+            blocks = children[start:start + segment_size]
+            x = _checkpoint(_SegmentFunction(blocks), blocks, x)
+        return x
+
+
+class _SegmentFunction(object):
+    """
+    Sequential execution of a segment of blocks.
+    """
+    def __init__(self, blocks):
+        self.blocks = blocks
+
+    def __call__(self, x):
+        for block in self.blocks:
+            x = block(x)
+        return x
+
+
+class _RecomputedFunction(object):
+    """
+    Checkpointed function, which keeps batch normalization running statistics intact during recomputation in backward
+    pass (so they are updated once, as without checkpointing).
+    """
+    def __init__(self, function, modules):
+        self.function = function
+        self.bn_modules = [m for module in modules for m in module.modules()
+                           if isinstance(m, nn.modules.batchnorm._BatchNorm) and m.track_running_stats]
+        self.num_calls = 0
+
+    def __call__(self, *args):
+        self.num_calls += 1
+        if (self.num_calls == 1) or (len(self.bn_modules) == 0):
+            return self.function(*args)
+        states = [[buffer.clone() for buffer in m.buffers(recurse=False)] for m in self.bn_modules]
+        try:
+            return self.function(*args)
+        finally:
+            with torch.no_grad():
+                for m, state in zip(self.bn_modules, states):
+                    for buffer, value in zip(m.buffers(recurse=False), state):
+                        buffer.copy_(value)
+
+
+_checkpointed_classes = {}
+
+
+def _get_checkpointed_class(cls):
+    """
+    Get (cached) checkpointed subclass for a container class.
+    """
+    if cls not in _checkpointed_classes:
+        _checkpointed_classes[cls] = type("Checkpointed" + cls.__name__, (CheckpointedStageMixin, cls), {})
+    return _checkpointed_classes[cls]
+
+
+def enable_checkpointing(net,
+                         segments=1):
+    """
+    Enable activation checkpointing for all `features.stageN` containers of the model. Activations inside a
+    checkpointed segment are not stored during forward pass and are recomputed during backward pass. Checkpointing is
+    active in the training mode with enabled gradients only. Batch normalization running statistics are restored after
+    recomputation, so the trained model is the same as without checkpointing.
+
+    Parameters:
+    ----------
+    net : Module
+        Model.
+    segments : int, default 1
+        Number of checkpointed segments per stage (for plain sequential stages only, others are checkpointed as a
+        whole).
+
+    Returns
+    -------
+    int
+        Number of checkpointed stages.
+    """
+    assert (segments > 0)
+    stages = _get_stages(net)
+    if len(stages) == 0:
+        raise ValueError("Model doesn't contain `features.stageN` containers")
+    for stage in stages:
+        if not isinstance(stage, CheckpointedStageMixin):
+            stage.__class__ = _get_checkpointed_class(stage.__class__)
+        stage.checkpoint_segments = segments
+    return len(stages)
+
+
+def disable_checkpointing(net):
+    """
+    Disable activation checkpointing for the model.
+
+    Parameters:
+    ----------
+    net : Module
+        Model.
+    """
+    for stage in _get_stages(net):
+        if isinstance(stage, CheckpointedStageMixin):
+            stage.__class__ = stage.__class__.__mro__[2]
+            del stage.checkpoint_segments
+
+
+def _test():
+    from .pytorchcv.models.resnet import resnet18
+    from .pytorchcv.models.nasnet import nasnet_4a1056
+
+    for model, segments in [(resnet18, 2), (nasnet_4a1056, 1)]:
+        net = model()
+        net.train()
+        x = torch.randn(2, 3, 224, 224)
+        state = {k: v.clone() for k, v in net.state_dict().items()}
+        torch.manual_seed(0)
+        y1 = net(x)
+        y1.sum().backward()
+        grads1 = [p.grad.clone() for p in net.parameters()]
+        buffers1 = [b.clone() for b in net.buffers()]
+
+        net.load_state_dict(state)
+        net.zero_grad()
+        assert (enable_checkpointing(net, segments=segments) > 0)
+        torch.manual_seed(0)
+        y2 = net(x)
+        y2.sum().backward()
+        grads2 = [p.grad.clone() for p in net.parameters()]
+        buffers2 = [b.clone() for b in net.buffers()]
+        assert (float((y1 - y2).detach().abs().max()) < 1e-5)
+        assert all([float((g1 - g2).abs().max()) < 1e-3 for g1, g2 in zip(grads1, grads2)])
+        assert all([torch.equal(b1, b2) for b1, b2 in zip(buffers1, buffers2)])
+
+        disable_checkpointing(net)
+        assert not any([isinstance(stage, CheckpointedStageMixin) for stage in _get_stages(net)])
+        print("m={}, ok".format(model.__name__))
+
+
+if __name__ == "__main__":
+    _test()
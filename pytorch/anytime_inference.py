@@ -0,0 +1,154 @@
+"""
+    Routines for anytime (early-exit) inference of MSDNet-like models.
+"""
+
+__all__ = ['calc_exit_flops', 'collect_exit_outputs', 'validate_anytime']
+
+import numpy as np
+import torch
+import torch.nn as nn
+from .model_stats import measure_model
+
+
+class _CascadeTrunk(nn.Module):
+    """
+    Initial layer and the first feature blocks of a cascade (for cost estimation).
+    """
+    def __init__(self, init_layer, feature_blocks):
+        super(_CascadeTrunk, self).__init__()
+        self.init_layer = init_layer
+        self.feature_blocks = nn.Sequential(*feature_blocks)
+
+    def forward(self, x):
+        x = self.init_layer(x)
+        x = self.feature_blocks(x)
+        return x
+
+
+def calc_exit_flops(net,
+                    in_channels=3):
+    """
+    Calculate cumulative FLOPs of a sample exiting at each classifier (including all preceding classifiers).
+
+    Parameters:
+    ----------
+    net : Module
+        Model with `init_layer`, `feature_blocks`, and `classifiers`.
+    in_channels : int, default 3
+        Number of input channels.
+
+    Returns
+    -------
+    np.array of int
+        Cumulative FLOPs for each exit.
+    """
+    net = net.module if hasattr(net, "module") else net
+    in_size = net.in_size
+    feature_blocks = list(net.feature_blocks)
+    device = next(net.parameters()).device
+    net.eval()
+    with torch.no_grad():
+        x = net.init_layer(torch.zeros(1, in_channels, in_size[0], in_size[1], device=device))
+        classifier_in_shapes = []
+        for feature_block in feature_blocks:
+            x = feature_block(x)
+            classifier_in_shapes.append(x[-1].shape[1:])
+
+    exit_flops = []
+    classifiers_flops = 0
+    for i, classifier in enumerate(net.classifiers):
+        trunk_flops, _, _ = measure_model(
+            model=_CascadeTrunk(net.init_layer, feature_blocks[:i + 1]),
+            in_channels=in_channels,
+            in_size=in_size)
+        shape = classifier_in_shapes[i]
+        classifier_flops, _, _ = measure_model(
+            model=classifier,
+            in_channels=shape[0],
+            in_size=shape[1:])
+        classifiers_flops += classifier_flops
+        exit_flops.append(trunk_flops + classifiers_flops)
+    return np.array(exit_flops, dtype=np.int64)
+
+
+def collect_exit_outputs(net,
+                         data_source,
+                         use_cuda):
+    """
+    Run all classifiers of a cascade on data and collect maximal softmax probabilities and predictions.
+
+    Parameters:
+    ----------
+    net : Module
+        Model with multiple outputs (`only_last` forward argument).
+    data_source : DataLoader
+        Data loader.
+    use_cuda : bool
+        Whether to use CUDA.
+
+    Returns
+    -------
+    np.array of float
+        Maximal softmax probabilities (shape is (num_samples, num_exits)).
+    np.array of int
+        Predicted labels (shape is (num_samples, num_exits)).
+    np.array of int
+        Ground truth labels.
+    """
+    net.eval()
+    confidences = []
+    predictions = []
+    labels = []
+    with torch.no_grad():
+        for data, target in data_source:
+            if use_cuda:
+                data = data.cuda(non_blocking=True)
+            outs = torch.stack(net(data, only_last=False), dim=1)
+            conf, pred = outs.softmax(dim=2).max(dim=2)
+            confidences.append(conf.cpu().numpy())
+            predictions.append(pred.cpu().numpy())
+            labels.append(target.numpy())
+    return np.concatenate(confidences), np.concatenate(predictions), np.concatenate(labels)
+
+
+def validate_anytime(metric,
+                     net,
+                     val_data,
+                     use_cuda,
+                     thresholds):
+    """
+    Validation routine for anytime (early-exit) inference.
+
+    Parameters:
+    ----------
+    metric : EvalMetric
+        Metric object instance.
+    net : Module
+        Model with `forward_anytime` method.
+    val_data : DataLoader
+        Data loader.
+    use_cuda : bool
+        Whether to use CUDA.
+    thresholds : list/tuple of float
+        Confidence thresholds for classifiers.
+
+    Returns
+    -------
+    EvalMetric
+        Metric object instance.
+    np.array of int
+        Number of samples exited at each classifier.
+    """
+    net = net.module if hasattr(net, "module") else net
+    net.eval()
+    metric.reset()
+    exit_counts = np.zeros((len(net.classifiers),), dtype=np.int64)
+    with torch.no_grad():
+        for data, target in val_data:
+            if use_cuda:
+                data = data.cuda(non_blocking=True)
+                target = target.cuda(non_blocking=True)
+            output, exits = net.forward_anytime(data, thresholds)
+            metric.update(target, output)
+            exit_counts += np.bincount(exits.cpu().numpy(), minlength=exit_counts.size)
+    return metric, exit_counts
@@ -0,0 +1,341 @@
+"""
+    Bit-packed storage format for models with 1-bit weights (WRN-1bit) with a reference AND-popcount convolution.
+"""
+
+__all__ = ['pack_sign_bits', 'find_zero_weights', 'unpack_sign_bits', 'popcount_conv2d', 'PackedConv2d1bit',
+           'pack_binarized_convs', 'calc_model_memory']
+
+import math
+import numpy as np
+import torch
+import torch.nn as nn
+import torch.nn.functional as F
+from .pytorchcv.models.wrn1bit_cifar import Conv2d1bit
+
+if hasattr(np, "bitwise_count"):
+    _popcount = np.bitwise_count
+else:
+    _popcount_table = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def _popcount(x):
+        return _popcount_table[x.view(np.uint8)].reshape(x.shape + (x.itemsize,)).sum(axis=-1, dtype=np.uint8)
+
+
+def _pack_bits64(bits):
+    """
+    Pack boolean rows into uint64 words (rows are zero padded to a multiple of 64 bits).
+
+    Parameters:
+    ----------
+    bits : np.array of bool
+        Bits (shape is (rows, length)).
+
+    Returns
+    -------
+    np.array of uint64
+        Packed words.
+    """
+    packed = np.packbits(bits, axis=1)
+    pad = (-packed.shape[1]) % 8
+    if pad > 0:
+        packed = np.pad(packed, ((0, 0), (0, pad)))
+    return np.ascontiguousarray(packed).view(np.uint64)
+
+
+def pack_sign_bits(weight):
+    """
+    Pack signs of convolution weights into bit planes (bit 1 is for non-negative weights).
+
+    Parameters:
+    ----------
+    weight : Tensor
+        Weights (shape is (out_channels, in_channels, kh, kw)).
+
+    Returns
+    -------
+    np.array of uint8
+        Packed sign bits (shape is (out_channels, ceil(in_channels * kh * kw / 64) * 8)).
+    """
+    weight = weight.detach().cpu().numpy().reshape(weight.shape[0], -1)
+    return _pack_bits64(weight >= 0.0).view(np.uint8)
+
+
+def find_zero_weights(weight):
+    """
+    Find exact zero weights (their sign is zero, so they can't be represented by a sign bit).
+
+    Parameters:
+    ----------
+    weight : Tensor
+        Weights (shape is (out_channels, in_channels, kh, kw)).
+
+    Returns
+    -------
+    np.array of int64
+        Indices of zero weights (shape is (num_zeros, 2), pairs of output channel and flattened input position).
+    """
+    weight = weight.detach().cpu().numpy().reshape(weight.shape[0], -1)
+    return np.stack(np.nonzero(weight == 0.0), axis=1).astype(np.int64)
+
+
+def unpack_sign_bits(weight_bits,
+                     shape,
+                     zero_indices=None):
+    """
+    Unpack sign bits into +1/-1 weights.
+
+    Parameters:
+    ----------
+    weight_bits : np.array of uint8
+        Packed sign bits.
+    shape : tuple of 4 int
+        Weight shape.
+    zero_indices : np.array of int64 or None, default None
+        Indices of zero weights.
+
+    Returns
+    -------
+    np.array of float32
+        Weights.
+    """
+    length = int(np.prod(shape[1:]))
+    bits = np.unpackbits(weight_bits, axis=1, count=length)
+    weight = 2.0 * bits.astype(np.float32) - 1.0
+    if (zero_indices is not None) and (zero_indices.shape[0] > 0):
+        weight[zero_indices[:, 0], zero_indices[:, 1]] = 0.0
+    return weight.reshape(shape)
+
+
+def popcount_conv2d(x,
+                    weight_bits,
+                    kernel_size,
+                    stride,
+                    padding,
+                    dilation,
+                    zero_indices=None,
+                    act_bits=8,
+                    chunk_size=64):
+    """
+    Convolution with 1-bit (+1/-1) weights by bitwise AND-popcount. Activations are quantized to `act_bits` bits and
+    processed bit-serially: for each activation bit plane `b`, `dot(w, b) = 2 * popcount(b & w) - popcount(b)`. It's a
+    reference (numpy) implementation for checking accuracy of popcount arithmetic, it's much slower than the float
+    convolution.
+
+    Parameters:
+    ----------
+    x : Tensor
+        Input tensor (shape is (batch, in_channels, height, width)).
+    weight_bits : np.array of uint8
+        Packed sign bits of weights.
+    kernel_size : tuple of 2 int
+        Convolution window size.
+    stride : tuple of 2 int
+        Strides of the convolution.
+    padding : tuple of 2 int
+        Padding value for convolution layer.
+    dilation : tuple of 2 int
+        Dilation value for convolution layer.
+    zero_indices : np.array of int64 or None, default None
+        Indices of zero weights (they are packed as +1 and corrected separately).
+    act_bits : int, default 8
+        Number of bits for activation magnitudes (including the sign bit for signed activations).
+    chunk_size : int, default 64
+        Number of output positions processed at once.
+
+    Returns
+    -------
+    Tensor
+        Convolution result for unscaled +1/-1 weights.
+    """
+    batch, _, height, width = x.shape
+    out_height = (height + 2 * padding[0] - dilation[0] * (kernel_size[0] - 1) - 1) // stride[0] + 1
+    out_width = (width + 2 * padding[1] - dilation[1] * (kernel_size[1] - 1) - 1) // stride[1] + 1
+    weight_words = weight_bits.view(np.uint64)
+    out_channels = weight_words.shape[0]
+
+    x_max = float(x.abs().max())
+    signed = float(x.min()) < 0.0
+    levels = (1 << (act_bits - 1)) - 1 if signed else (1 << act_bits) - 1
+    act_scale = x_max / levels if x_max > 0.0 else 1.0
+    parts = [(x, 1)] if not signed else [(F.relu(x), 1), (F.relu(-x), -1)]
+
+    acc = np.zeros((batch * out_height * out_width, out_channels), dtype=np.int64)
+    for part, sign in parts:
+        x_q = torch.round(part / act_scale)
+        cols = F.unfold(x_q, kernel_size=kernel_size, dilation=dilation, padding=padding, stride=stride)
+        cols = cols.transpose(1, 2).reshape(-1, cols.shape[1]).numpy().astype(np.uint16)
+        for bit in range(act_bits):
+            planes = _pack_bits64(((cols >> bit) & 1).astype(np.bool_))
+            for start in range(0, planes.shape[0], chunk_size):
+                plane = planes[start:start + chunk_size]
+                ones = _popcount(plane).sum(axis=1, dtype=np.int64)
+                matches = _popcount(plane[:, np.newaxis, :] & weight_words[np.newaxis, :, :]).sum(
+                    axis=2, dtype=np.int64)
+                acc[start:start + chunk_size] += sign * ((2 * matches - ones[:, np.newaxis]) << bit)
+        if (zero_indices is not None) and (zero_indices.shape[0] > 0):
+            np.subtract.at(acc.T, zero_indices[:, 0], sign * cols[:, zero_indices[:, 1]].T.astype(np.int64))
+
+    y = torch.from_numpy(acc.astype(np.float32) * np.float32(act_scale))
+    return y.view(batch, out_height, out_width, out_channels).permute(0, 3, 1, 2).contiguous()
+
+
+class PackedConv2d1bit(nn.Module):
+    """
+    Inference-only convolution with 1-bit weights stored as packed sign bits. It's a replacement for binarized
+    `Conv2d1bit` with a compact storage format (parameters and `state_dict`): bit 1 is for positive weights, rare exact
+    zero weights are kept as a list of indices. The forward pass is a float convolution with sign weights unpacked
+    once and cached, so the result and latency are the same as for the float model, and only the stored model is
+    smaller.
+
+    Parameters:
+    ----------
+    conv : Conv2d1bit
+        Source binarized convolution.
+    use_popcount : bool, default False
+        Whether to use the reference AND-popcount kernel with quantized activations (for accuracy checks only).
+    act_bits : int, default 8
+        Number of bits for activations in the popcount kernel.
+    cache_weight : bool, default True
+        Whether to cache unpacked float weights (otherwise they are unpacked in each forward pass, which keeps resident
+        memory small at the cost of latency).
+    """
+    def __init__(self,
+                 conv,
+                 use_popcount=False,
+                 act_bits=8,
+                 cache_weight=True):
+        super(PackedConv2d1bit, self).__init__()
+        assert conv.binarized and (conv.groups == 1) and (conv.bias is None)
+        self.use_popcount = use_popcount
+        self.act_bits = act_bits
+        self.cache_weight = cache_weight
+        self.weight_cache = None
+        self.weight_shape = tuple(conv.weight.shape)
+        self.kernel_size = conv.kernel_size
+        self.stride = conv.stride
+        self.padding = conv.padding
+        self.dilation = conv.dilation
+        self.scale = math.sqrt(2.0 / int(np.prod(self.weight_shape[1:])))
+        self.register_buffer("weight_bits", torch.from_numpy(pack_sign_bits(conv.weight)))
+        self.register_buffer("zero_indices", torch.from_numpy(find_zero_weights(conv.weight)))
+
+    def _load_from_state_dict(self, *args, **kwargs):
+        super(PackedConv2d1bit, self)._load_from_state_dict(*args, **kwargs)
+        self.weight_cache = None
+
+    def get_weight(self, device):
+        """
+        Get unpacked (and scaled) float weights.
+        """
+        if (self.weight_cache is not None) and (self.weight_cache.device == device):
+            return self.weight_cache
+        weight = self.scale * torch.from_numpy(unpack_sign_bits(
+            self.weight_bits.cpu().numpy(), self.weight_shape, self.zero_indices.cpu().numpy())).to(device)
+        if self.cache_weight:
+            self.weight_cache = weight
+        return weight
+
+    def forward(self, x):
+        if self.use_popcount:
+            y = popcount_conv2d(
+                x=x.cpu(),
+                weight_bits=self.weight_bits.cpu().numpy(),
+                kernel_size=self.kernel_size,
+                stride=self.stride,
+                padding=self.padding,
+                dilation=self.dilation,
+                zero_indices=self.zero_indices.cpu().numpy(),
+                act_bits=self.act_bits)
+            return (self.scale * y).to(x.device)
+        weight = self.get_weight(x.device)
+        return F.conv2d(
+            input=x,
+            weight=weight,
+            stride=self.stride,
+            padding=self.padding,
+            dilation=self.dilation)
+
+
+def pack_binarized_convs(net,
+                         use_popcount=False,
+                         act_bits=8,
+                         cache_weight=True):
+    """
+    Replace all binarized convolutions of the model by bit-packed ones (in place).
+
+    Parameters:
+    ----------
+    net : Module
+        Model.
+    use_popcount : bool, default False
+        Whether to use the reference AND-popcount kernel.
+    act_bits : int, default 8
+        Number of bits for activations in the popcount kernel.
+    cache_weight : bool, default True
+        Whether to cache unpacked float weights.
+
+    Returns
+    -------
+    int
+        Number of replaced convolutions.
+    """
+    count = 0
+    for module in list(net.modules()):
+        for name, child in module.named_children():
+            if isinstance(child, Conv2d1bit) and child.binarized:
+                setattr(module, name, PackedConv2d1bit(
+                    conv=child,
+                    use_popcount=use_popcount,
+                    act_bits=act_bits,
+                    cache_weight=cache_weight))
+                count += 1
+    return count
+
+
+def calc_model_memory(net):
+    """
+    Calculate memory size of model parameters and buffers.
+
+    Parameters:
+    ----------
+    net : Module
+        Model.
+
+    Returns
+    -------
+    int
+        Size in bytes.
+    """
+    tensors = list(net.parameters()) + list(net.buffers())
+    return sum([t.numel() * t.element_size() for t in tensors])
+
+
+def _test():
+    import copy
+    from .pytorchcv.models.wrn1bit_cifar import wrn20_10_1bit_cifar10
+
+    weight = torch.randn(8, 5, 3, 3)
+    weight[1, 2, 0, 1] = 0.0
+    x = torch.randint(0, 6, (2, 5, 9, 9)).float() - 2.0
+    y_ref = F.conv2d(x, weight.sign(), stride=2, padding=1)
+    y = popcount_conv2d(x, pack_sign_bits(weight), (3, 3), (2, 2), (1, 1), (1, 1), find_zero_weights(weight),
+                        act_bits=3)
+    assert torch.equal(y, y_ref)
+
+    net = wrn20_10_1bit_cifar10()
+    net.eval()
+    x = torch.randn(2, 3, 32, 32)
+    with torch.no_grad():
+        y_ref = net(x)
+        packed_net = copy.deepcopy(net)
+        assert (pack_binarized_convs(packed_net) == 20)
+        assert torch.equal(packed_net(x), y_ref)
+        assert torch.equal(packed_net(x), y_ref)
+        assert (calc_model_memory(packed_net) * 20 < calc_model_memory(net))
+        packed_net.load_state_dict(packed_net.state_dict())
+        assert torch.equal(packed_net(x), y_ref)
+    print("ok")
+
+
+if __name__ == "__main__":
+    _test()
@@ -15,8 +15,8 @@ from .datasets.cityscapes_seg_dataset import CityscapesMetaInfo
 from .datasets.coco_seg_dataset import CocoSegMetaInfo
 from .datasets.coco_hpe_dataset import CocoHpeMetaInfo
 from .datasets.hpatches_mch_dataset import HPatchesMetaInfo
+from .weighted_random_sampler import WeightedRandomSampler
 from torch.utils.data import DataLoader
-from torch.utils.data.sampler import WeightedRandomSampler
 
 
 def get_dataset_metainfo(dataset_name):
@@ -90,7 +90,8 @@ def get_train_data_source(ds_metainfo,
     else:
         sampler = WeightedRandomSampler(
             weights=dataset.sample_weights,
-            num_samples=len(dataset))
+            num_samples=len(dataset),
+            prefetch_epochs=2)
         return DataLoader(
             dataset=dataset,
             batch_size=batch_size,
@@ -450,6 +450,27 @@ def get_affine_transform(center,
 
     return trans
 
+
+def solve_affine_transforms(src,
+                            dst):
+    """
+    Calculate affine transforms by three pairs of points for a batch at once (batched `cv2.getAffineTransform`).
+
+    Parameters:
+    ----------
+    src : np.array of float
+        Source points with shape (N, 3, 2).
+    dst : np.array of float
+        Destination points with shape (N, 3, 2).
+
+    Returns
+    -------
+    np.array of float
+        Affine matrices with shape (N, 2, 3).
+    """
+    src = np.concatenate((src.astype(np.float64), np.ones(src.shape[:2] + (1,), dtype=np.float64)), axis=2)
+    return np.linalg.solve(src, dst.astype(np.float64)).transpose((0, 2, 1))
+
 # ---------------------------------------------------------------------------------------------------------------------
 
 
@@ -532,53 +553,143 @@ def alpha_pose_detection_processor(img,
         return boxes[picked_idxs], scores[picked_idxs]
 
 
+def calc_alpha_pose_crop_boxes(boxes,
+                               img_width,
+                               img_height):
+    """
+    Calculate enlarged crop boxes for person boxes.
+
+    Parameters:
+    ----------
+    boxes : np.array of float
+        Person boxes (left, up, right, bottom) with shape (N, 4).
+    img_width : int
+        Source image width.
+    img_height : int
+        Source image height.
+
+    Returns
+    -------
+    np.array of int
+        Crop boxes (left, up, right, bottom) with shape (N, 4).
+    np.array of bool
+        Mask of non-empty crop boxes.
+    """
+    box_width = boxes[:, 2] - boxes[:, 0]
+    box_height = boxes[:, 3] - boxes[:, 1]
+    scale_rate = np.where(box_width > 100, 0.2, 0.3)
+
+    left = np.maximum(0, boxes[:, 0] - box_width * scale_rate / 2).astype(np.int64)
+    up = np.maximum(0, boxes[:, 1] - box_height * scale_rate / 2).astype(np.int64)
+    right = np.minimum(img_width - 1, np.maximum(left + 5, boxes[:, 2] + box_width * scale_rate / 2)).astype(np.int64)
+    bottom = np.minimum(img_height - 1, np.maximum(up + 5, boxes[:, 3] + box_height * scale_rate / 2)).astype(np.int64)
+    crop_boxes = np.stack((left, up, right, bottom), axis=1)
+    valid = (right - left >= 1) & (bottom - up >= 1)
+    return crop_boxes, valid
+
+
+def calc_alpha_pose_crop_transforms(crop_boxes,
+                                    output_shape):
+    """
+    Calculate affine transforms from crop regions (with origin at the top-left corner of the crop box) to the output
+    crops. It's equivalent to the transform in `cv_cropBox`.
+
+    Parameters:
+    ----------
+    crop_boxes : np.array of int
+        Crop boxes (left, up, right, bottom) with shape (N, 4).
+    output_shape : tuple of 2 int
+        Output crop size (height, width).
+
+    Returns
+    -------
+    np.array of float
+        Affine matrices with shape (N, 2, 3).
+    """
+    res_h, res_w = output_shape
+    num_boxes = crop_boxes.shape[0]
+    box_w = (crop_boxes[:, 2] - 1 - crop_boxes[:, 0]).astype(np.float64)
+    box_h = (crop_boxes[:, 3] - 1 - crop_boxes[:, 1]).astype(np.float64)
+    len_h = np.maximum(box_h, box_w * res_h / res_w)
+    len_w = len_h * res_w / res_h
+    pad_h = (len_h - box_h) // 2
+    pad_w = (len_w - box_w) // 2
+
+    src = np.zeros((num_boxes, 3, 2), dtype=np.float32)
+    dst = np.zeros((num_boxes, 3, 2), dtype=np.float32)
+    src[:, 0, 0] = -pad_w
+    src[:, 0, 1] = -pad_h
+    src[:, 1, 0] = box_w + pad_w
+    src[:, 1, 1] = box_h + pad_h
+    dst[:, 1] = [res_w - 1, res_h - 1]
+    for points in (src, dst):
+        direct = points[:, 0] - points[:, 1]
+        points[:, 2, 0] = points[:, 1, 0] - direct[:, 1]
+        points[:, 2, 1] = points[:, 1, 1] + direct[:, 0]
+
+    return solve_affine_transforms(src, dst)
+
+
 def alpha_pose_image_cropper(source_img,
                              boxes,
-                             output_shape=(256, 192)):
+                             output_shape=(256, 192),
+                             thread_pool=None):
+    """
+    Crop person images for top-down pose estimation. All crop transforms are calculated at once, each crop is warped
+    directly from the region of the shared source image (without copying it) and written with normalization into a
+    preallocated batch.
+
+    Parameters:
+    ----------
+    source_img : np.array of uint8
+        Source image with shape (H, W, 3).
+    boxes : np.array of float or None
+        Person boxes (left, up, right, bottom) with shape (N, 4).
+    output_shape : tuple of 2 int, default (256, 192)
+        Output crop size (height, width).
+    thread_pool : ThreadPool or None, default None
+        Thread pool for running crops in parallel (OpenCV releases GIL while warping).
+
+    Returns
+    -------
+    np.array of float32 or None
+        Crops with shape (N, 3, height, width).
+    np.array of float or None
+        Crop boxes with shape (N, 4).
+    """
     if boxes is None:
         return None, boxes
 
-    # crop person poses
     img_width, img_height = source_img.shape[1], source_img.shape[0]
-
-    tensors = np.zeros([boxes.shape[0], 3, output_shape[0], output_shape[1]])
-    out_boxes = np.zeros([boxes.shape[0], 4])
-
-    for i, box in enumerate(boxes):
-        img = source_img.copy()
-        box_width = box[2] - box[0]
-        box_height = box[3] - box[1]
-        if box_width > 100:
-            scale_rate = 0.2
-        else:
-            scale_rate = 0.3
-
-        # crop image
-        left = int(max(0, box[0] - box_width * scale_rate / 2))
-        up = int(max(0, box[1] - box_height * scale_rate / 2))
-        right = int(min(img_width - 1, max(left + 5, box[2] + box_width * scale_rate / 2)))
-        bottom = int(min(img_height - 1, max(up + 5, box[3] + box_height * scale_rate / 2)))
-        crop_width = right - left
-        if crop_width < 1:
-            continue
-        crop_height = bottom - up
-        if crop_height < 1:
-            continue
-        ul = np.array((left, up))
-        br = np.array((right, bottom))
-        img = cv_cropBox(img, ul, br, output_shape[0], output_shape[1])
-
-        img = img.astype(np.float32)
-        img = img / 255.0
-        img = img.transpose((2, 0, 1))
-        # img = mx.nd.image.to_tensor(np.array(img))
-        # img = img.transpose((2, 0, 1))
-        img[0] = img[0] - 0.406
-        img[1] = img[1] - 0.457
-        img[2] = img[2] - 0.480
-        assert (img.shape[0] == 3)
-        tensors[i] = img
-        out_boxes[i] = (left, up, right, bottom)
+    res_h, res_w = output_shape
+
+    crop_boxes, valid = calc_alpha_pose_crop_boxes(boxes, img_width, img_height)
+    transforms = calc_alpha_pose_crop_transforms(crop_boxes, output_shape)
+
+    tensors = np.zeros((boxes.shape[0], 3, res_h, res_w), dtype=np.float32)
+    out_boxes = np.zeros((boxes.shape[0], 4))
+    out_boxes[valid] = crop_boxes[valid]
+    mean = np.array([0.406, 0.457, 0.480], dtype=np.float32)[:, np.newaxis, np.newaxis]
+
+    def crop_person(i):
+        left, up, right, bottom = crop_boxes[i]
+        region = source_img[up:bottom, left:right]
+        img = cv2.warpAffine(
+            region,
+            transforms[i],
+            (res_w, res_h),
+            flags=cv2.INTER_LINEAR,
+            borderMode=cv2.BORDER_CONSTANT,
+            borderValue=0)
+        np.multiply(img.transpose((2, 0, 1)), np.float32(1.0 / 255.0), out=tensors[i])
+        tensors[i] -= mean
+
+    inds = np.nonzero(valid)[0].tolist()
+    if thread_pool is not None:
+        thread_pool.map(crop_person, inds)
+    else:
+        for i in inds:
+            crop_person(i)
 
     return tensors, out_boxes
 
@@ -618,23 +729,53 @@ def cv_cropBox(img, ul, br, resH, resW, pad_val=0):
 # ---------------------------------------------------------------------------------------------------------------------
 
 
-def recalc_pose1(keypoints,
-                 bbs,
-                 image_size):
+def get_affine_transforms(center,
+                          scale,
+                          output_size,
+                          inv=False):
+    """
+    Calculate affine transforms (without rotation and shift) for a batch of boxes at once. It's equivalent to
+    `get_affine_transform` applied to each box.
 
-    def transform_preds(coords, center, scale, output_size):
+    Parameters:
+    ----------
+    center : np.array of float
+        Box centers with shape (N, 2).
+    scale : np.array of float
+        Box scales with shape (N, 2) (only width is used).
+    output_size : tuple of 2 int
+        Output size (width, height).
+    inv : bool, default False
+        Whether to calculate inverse transforms.
+
+    Returns
+    -------
+    np.array of float
+        Affine matrices with shape (N, 2, 3).
+    """
+    num_boxes = center.shape[0]
+    dst_w, dst_h = output_size
+
+    src = np.zeros((num_boxes, 3, 2), dtype=np.float64)
+    src[:, 0] = center
+    src[:, 1] = center
+    src[:, 1, 1] -= scale[:, 0] * 0.5
+    dst = np.zeros((num_boxes, 3, 2), dtype=np.float64)
+    dst[:, 0] = [dst_w * 0.5, dst_h * 0.5]
+    dst[:, 1] = [dst_w * 0.5, dst_h * 0.5 - dst_w * 0.5]
+    for points in (src, dst):
+        direct = points[:, 0] - points[:, 1]
+        points[:, 2, 0] = points[:, 1, 0] - direct[:, 1]
+        points[:, 2, 1] = points[:, 1, 1] + direct[:, 0]
 
-        def affine_transform(pt, t):
-            new_pt = np.array([pt[0], pt[1], 1.]).T
-            new_pt = np.dot(t, new_pt)
-            return new_pt[:2]
+    if inv:
+        src, dst = dst, src
+    return solve_affine_transforms(src, dst)
 
-        target_coords = np.zeros(coords.shape)
-        trans = get_affine_transform(center, scale, 0, output_size, inv=1)
-        for p in range(coords.shape[0]):
-            target_coords[p, 0:2] = affine_transform(coords[p, 0:2], trans)
-        return target_coords
 
+def recalc_pose1(keypoints,
+                 bbs,
+                 image_size):
     center = bbs[:, :2]
     scale = bbs[:, 2:4]
 
@@ -642,10 +783,10 @@ def recalc_pose1(keypoints,
     heatmap_width = image_size[1] // 4
     output_size = [heatmap_width, heatmap_height]
 
-    preds = np.zeros_like(keypoints)
+    trans = get_affine_transforms(center, scale, output_size, inv=True)
 
-    for i in range(keypoints.shape[0]):
-        preds[i] = transform_preds(keypoints[i], center[i], scale[i], output_size)
+    preds = np.zeros_like(keypoints)
+    preds[:, :, :2] = np.einsum("nij,nkj->nki", trans[:, :, :2], keypoints[:, :, :2]) + trans[:, np.newaxis, :, 2]
 
     return preds
 
@@ -653,38 +794,20 @@ def recalc_pose1(keypoints,
 def recalc_pose2(keypoints,
                  bbs,
                  image_size):
-
-    def transformBoxInvert(pt, ul, br, resH, resW):
-        center = np.zeros(2)
-        center[0] = (br[0] - 1 - ul[0]) / 2
-        center[1] = (br[1] - 1 - ul[1]) / 2
-
-        lenH = max(br[1] - ul[1], (br[0] - ul[0]) * resH / resW)
-        lenW = lenH * resW / resH
-
-        _pt = (pt * lenH) / resH
-
-        if bool(((lenW - 1) / 2 - center[0]) > 0):
-            _pt[0] = _pt[0] - ((lenW - 1) / 2 - center[0])
-        if bool(((lenH - 1) / 2 - center[1]) > 0):
-            _pt[1] = _pt[1] - ((lenH - 1) / 2 - center[1])
-
-        new_point = np.zeros(2)
-        new_point[0] = _pt[0] + ul[0]
-        new_point[1] = _pt[1] + ul[1]
-        return new_point
-
-    pt2 = bbs[:, :2]
-    pt1 = bbs[:, 2:4]
+    ul = bbs[:, 2:4].astype(np.float64)
+    br = bbs[:, :2].astype(np.float64)
 
     heatmap_height = image_size[0] // 4
     heatmap_width = image_size[1] // 4
 
-    preds = np.zeros_like(keypoints)
+    center = (br - 1 - ul) / 2
+    len_h = np.maximum(br[:, 1] - ul[:, 1], (br[:, 0] - ul[:, 0]) * heatmap_height / heatmap_width)
+    len_w = len_h * heatmap_width / heatmap_height
+    pad = np.maximum(np.stack(((len_w - 1) / 2 - center[:, 0], (len_h - 1) / 2 - center[:, 1]), axis=1), 0.0)
 
-    for i in range(keypoints.shape[0]):
-        for j in range(keypoints.shape[1]):
-            preds[i, j] = transformBoxInvert(keypoints[i, j], pt1[i], pt2[i], heatmap_height, heatmap_width)
+    preds = np.zeros_like(keypoints)
+    preds[:] = keypoints * (len_h / heatmap_height)[:, np.newaxis, np.newaxis] - pad[:, np.newaxis] +\
+        ul[:, np.newaxis]
 
     return preds
 
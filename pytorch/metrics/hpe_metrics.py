@@ -101,28 +101,17 @@ class CocoHpeOksApMetric(EvalMetric):
 
         pred_keypoints = self.recalc_pose_fn(pred_keypoints, label_bbs)
 
-        num_joints = pred_keypoints.shape[1]
-        for idx, kpt in enumerate(pred_keypoints):
-            kpt = []
-            kpt_score = 0
-            count = 0
-            for i in range(num_joints):
-                kpt += pred_keypoints[idx][i].tolist()
-                mval = float(pred_score[idx][i])
-                kpt.append(mval)
-                if mval > self._in_vis_thresh:
-                    kpt_score += mval
-                    count += 1
-
-            if count > 0:
-                kpt_score /= count
-            rescore = kpt_score * float(label_score[idx])
-
-            self._results.append({
-                "image_id": int(label_img_id[idx]),
-                "category_id": 1,
-                "keypoints": kpt,
-                "score": rescore})
+        vis_mask = (pred_score > self._in_vis_thresh)
+        kpt_scores = np.where(vis_mask, pred_score, 0.0).sum(axis=1) / np.maximum(vis_mask.sum(axis=1), 1)
+        rescores = kpt_scores * label_score
+        kpts = np.concatenate((pred_keypoints, pred_score[:, :, np.newaxis]), axis=2).reshape(
+            (pred_keypoints.shape[0], -1))
+
+        self._results.extend([{
+            "image_id": img_id,
+            "category_id": 1,
+            "keypoints": kpt,
+            "score": rescore} for img_id, kpt, rescore in zip(label_img_id.tolist(), kpts.tolist(), rescores.tolist())])
 
 
 class MpiiHpePckhMetric(EvalMetric):
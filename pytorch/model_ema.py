@@ -0,0 +1,145 @@
+"""
+    Exponential moving average (EMA) of model weights.
+"""
+
+__all__ = ['ModelEma']
+
+from collections import OrderedDict
+import torch
+
+
+class ModelEma(object):
+    """
+    Exponential moving average of model weights. Shadow weights are stored in flattened contiguous buffers (one per
+    device/dtype pair) and updated with a single fused `torch._foreach_*` call instead of a Python loop over
+    parameters. EMA weights can be used in place of the model weights without copying the model (see
+    `average_parameters`).
+
+    Parameters:
+    ----------
+    net : Module
+        Model.
+    decay : float, default 0.9998
+        EMA decay rate (per training step).
+    update_period : int, default 1
+        Number of training steps between EMA updates (the decay is raised to this power on each update).
+    """
+    def __init__(self,
+                 net,
+                 decay=0.9998,
+                 update_period=1):
+        assert (0.0 < decay < 1.0)
+        assert (update_period > 0)
+        self.decay = decay
+        self.update_period = update_period
+        self.step_count = 0
+
+        named_tensors = list(net.named_parameters()) +\
+            [(name, buf) for name, buf in net.named_buffers() if buf.dtype.is_floating_point]
+        self.names = [name for name, _ in named_tensors]
+        self.model_tensors = [tensor for _, tensor in named_tensors]
+        self.extra_buffers = [(name, buf) for name, buf in net.named_buffers() if not buf.dtype.is_floating_point]
+
+        groups = OrderedDict()
+        for i, tensor in enumerate(self.model_tensors):
+            groups.setdefault((tensor.device, tensor.dtype), []).append(i)
+        self.flat_buffers = []
+        self.groups = []
+        self.shadow_tensors = [None] * len(self.model_tensors)
+        with torch.no_grad():
+            for inds in groups.values():
+                flat_buffer = torch.cat([self.model_tensors[i].detach().reshape(-1) for i in inds])
+                views = flat_buffer.split([self.model_tensors[i].numel() for i in inds])
+                for i, view in zip(inds, views):
+                    self.shadow_tensors[i] = view.view_as(self.model_tensors[i])
+                self.flat_buffers.append(flat_buffer)
+                self.groups.append(inds)
+        self._swapped = False
+        self._model_data = None
+
+    def update(self):
+        """
+        Register a training step and update shadow weights if the update period is reached.
+        """
+        self.step_count += 1
+        if self.step_count % self.update_period != 0:
+            return
+        weight = 1.0 - self.decay ** self.update_period
+        with torch.no_grad():
+            for inds in self.groups:
+                shadow_tensors = [self.shadow_tensors[i] for i in inds]
+                model_tensors = [self.model_tensors[i].detach() for i in inds]
+                if hasattr(torch, "_foreach_lerp_"):
+                    torch._foreach_lerp_(shadow_tensors, model_tensors, weight)
+                else:
+                    torch._foreach_mul_(shadow_tensors, 1.0 - weight)
+                    torch._foreach_add_(shadow_tensors, model_tensors, alpha=weight)
+
+    def _swap_in(self):
+        assert (not self._swapped)
+        self._model_data = [tensor.data for tensor in self.model_tensors]
+        for tensor, shadow_tensor in zip(self.model_tensors, self.shadow_tensors):
+            tensor.data = shadow_tensor
+        self._swapped = True
+
+    def _swap_out(self):
+        assert self._swapped
+        for tensor, model_data in zip(self.model_tensors, self._model_data):
+            tensor.data = model_data
+        self._model_data = None
+        self._swapped = False
+
+    def average_parameters(self):
+        """
+        Context manager for temporary usage of EMA weights in the model (storages are swapped, nothing is copied).
+
+        Returns
+        -------
+        object
+            Context manager.
+        """
+        return _EmaSwapContext(self)
+
+    def state_dict(self):
+        """
+        Get EMA weights in the format of the model state dict.
+
+        Returns
+        -------
+        dict
+            EMA state dict.
+        """
+        state = OrderedDict()
+        for name, shadow_tensor in zip(self.names, self.shadow_tensors):
+            state[name] = shadow_tensor.detach().clone()
+        for name, buf in self.extra_buffers:
+            state[name] = buf.detach().clone()
+        return state
+
+    def load_state_dict(self, state_dict):
+        """
+        Load EMA weights from state dict.
+
+        Parameters:
+        ----------
+        state_dict : dict
+            EMA state dict.
+        """
+        with torch.no_grad():
+            for name, shadow_tensor in zip(self.names, self.shadow_tensors):
+                shadow_tensor.copy_(state_dict[name])
+
+
+class _EmaSwapContext(object):
+    """
+    Context for swapping model weights with EMA weights.
+    """
+    def __init__(self, ema):
+        self.ema = ema
+
+    def __enter__(self):
+        self.ema._swap_in()
+        return self.ema
+
+    def __exit__(self, *args):
+        self.ema._swap_out()
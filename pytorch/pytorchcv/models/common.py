@@ -6,7 +6,8 @@ __all__ = ['round_channels', 'Identity', 'Swish', 'HSigmoid', 'HSwish', 'get_act
            'depthwise_conv3x3', 'ConvBlock', 'conv1x1_block', 'conv3x3_block', 'conv7x7_block', 'dwconv_block',
            'dwconv3x3_block', 'dwconv5x5_block', 'dwsconv3x3_block', 'PreConvBlock', 'pre_conv1x1_block',
            'pre_conv3x3_block', 'DeconvBlock', 'NormActivation', 'InterpolationBlock', 'ChannelShuffle',
-           'ChannelShuffle2', 'SEBlock', 'DucBlock', 'IBN', 'DualPathSequential', 'Concurrent', 'SequentialConcurrent',
+           'ChannelShuffle2', 'calc_channel_shuffle_indices', 'concat_channel_shuffle', 'concat_channel_shuffle2',
+           'fold_channel_shuffles', 'SEBlock', 'DucBlock', 'IBN', 'DualPathSequential', 'Concurrent', 'SequentialConcurrent',
            'ParametricSequential', 'ParametricConcurrent', 'Hourglass', 'SesquialteralHourglass',
            'MultiOutputSequential', 'Flatten', 'HeatmapMaxDetBlock']
 
@@ -1056,6 +1057,7 @@ class ChannelShuffle(nn.Module):
         # assert (channels % groups == 0)
         if channels % groups != 0:
             raise ValueError('channels must be divisible by groups')
+        self.channels = channels
         self.groups = groups
 
     def forward(self, x):
@@ -1108,12 +1110,192 @@ class ChannelShuffle2(nn.Module):
         # assert (channels % groups == 0)
         if channels % groups != 0:
             raise ValueError('channels must be divisible by groups')
+        self.channels = channels
         self.groups = groups
 
     def forward(self, x):
         return channel_shuffle2(x, self.groups)
 
 
+def calc_channel_shuffle_indices(channels,
+                                 groups,
+                                 alternative=False):
+    """
+    Calculate channel indices of the channel shuffle operation: `channel_shuffle(x)[:, j] == x[:, indices[j]]`.
+
+    Parameters:
+    ----------
+    channels : int
+        Number of channels.
+    groups : int
+        Number of groups.
+    alternative : bool, default False
+        Whether to calculate indices for the alternative version (`channel_shuffle2`).
+
+    Returns
+    -------
+    Tensor
+        Channel indices.
+    """
+    channels_per_group = channels // groups
+    if alternative:
+        return torch.arange(channels).view(channels_per_group, groups).t().reshape(-1)
+    else:
+        return torch.arange(channels).view(groups, channels_per_group).t().reshape(-1)
+
+
+def concat_channel_shuffle(xs,
+                           groups):
+    """
+    Concatenation with the following channel shuffle (`channel_shuffle(torch.cat(xs, dim=1), groups)`), made by a single
+    copy when possible.
+
+    Parameters:
+    ----------
+    xs : tuple/list of Tensor
+        Input tensors.
+    groups : int
+        Number of groups.
+
+    Returns
+    -------
+    Tensor
+        Resulted tensor.
+    """
+    if (len(xs) == groups) and all([x.size() == xs[0].size() for x in xs]):
+        batch, channels, height, width = xs[0].size()
+        return torch.stack(tuple(xs), dim=2).view(batch, groups * channels, height, width)
+    return channel_shuffle(torch.cat(tuple(xs), dim=1), groups)
+
+
+def concat_channel_shuffle2(xs,
+                            groups):
+    """
+    Concatenation with the following alternative channel shuffle (`channel_shuffle2(torch.cat(xs, dim=1), groups)`),
+    made by a single copy when possible.
+
+    Parameters:
+    ----------
+    xs : tuple/list of Tensor
+        Input tensors.
+    groups : int
+        Number of groups.
+
+    Returns
+    -------
+    Tensor
+        Resulted tensor.
+    """
+    if all([x.size(1) % groups == 0 for x in xs]):
+        return torch.cat([x[:, i::groups] for i in range(groups) for x in xs], dim=1)
+    return channel_shuffle2(torch.cat(tuple(xs), dim=1), groups)
+
+
+def _collect_shuffle_fold(node,
+                          modules,
+                          use_counts):
+    """
+    Collect modules for folding of the channel permutation in the node output. The permutation passes through
+    channel-wise modules (batch normalizations, activations, depthwise convolutions) and should be absorbed by ordinary
+    (not grouped) convolutions on all paths.
+
+    Returns
+    -------
+    tuple of two lists of nn.Module or None
+        Channel-wise modules and absorbing convolutions (or None if folding is impossible).
+    """
+    channelwise_modules = []
+    absorbing_convs = []
+    stack = [node]
+    while stack:
+        for user in stack.pop().users:
+            if (user.op != "call_module") or (use_counts[user.target] != 1) or (len(user.args) != 1) or user.kwargs:
+                return None
+            module = modules[user.target]
+            if isinstance(module, nn.Conv2d) and (module.groups == 1):
+                absorbing_convs.append(module)
+            elif isinstance(module, (nn.BatchNorm2d, nn.ReLU, nn.ReLU6, nn.Sigmoid, Identity, Swish, HSigmoid, HSwish)) or\
+                    (isinstance(module, nn.Conv2d) and (module.groups == module.in_channels == module.out_channels)):
+                channelwise_modules.append(module)
+                stack.append(user)
+            else:
+                return None
+    return channelwise_modules, absorbing_convs
+
+
+def fold_channel_shuffles(net):
+    """
+    Remove channel shuffles from the model for inference. A shuffle is a fixed channel permutation, so it is folded into
+    weights of the following ordinary convolutions (through batch normalizations, activations, and depthwise
+    convolutions in between). A grouped convolution can't absorb a shuffle (the shuffle mixes its groups), so if folding
+    is impossible, a shuffle after a concatenation is merged with it into a single copy, and other shuffles are kept.
+    Works for models traceable by `torch.fx`. The source model is left unchanged (weights are folded in a copy).
+
+    Parameters:
+    ----------
+    net : Module
+        Model.
+
+    Returns
+    -------
+    GraphModule
+        Converted model.
+    """
+    import copy
+    import torch.fx
+
+    class ShuffleTracer(torch.fx.Tracer):
+        def is_leaf_module(self, m, module_qualified_name):
+            return isinstance(m, (ChannelShuffle, ChannelShuffle2)) or\
+                super(ShuffleTracer, self).is_leaf_module(m, module_qualified_name)
+
+    net = copy.deepcopy(net)
+    net.eval()
+    graph = ShuffleTracer().trace(net)
+    modules = dict(net.named_modules())
+    use_counts = {}
+    for node in graph.nodes:
+        if node.op == "call_module":
+            use_counts[node.target] = use_counts.get(node.target, 0) + 1
+
+    for node in list(graph.nodes):
+        if (node.op != "call_module") or (not isinstance(modules[node.target], (ChannelShuffle, ChannelShuffle2))):
+            continue
+        shuffle = modules[node.target]
+        alternative = isinstance(shuffle, ChannelShuffle2)
+        x = node.args[0]
+        indices = calc_channel_shuffle_indices(shuffle.channels, shuffle.groups, alternative)
+        inv_indices = torch.argsort(indices)
+        fold = _collect_shuffle_fold(node, modules, use_counts)
+        if (shuffle.groups == 1) or (fold is not None):
+            if shuffle.groups != 1:
+                channelwise_modules, absorbing_convs = fold
+                with torch.no_grad():
+                    for module in channelwise_modules:
+                        for tensor in list(module.parameters(recurse=False)) + list(module.buffers(recurse=False)):
+                            if tensor.dim() > 0:
+                                tensor.copy_(tensor[inv_indices])
+                    for conv in absorbing_convs:
+                        conv.weight.copy_(conv.weight[:, inv_indices])
+            node.replace_all_uses_with(x)
+            graph.erase_node(node)
+        elif (x.op == "call_function") and (x.target == torch.cat) and (len(x.users) == 1) and\
+                ((x.args[1] if len(x.args) > 1 else x.kwargs.get("dim", 0)) == 1):
+            with graph.inserting_after(node):
+                fused_node = graph.call_function(
+                    concat_channel_shuffle2 if alternative else concat_channel_shuffle,
+                    args=(x.args[0], shuffle.groups))
+            node.replace_all_uses_with(fused_node)
+            graph.erase_node(node)
+            graph.erase_node(x)
+
+    result = torch.fx.GraphModule(net, graph)
+    for name in ["in_size", "num_classes"]:
+        if hasattr(net, name):
+            setattr(result, name, getattr(net, name))
+    return result
+
+
 class SEBlock(nn.Module):
     """
     Squeeze-and-Excitation block from 'Squeeze-and-Excitation Networks,' https://arxiv.org/abs/1709.01507.
@@ -4,14 +4,14 @@
     https://arxiv.org/abs/1711.09224.
 """
 
-__all__ = ['CondenseNet', 'condensenet74_c4_g4', 'condensenet74_c8_g8']
+__all__ = ['CondenseNet', 'condensenet74_c4_g4', 'condensenet74_c8_g8', 'convert_condensenet_for_inference']
 
 import os
 import torch
 import torch.nn as nn
 import torch.nn.init as init
 from torch.autograd import Variable
-from .common import ChannelShuffle
+from .common import ChannelShuffle, Identity
 
 
 class CondenseSimpleConv(nn.Module):
@@ -302,6 +302,85 @@ class CondenseLinear(nn.Module):
         return x
 
 
+class CondensedComplexConv(nn.Module):
+    """
+    Inference version of CondenseNet specific complex 1x1 convolution block. The grouped convolution, the channel
+    shuffle, and the batch normalization with the activation of the next block are merged into per-group matrix
+    multiplications, which write their results directly into the shuffled channel positions.
+
+    Parameters:
+    ----------
+    block : CondenseComplexConv
+        Source complex convolution block.
+    next_bn : BatchNorm2d
+        Batch normalization of the next block.
+    """
+    def __init__(self,
+                 block,
+                 next_bn):
+        super(CondensedComplexConv, self).__init__()
+        conv = block.conv
+        assert (conv.kernel_size == (1, 1)) and (conv.stride == (1, 1)) and (conv.padding == (0, 0))
+        self.groups = conv.groups
+        self.bn = block.bn
+        self.activ = block.activ
+        self.register_buffer("index", block.index.clone())
+
+        out_channels = conv.out_channels
+        channels_per_group = out_channels // self.groups
+        with torch.no_grad():
+            scale = next_bn.weight / torch.sqrt(next_bn.running_var + next_bn.eps)
+            shift = next_bn.bias - next_bn.running_mean * scale
+            # Shuffled channel `j * groups + i` is the channel `i * channels_per_group + j` of the convolution:
+            scale = scale.view(channels_per_group, self.groups).t()
+            weight = conv.weight.view(self.groups, channels_per_group, -1) * scale.unsqueeze(2)
+        self.weight = nn.Parameter(weight.contiguous())
+        self.bias = nn.Parameter(shift.view(1, channels_per_group, self.groups, 1).contiguous())
+
+    def forward(self, x):
+        x = torch.index_select(x, dim=1, index=self.index)
+        x = self.bn(x)
+        x = self.activ(x)
+        batch, _, height, width = x.size()
+        x = x.view(batch, self.groups, -1, height * width)
+        y = x.new_empty((batch, self.weight.size(1), self.groups, height * width))
+        for i in range(self.groups):
+            torch.matmul(self.weight[i], x[:, i], out=y[:, :, i])
+        y += self.bias
+        y = y.relu_()
+        y = y.view(batch, -1, height, width)
+        return y
+
+
+def condense_linear(block,
+                    in_features):
+    """
+    Convert CondenseNet specific linear block into a linear layer over all input features (the feature selection is
+    baked into the weight matrix).
+
+    Parameters:
+    ----------
+    block : CondenseLinear
+        Source linear block.
+    in_features : int
+        Number of all input features.
+
+    Returns
+    -------
+    Linear
+        Linear layer.
+    """
+    linear = block.linear
+    result = nn.Linear(
+        in_features=in_features,
+        out_features=linear.out_features)
+    with torch.no_grad():
+        result.weight.zero_()
+        result.weight.index_add_(1, block.index, linear.weight)
+        result.bias.copy_(linear.bias)
+    return result
+
+
 class CondenseNet(nn.Module):
     """
     CondenseNet model (converted) from 'CondenseNet: An Efficient DenseNet using Learned Group Convolutions,'
@@ -379,6 +458,37 @@ class CondenseNet(nn.Module):
         return x
 
 
+def convert_condensenet_for_inference(net):
+    """
+    Convert CondenseNet model for fast inference (in place). Channel shuffles and the following batch normalizations
+    are merged into the preceding grouped 1x1 convolutions, and the feature selection of the classifier is baked into
+    its weights. The converted model is for inference only.
+
+    Parameters:
+    ----------
+    net : CondenseNet
+        Model.
+
+    Returns
+    -------
+    CondenseNet
+        Converted model.
+    """
+    net.eval()
+    for module in net.modules():
+        if isinstance(module, CondenseUnit) and isinstance(module.conv1, CondenseComplexConv):
+            module.conv1 = CondensedComplexConv(
+                block=module.conv1,
+                next_bn=module.conv2.bn)
+            module.conv2.bn = Identity()
+            module.conv2.activ = Identity()
+    if isinstance(net.output, CondenseLinear):
+        net.output = condense_linear(
+            block=net.output,
+            in_features=net.features.post_activ.bn.num_features)
+    return net
+
+
 def get_condensenet(num_layers,
                     groups=4,
                     model_name=None,
@@ -501,6 +611,21 @@ def _test():
         y.sum().backward()
         assert (tuple(y.size()) == (1, 1000))
 
+        for module in net.modules():
+            if isinstance(module, (CondenseComplexConv, CondenseLinear)):
+                num_source = module.index.size(0) * (2 if isinstance(module, CondenseLinear) else 1)
+                module.index.copy_(torch.randint(0, num_source, module.index.size()))
+            elif isinstance(module, nn.BatchNorm2d):
+                module.running_mean.uniform_(-0.5, 0.5)
+                module.running_var.uniform_(0.5, 2.0)
+                module.weight.data.uniform_(0.5, 1.5)
+                module.bias.data.uniform_(-0.5, 0.5)
+        x = torch.randn(2, 3, 224, 224)
+        with torch.no_grad():
+            y_ref = net(x)
+            y = convert_condensenet_for_inference(net)(x)
+        assert ((y - y_ref).abs().max() < 1e-3 * y_ref.abs().max())
+
 
 if __name__ == "__main__":
     _test()
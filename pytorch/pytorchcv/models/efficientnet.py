@@ -5,8 +5,8 @@
     - 'Adversarial Examples Improve Image Recognition,' https://arxiv.org/abs/1911.09665.
 """
 
-__all__ = ['EfficientNet', 'calc_tf_padding', 'EffiInvResUnit', 'EffiInitBlock', 'efficientnet_b0', 'efficientnet_b1',
-           'efficientnet_b2', 'efficientnet_b3', 'efficientnet_b4', 'efficientnet_b5', 'efficientnet_b6',
+__all__ = ['EfficientNet', 'calc_tf_padding', 'apply_tf_padding', 'EffiInvResUnit', 'EffiInitBlock', 'efficientnet_b0',
+           'efficientnet_b1', 'efficientnet_b2', 'efficientnet_b3', 'efficientnet_b4', 'efficientnet_b5', 'efficientnet_b6',
            'efficientnet_b7', 'efficientnet_b8', 'efficientnet_b0b', 'efficientnet_b1b', 'efficientnet_b2b',
            'efficientnet_b3b', 'efficientnet_b4b', 'efficientnet_b5b', 'efficientnet_b6b', 'efficientnet_b7b',
            'efficientnet_b0c', 'efficientnet_b1c', 'efficientnet_b2c', 'efficientnet_b3c', 'efficientnet_b4c',
@@ -41,14 +41,61 @@ def calc_tf_padding(x,
     Returns
     -------
     tuple of 4 int
-        The size of the padding.
+        The size of the padding (left, right, top, bottom as for `F.pad`).
     """
     height, width = x.size()[2:]
     oh = math.ceil(height / stride)
     ow = math.ceil(width / stride)
     pad_h = max((oh - 1) * stride + (kernel_size - 1) * dilation + 1 - height, 0)
     pad_w = max((ow - 1) * stride + (kernel_size - 1) * dilation + 1 - width, 0)
-    return pad_h // 2, pad_h - pad_h // 2, pad_w // 2, pad_w - pad_w // 2
+    return pad_w // 2, pad_w - pad_w // 2, pad_h // 2, pad_h - pad_h // 2
+
+
+def apply_tf_padding(x,
+                     conv,
+                     cache,
+                     kernel_size,
+                     stride=1,
+                     dilation=1,
+                     fold=True):
+    """
+    Apply TF-same like padding for the convolution. The padding is calculated once per input resolution and cached.
+    Symmetric padding is folded into the padding of the convolution itself, so no padded copy of the input is made.
+
+    Parameters:
+    ----------
+    x : tensor
+        Input tensor.
+    conv : nn.Conv2d
+        Convolution layer (its padding is updated).
+    cache : dict
+        Cache of paddings for input resolutions.
+    kernel_size : int
+        Convolution window size.
+    stride : int, default 1
+        Strides of the convolution.
+    dilation : int, default 1
+        Dilation value for convolution layer.
+    fold : bool, default True
+        Whether to fold symmetric padding into the convolution.
+
+    Returns
+    -------
+    tensor
+        Padded (if required) input tensor.
+    """
+    key = (tuple(x.size()[2:]), fold)
+    if key not in cache:
+        pad = calc_tf_padding(x, kernel_size=kernel_size, stride=stride, dilation=dilation)
+        if fold and (pad[0] == pad[1]) and (pad[2] == pad[3]):
+            cache[key] = ((pad[2], pad[0]), None)
+        else:
+            cache[key] = ((0, 0), (pad if any(pad) else None))
+    conv_padding, pad = cache[key]
+    conv.padding = conv_padding
+    if pad is not None:
+        x = F.pad(x, pad=pad)
+    return x
 
 
 class EffiDwsConvUnit(nn.Module):
@@ -80,6 +127,8 @@ class EffiDwsConvUnit(nn.Module):
                  tf_mode):
         super(EffiDwsConvUnit, self).__init__()
         self.tf_mode = tf_mode
+        self.fold_tf_padding = True
+        self.tf_paddings = {}
         self.residual = (in_channels == out_channels) and (stride == 1)
 
         self.dw_conv = dwconv3x3_block(
@@ -102,7 +151,7 @@ class EffiDwsConvUnit(nn.Module):
         if self.residual:
             identity = x
         if self.tf_mode:
-            x = F.pad(x, pad=calc_tf_padding(x, kernel_size=3))
+            x = apply_tf_padding(x, self.dw_conv.conv, self.tf_paddings, kernel_size=3, fold=self.fold_tf_padding)
         x = self.dw_conv(x)
         x = self.se(x)
         x = self.pw_conv(x)
@@ -150,6 +199,8 @@ class EffiInvResUnit(nn.Module):
         self.kernel_size = kernel_size
         self.stride = stride
         self.tf_mode = tf_mode
+        self.fold_tf_padding = True
+        self.tf_paddings = {}
         self.residual = (in_channels == out_channels) and (stride == 1)
         self.use_se = se_factor > 0
         mid_channels = in_channels * exp_factor
@@ -183,7 +234,8 @@ class EffiInvResUnit(nn.Module):
             identity = x
         x = self.conv1(x)
         if self.tf_mode:
-            x = F.pad(x, pad=calc_tf_padding(x, kernel_size=self.kernel_size, stride=self.stride))
+            x = apply_tf_padding(x, self.conv2.conv, self.tf_paddings, kernel_size=self.kernel_size, stride=self.stride,
+                                 fold=self.fold_tf_padding)
         x = self.conv2(x)
         if self.use_se:
             x = self.se(x)
@@ -219,6 +271,8 @@ class EffiInitBlock(nn.Module):
                  tf_mode):
         super(EffiInitBlock, self).__init__()
         self.tf_mode = tf_mode
+        self.fold_tf_padding = True
+        self.tf_paddings = {}
 
         self.conv = conv3x3_block(
             in_channels=in_channels,
@@ -230,7 +284,8 @@ class EffiInitBlock(nn.Module):
 
     def forward(self, x):
         if self.tf_mode:
-            x = F.pad(x, pad=calc_tf_padding(x, kernel_size=3, stride=2))
+            x = apply_tf_padding(x, self.conv.conv, self.tf_paddings, kernel_size=3, stride=2,
+                                 fold=self.fold_tf_padding)
         x = self.conv(x)
         return x
 
@@ -1016,6 +1071,20 @@ def _test():
         y.sum().backward()
         assert (tuple(y.size()) == (1, 1000))
 
+    net = efficientnet_b0b(pretrained=pretrained)
+    net.eval()
+    tf_modules = [m for m in net.modules() if hasattr(m, "fold_tf_padding")]
+    with torch.no_grad():
+        for in_size in [(224, 224), (225, 225), (240, 240), (256, 200)]:
+            x = torch.randn(1, 3, in_size[0], in_size[1])
+            y = net(x)
+            for module in tf_modules:
+                module.fold_tf_padding = False
+            y_ref = net(x)
+            for module in tf_modules:
+                module.fold_tf_padding = True
+            assert ((y - y_ref).abs().max() < 1e-4)
+
 
 if __name__ == "__main__":
     _test()
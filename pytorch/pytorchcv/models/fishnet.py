@@ -31,6 +31,8 @@ def channel_squeeze(x,
     Tensor
         Resulted tensor.
     """
+    if groups == 2:
+        return x[:, 0::2] + x[:, 1::2]
     batch, channels, height, width = x.size()
     channels_per_group = channels // groups
     x = x.view(batch, channels_per_group, groups, height, width).sum(dim=2)
@@ -8,9 +8,11 @@ __all__ = ['iSQRTCOVResNet', 'isqrtcovresnet18', 'isqrtcovresnet34', 'isqrtcovre
            'isqrtcovresnet101', 'isqrtcovresnet101b']
 
 import os
+import inspect
 import torch
 import torch.nn as nn
 import torch.nn.init as init
+from torch.utils.checkpoint import checkpoint
 from .common import conv1x1_block
 from .resnet import ResUnit, ResInitBlock
 
@@ -139,6 +141,99 @@ class Triuvec(torch.autograd.Function):
         return grad_x
 
 
+_triu_indices = {}
+
+
+def get_triu_indices(n,
+                     device):
+    """
+    Get (cached) flat indices of the upper triangular part of a square matrix.
+
+    Parameters:
+    ----------
+    n : int
+        Matrix size.
+    device : torch.device
+        Device for indices.
+
+    Returns
+    -------
+    Tensor
+        Flat indices.
+    """
+    key = (n, str(device))
+    if key not in _triu_indices:
+        rows, cols = torch.triu_indices(n, n, device=device)
+        _triu_indices[key] = rows * n + cols
+    return _triu_indices[key]
+
+
+def isqrt_cov(x,
+              num_iter):
+    """
+    Fused iSQRT-COV pooling: covariance, Newton-Schulz matrix square root, and upper triangular part extraction. The
+    covariance is computed from centered features without auxiliary (HW x HW) matrices, each Newton-Schulz step is a
+    single `baddbmm`, and the trace rescaling is applied to the extracted vector only. Without gradients the iteration
+    reuses preallocated workspace buffers. Half precision inputs are processed in float32.
+
+    Parameters:
+    ----------
+    x : Tensor
+        Input tensor (batch * channels * height * width).
+    num_iter : int
+        Number of iterations (num_iter > 1).
+
+    Returns
+    -------
+    Tensor
+        Upper triangular part of the normalized covariance matrix (batch * (channels * (channels + 1) / 2)).
+    """
+    assert (num_iter > 1)
+    dtype = x.dtype
+    if dtype in (torch.float16, torch.bfloat16):
+        x = x.float()
+    batch, channels, height, width = x.size()
+    n = height * width
+    xn = x.reshape(batch, channels, n)
+    xn = xn - xn.mean(dim=2, keepdim=True)
+    sigma = xn.bmm(xn.transpose(1, 2)) / n
+
+    x_trace = sigma.diagonal(dim1=1, dim2=2).sum(dim=1).clamp(min=torch.finfo(sigma.dtype).tiny).view(batch, 1, 1)
+    a = sigma / x_trace
+    identity = torch.eye(channels, dtype=a.dtype, device=a.device).unsqueeze(dim=0)
+    i15 = 1.5 * identity
+
+    if torch.is_grad_enabled() and a.requires_grad:
+        b = i15 - 0.5 * a
+        y = a.bmm(b)
+        z = b
+        for _ in range(1, num_iter - 1):
+            b = torch.baddbmm(i15, z, y, alpha=-0.5)
+            y, z = y.bmm(b), b.bmm(z)
+        y = y.bmm(torch.baddbmm(i15, z, y, alpha=-0.5))
+    else:
+        b = torch.add(i15, a, alpha=-0.5)
+        y = a.bmm(b)
+        y_next = torch.empty_like(y)
+        z = b.clone()
+        z_next = torch.empty_like(z)
+        for _ in range(1, num_iter - 1):
+            torch.baddbmm(i15, z, y, alpha=-0.5, out=b)
+            torch.bmm(y, b, out=y_next)
+            torch.bmm(b, z, out=z_next)
+            y, y_next = y_next, y
+            z, z_next = z_next, z
+        torch.baddbmm(i15, z, y, alpha=-0.5, out=b)
+        y = torch.bmm(y, b, out=y_next)
+
+    y = y.reshape(batch, -1).index_select(dim=1, index=get_triu_indices(channels, y.device))
+    y = y * x_trace.view(batch, 1).sqrt()
+    return y.to(dtype)
+
+
+_use_reentrant_supported = ("use_reentrant" in inspect.signature(checkpoint).parameters)
+
+
 class iSQRTCOVPool(nn.Module):
     """
     iSQRT-COV pooling layer.
@@ -147,20 +242,42 @@ class iSQRTCOVPool(nn.Module):
     ----------
     num_iter : int, default 5
         Number of iterations (num_iter > 1).
+    fused : bool, default True
+        Whether to use the fused implementation (otherwise separate autograd functions are used).
+    chunk_size : int, default 0
+        Batch chunk size for the fused implementation (0 means no chunking). Chunks are recomputed in backward pass, so
+        the memory for the (channels x channels) intermediates is bounded by the chunk size.
     """
     def __init__(self,
-                 num_iter=5):
+                 num_iter=5,
+                 fused=True,
+                 chunk_size=0):
         super(iSQRTCOVPool, self).__init__()
         self.num_iter = num_iter
+        self.fused = fused
+        self.chunk_size = chunk_size
         self.cov_pool = CovPool.apply
         self.sqrt = NewtonSchulzSqrt.apply
         self.triuvec = Triuvec.apply
 
     def forward(self, x):
-        x = self.cov_pool(x)
-        x = self.sqrt(x, self.num_iter)
-        x = self.triuvec(x)
-        return x
+        if not self.fused:
+            x = self.cov_pool(x)
+            x = self.sqrt(x, self.num_iter)
+            x = self.triuvec(x)
+            return x
+        if (self.chunk_size <= 0) or (x.size(0) <= self.chunk_size):
+            return isqrt_cov(x, self.num_iter)
+        outs = []
+        for x_i in x.split(self.chunk_size):
+            if torch.is_grad_enabled() and x_i.requires_grad:
+                if _use_reentrant_supported:
+                    outs.append(checkpoint(isqrt_cov, x_i, self.num_iter, use_reentrant=False))
+                else:
+                    outs.append(checkpoint(isqrt_cov, x_i, self.num_iter))
+            else:
+                outs.append(isqrt_cov(x_i, self.num_iter))
+        return torch.cat(outs, dim=0)
 
 
 class iSQRTCOVResNet(nn.Module):
@@ -449,6 +566,20 @@ def _test():
         y.sum().backward()
         assert (tuple(y.size()) == (14, 1000))
 
+    x = torch.randn(4, 64, 7, 7, dtype=torch.float64, requires_grad=True)
+    pool = iSQRTCOVPool(fused=False)
+    y_ref = pool(x).view(x.size(0), -1)
+    grad_ref, = torch.autograd.grad(y_ref.sum(), x)
+    for chunk_size in [0, 3]:
+        pool = iSQRTCOVPool(chunk_size=chunk_size)
+        y = pool(x)
+        grad, = torch.autograd.grad(y.sum(), x)
+        assert ((y - y_ref).abs().max() < 1e-10) and ((grad - grad_ref).abs().max() < 1e-8)
+        with torch.no_grad():
+            assert ((pool(x) - y_ref).abs().max() < 1e-10)
+    y = iSQRTCOVPool()(x.detach().bfloat16())
+    assert (y.dtype == torch.bfloat16) and ((y.double() - y_ref).abs().max() < 0.05 * y_ref.abs().max())
+
 
 if __name__ == "__main__":
     _test()
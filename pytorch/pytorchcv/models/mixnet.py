@@ -3,11 +3,13 @@
     Original paper: 'MixConv: Mixed Depthwise Convolutional Kernels,' https://arxiv.org/abs/1907.09595.
 """
 
-__all__ = ['MixNet', 'mixnet_s', 'mixnet_m', 'mixnet_l']
+__all__ = ['MixNet', 'mixnet_s', 'mixnet_m', 'mixnet_l', 'autotune_mixconv']
 
 import os
+import time
 import torch
 import torch.nn as nn
+import torch.nn.functional as F
 import torch.nn.init as init
 from .common import round_channels, get_activation_layer, conv1x1_block, conv3x3_block, dwconv3x3_block, SEBlock
 
@@ -36,6 +38,11 @@ class MixConv(nn.Module):
         Whether the layer uses a bias vector.
     axis : int, default 1
         The axis on which to concatenate the outputs.
+
+    The layer has two execution modes (the `mode` attribute): 'split' runs a separate convolution for each kernel size
+    and concatenates the results, 'fused' zero pads the smaller kernels up to the largest one and runs a single
+    (grouped) convolution. The fused mode is available only if all the parts have the same number of channels per group,
+    and centered padding (`fusable` attribute).
     """
     def __init__(self,
                  in_channels,
@@ -69,8 +76,77 @@ class MixConv(nn.Module):
                     groups=(out_channels_i if out_channels == groups else groups),
                     bias=bias))
         self.axis = axis
+        self.mode = "split"
+        self.fusable = self.init_fused_kwargs()
+        self.fused_params = None
+        self.fused_params_key = None
+
+    def init_fused_kwargs(self):
+        """
+        Calculate parameters of the single fused convolution.
+
+        Returns
+        -------
+        bool
+            Whether the layer can be fused.
+        """
+        convs = list(self._modules.values())
+        conv0 = convs[0]
+        if (self.axis != 1) or any([(conv.stride != conv0.stride) or (conv.dilation != conv0.dilation) or
+                                    ((conv.bias is None) != (conv0.bias is None)) or
+                                    (conv.in_channels // conv.groups != conv0.in_channels // conv0.groups) or
+                                    (conv.out_channels // conv.groups != conv0.out_channels // conv0.groups)
+                                    for conv in convs]):
+            return False
+        kernel_size = tuple(max([conv.kernel_size[i] for conv in convs]) for i in range(2))
+        paddings = set()
+        for conv in convs:
+            diff = [kernel_size[i] - conv.kernel_size[i] for i in range(2)]
+            if (diff[0] % 2 != 0) or (diff[1] % 2 != 0):
+                return False
+            paddings.add(tuple(conv.padding[i] + (diff[i] // 2) * conv.dilation[i] for i in range(2)))
+        if len(paddings) != 1:
+            return False
+        self.fused_kernel_size = kernel_size
+        self.fused_kwargs = {
+            "stride": conv0.stride,
+            "padding": paddings.pop(),
+            "dilation": conv0.dilation,
+            "groups": sum([conv.groups for conv in convs])}
+        return True
+
+    def calc_fused_params(self):
+        """
+        Calculate weight and bias of the single fused convolution.
+
+        Returns
+        -------
+        tuple of two Tensors
+            Weight and bias (or None).
+        """
+        convs = list(self._modules.values())
+        weights = []
+        for conv in convs:
+            dh = (self.fused_kernel_size[0] - conv.kernel_size[0]) // 2
+            dw = (self.fused_kernel_size[1] - conv.kernel_size[1]) // 2
+            weights.append(F.pad(conv.weight, pad=(dw, dw, dh, dh)))
+        weight = torch.cat(weights, dim=0)
+        bias = torch.cat([conv.bias for conv in convs]) if convs[0].bias is not None else None
+        return weight, bias
+
+    def get_fused_params(self):
+        if torch.is_grad_enabled():
+            return self.calc_fused_params()
+        key = tuple((conv.weight.data_ptr(), conv.weight._version) for conv in self._modules.values())
+        if key != self.fused_params_key:
+            self.fused_params = self.calc_fused_params()
+            self.fused_params_key = key
+        return self.fused_params
 
     def forward(self, x):
+        if self.mode == "fused":
+            weight, bias = self.get_fused_params()
+            return F.conv2d(x, weight, bias, **self.fused_kwargs)
         xx = torch.split(x, self.splitted_in_channels, dim=self.axis)
         out = [conv_i(x_i) for x_i, conv_i in zip(xx, self._modules.values())]
         x = torch.cat(tuple(out), dim=self.axis)
@@ -441,6 +517,55 @@ class MixNet(nn.Module):
         return x
 
 
+def autotune_mixconv(net,
+                     x,
+                     num_iters=5):
+    """
+    Choose the faster execution mode (split or fused) for each fusable mixed convolution layer of the model (in place).
+    Layers are timed on their actual inputs for the given input tensor, so tuning is done once per input shape.
+
+    Parameters:
+    ----------
+    net : Module
+        Model.
+    x : Tensor
+        Input tensor.
+    num_iters : int, default 5
+        Number of measured iterations for each layer and mode (the best time is used).
+
+    Returns
+    -------
+    dict of str to str
+        Chosen modes for layers.
+    """
+    net.eval()
+    inputs = {}
+    hooks = []
+    for module in net.modules():
+        if isinstance(module, MixConv) and module.fusable:
+            hooks.append(module.register_forward_pre_hook(lambda m, inp: inputs.setdefault(m, inp[0])))
+    with torch.no_grad():
+        net(x)
+        for hook in hooks:
+            hook.remove()
+        modes = {}
+        for name, module in net.named_modules():
+            if module not in inputs:
+                continue
+            times = {}
+            for mode in ["split", "fused"]:
+                module.mode = mode
+                module(inputs[module])
+                times[mode] = float("inf")
+                for _ in range(num_iters):
+                    tic = time.time()
+                    module(inputs[module])
+                    times[mode] = min(times[mode], time.time() - tic)
+            module.mode = min(times, key=times.get)
+            modes[name] = module.mode
+    return modes
+
+
 def get_mixnet(version,
                width_scale,
                model_name=None,
@@ -591,6 +716,20 @@ def _test():
         y.sum().backward()
         assert (tuple(y.size()) == (1, 1000))
 
+        mixconvs = [m for m in net.modules() if isinstance(m, MixConv)]
+        assert all([m.fusable for m in mixconvs])
+        x = torch.randn(2, 3, 224, 224)
+        with torch.no_grad():
+            y_ref = net(x)
+            for module in mixconvs:
+                module.mode = "fused"
+            y = net(x)
+            assert ((y - y_ref).abs().max() < 1e-4)
+            modes = autotune_mixconv(net, x, num_iters=1)
+            assert (len(modes) == len(mixconvs))
+            y = net(x)
+            assert ((y - y_ref).abs().max() < 1e-4)
+
 
 if __name__ == "__main__":
     _test()
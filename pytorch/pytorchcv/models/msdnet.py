@@ -4,7 +4,7 @@
     https://arxiv.org/abs/1703.09844.
 """
 
-__all__ = ['MSDNet', 'msdnet22', 'MultiOutputSequential', 'MSDFeatureBlock']
+__all__ = ['MSDNet', 'msdnet22', 'MultiOutputSequential', 'MSDFeatureBlock', 'msdnet_anytime_forward']
 
 import os
 import math
@@ -383,6 +383,62 @@ class MSDClassifier(nn.Module):
         return x
 
 
+def msdnet_anytime_forward(net,
+                           x,
+                           thresholds):
+    """
+    Anytime (early-exit) inference for MSDNet-like models. Each sample exits at the first classifier with the maximal
+    softmax probability not less than the corresponding threshold (at the last classifier at least). Samples that
+    don't exit continue through the cascade in a shrinking sub-batch, so the later feature blocks are computed only for
+    the hard samples. The model should be in the evaluation mode (the batch normalization is per-sample only there).
+
+    Parameters:
+    ----------
+    net : Module
+        Model with `init_layer`, `feature_blocks`, and `classifiers`.
+    x : Tensor
+        Input batch.
+    thresholds : list/tuple of float
+        Confidence thresholds for classifiers (the threshold for the last classifier is ignored and may be omitted).
+
+    Returns
+    -------
+    Tensor
+        Logits of the exit classifier for each sample.
+    Tensor
+        Exit classifier index for each sample.
+    """
+    num_exits = len(net.classifiers)
+    assert (not net.training)
+    assert (len(thresholds) in (num_exits - 1, num_exits))
+
+    batch = x.size(0)
+    logits = None
+    exits = torch.full((batch,), num_exits - 1, dtype=torch.long, device=x.device)
+    active = torch.arange(batch, device=x.device)
+
+    x = net.init_layer(x)
+    for i, (feature_block, classifier) in enumerate(zip(net.feature_blocks, net.classifiers)):
+        x = feature_block(x)
+        y = classifier(x[-1])
+        if logits is None:
+            logits = y.new_empty((batch, y.size(1)))
+        if i == num_exits - 1:
+            logits[active] = y
+            break
+        done = (y.softmax(dim=1).max(dim=1)[0] >= thresholds[i])
+        done_active = active[done]
+        logits[done_active] = y[done]
+        exits[done_active] = i
+        if bool(done.all()):
+            break
+        if bool(done.any()):
+            keep = ~done
+            active = active[keep]
+            x = [x_i[keep] for x_i in x]
+    return logits, exits
+
+
 class MSDNet(nn.Module):
     """
     MSDNet model from 'Multi-Scale Dense Networks for Resource Efficient Image Classification,'
@@ -459,6 +515,9 @@ class MSDNet(nn.Module):
         else:
             return outs
 
+    def forward_anytime(self, x, thresholds):
+        return msdnet_anytime_forward(self, x, thresholds)
+
 
 def get_msdnet(blocks,
                model_name=None,
@@ -611,6 +670,14 @@ def _test():
         y.sum().backward()
         assert (tuple(y.size()) == (1, 1000))
 
+        x = torch.randn(4, 3, 224, 224)
+        with torch.no_grad():
+            outs = net(x, only_last=False)
+            y, exits = net.forward_anytime(x, thresholds=[1.1] * (len(outs) - 1))
+            assert ((exits == len(outs) - 1).all() and (y - outs[-1]).abs().max() < 1e-4)
+            y, exits = net.forward_anytime(x, thresholds=[0.0] * (len(outs) - 1))
+            assert ((exits == 0).all() and (y - outs[0]).abs().max() < 1e-4)
+
 
 if __name__ == "__main__":
     _test()
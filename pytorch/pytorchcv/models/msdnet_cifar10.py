@@ -11,7 +11,7 @@ import math
 import torch.nn as nn
 import torch.nn.init as init
 from .common import conv3x3_block
-from .msdnet import MultiOutputSequential, MSDFeatureBlock
+from .msdnet import MultiOutputSequential, MSDFeatureBlock, msdnet_anytime_forward
 
 
 class CIFAR10MSDInitLayer(nn.Module):
@@ -163,6 +163,9 @@ class CIFAR10MSDNet(nn.Module):
         else:
             return outs
 
+    def forward_anytime(self, x, thresholds):
+        return msdnet_anytime_forward(self, x, thresholds)
+
 
 def get_msdnet_cifar10(blocks,
                        model_name=None,
@@ -315,6 +318,14 @@ def _test():
         y.sum().backward()
         assert (tuple(y.size()) == (1, 10))
 
+        x = torch.randn(8, 3, 32, 32)
+        with torch.no_grad():
+            outs = net(x, only_last=False)
+            thresholds = [float(o.softmax(dim=1).max(dim=1)[0].median()) for o in outs[:-1]]
+            y, exits = net.forward_anytime(x, thresholds=thresholds)
+            y_ref = torch.stack(outs, dim=1)[torch.arange(x.size(0)), exits]
+            assert ((y - y_ref).abs().max() < 1e-4)
+
 
 if __name__ == "__main__":
     _test()
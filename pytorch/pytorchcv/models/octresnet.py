@@ -4,10 +4,11 @@
     Convolution,' https://arxiv.org/abs/1904.05049.
 """
 
-__all__ = ['OctResNet', 'octresnet10_ad2', 'octresnet50b_ad2', 'OctResUnit']
+__all__ = ['OctResNet', 'octresnet10_ad2', 'octresnet50b_ad2', 'OctResUnit', 'convert_octresnet_for_inference']
 
 import os
 from inspect import isfunction
+import torch
 import torch.nn as nn
 import torch.nn.functional as F
 import torch.nn.init as init
@@ -264,6 +265,91 @@ class OctConvBlock(nn.Module):
         return hx, lx
 
 
+class FusedOctConvBlock(nn.Module):
+    """
+    Inference version of the octave convolution block. Batch normalizations are folded into the convolution weights,
+    and the frequency paths with a common input are merged:
+    - with downsampling, the pooled high-frequency input and the low-frequency input have the same resolution, so they
+      are concatenated, the high-frequency output is calculated by a single convolution, and the low-frequency output
+      by a single convolution over the once pooled concatenation,
+    - without downsampling, the low-to-high and low-to-low paths are calculated by a single convolution, and the
+      upsampled low-to-high result is added to the high-frequency output in place (without an upsampled copy).
+
+    Parameters:
+    ----------
+    block : OctConvBlock
+        Source octave convolution block.
+    """
+    def __init__(self,
+                 block):
+        super(FusedOctConvBlock, self).__init__()
+        conv = block.conv
+        assert (conv.groups == 1) and (conv.bias is None)
+        self.oct_mode = conv.oct_mode
+        self.oct_value = conv.oct_value
+        self.downsample = conv.downsample
+        assert (self.oct_mode != "last") or self.downsample
+        self.conv_kwargs = conv.conv_kwargs
+        self.activ = block.activ if block.activate else None
+        h_in = conv.h_in_channels
+        h_out = conv.h_out_channels
+
+        with torch.no_grad():
+            bns = [block.h_bn] if block.last else [block.h_bn, block.l_bn]
+            scale = torch.cat([bn.weight / torch.sqrt(bn.running_var + bn.eps) for bn in bns])
+            shift = torch.cat([bn.bias - bn.running_mean * bn.weight / torch.sqrt(bn.running_var + bn.eps)
+                               for bn in bns])
+            weight = conv.weight * scale.view(-1, 1, 1, 1)
+        if (self.oct_mode == "norm") and (not self.downsample):
+            self.h_weight = nn.Parameter(weight[:h_out, :h_in].contiguous())
+            self.lh_weight = nn.Parameter(weight[h_out:, :h_in].contiguous())
+            self.l_weight = nn.Parameter(weight[:, h_in:].contiguous())
+        else:
+            self.h_weight = nn.Parameter(weight[:h_out].contiguous())
+            if not block.last:
+                self.l_weight = nn.Parameter(weight[h_out:].contiguous())
+        self.h_bias = nn.Parameter(shift[:h_out].contiguous())
+        if not block.last:
+            self.l_bias = nn.Parameter(shift[h_out:].contiguous())
+
+    def pool(self, x):
+        return F.avg_pool2d(
+            input=x,
+            kernel_size=(self.oct_value, self.oct_value),
+            stride=(self.oct_value, self.oct_value))
+
+    def forward(self, hx, lx=None):
+        if self.oct_mode == "std":
+            hy = F.conv2d(hx, self.h_weight, self.h_bias, **self.conv_kwargs)
+            ly = None
+        elif self.oct_mode == "first":
+            if self.downsample:
+                hx = self.pool(hx)
+            hy = F.conv2d(hx, self.h_weight, self.h_bias, **self.conv_kwargs)
+            ly = F.conv2d(self.pool(hx), self.l_weight, self.l_bias, **self.conv_kwargs)
+        elif self.downsample:
+            x = torch.cat((self.pool(hx), lx), dim=1)
+            hy = F.conv2d(x, self.h_weight, self.h_bias, **self.conv_kwargs)
+            ly = None
+            if self.oct_mode == "norm":
+                ly = F.conv2d(self.pool(x), self.l_weight, self.l_bias, **self.conv_kwargs)
+        else:
+            hy = F.conv2d(hx, self.h_weight, self.h_bias, **self.conv_kwargs)
+            y = F.conv2d(lx, self.l_weight, **self.conv_kwargs)
+            h_out = hy.size(1)
+            hly = y[:, :h_out]
+            ly = F.conv2d(self.pool(hx), self.lh_weight, self.l_bias, **self.conv_kwargs)
+            ly += y[:, h_out:]
+            batch, _, height, width = hly.size()
+            hy.view(batch, h_out, height, self.oct_value, width, self.oct_value).add_(
+                hly.reshape(batch, h_out, height, 1, width, 1))
+        if self.activ is not None:
+            hy = self.activ(hy)
+            if ly is not None:
+                ly = self.activ(ly)
+        return hy, ly
+
+
 def oct_conv1x1_block(in_channels,
                       out_channels,
                       stride=1,
@@ -656,6 +742,30 @@ class OctResNet(nn.Module):
         return x
 
 
+def convert_octresnet_for_inference(net):
+    """
+    Convert Oct-ResNet model for fast inference (in place). Batch normalizations are folded into octave convolutions,
+    and the frequency paths with a common input are merged (see `FusedOctConvBlock`). The converted model is for
+    inference only.
+
+    Parameters:
+    ----------
+    net : OctResNet
+        Model.
+
+    Returns
+    -------
+    OctResNet
+        Converted model.
+    """
+    net.eval()
+    for module in list(net.modules()):
+        for name, child in module.named_children():
+            if isinstance(child, OctConvBlock):
+                setattr(module, name, FusedOctConvBlock(child))
+    return net
+
+
 def get_octresnet(blocks,
                   bottleneck=None,
                   conv1_stride=True,
@@ -825,6 +935,18 @@ def _test():
         y.sum().backward()
         assert (tuple(y.size()) == (14, 1000))
 
+        for module in net.modules():
+            if isinstance(module, nn.BatchNorm2d):
+                module.running_mean.uniform_(-0.5, 0.5)
+                module.running_var.uniform_(0.5, 2.0)
+                module.weight.data.uniform_(0.5, 1.5)
+                module.bias.data.uniform_(-0.5, 0.5)
+        x = torch.randn(2, 3, 224, 224)
+        with torch.no_grad():
+            y_ref = net(x)
+            y = convert_octresnet_for_inference(net)(x)
+        assert ((y - y_ref).abs().max() < 1e-3 * y_ref.abs().max())
+
 
 if __name__ == "__main__":
     _test()
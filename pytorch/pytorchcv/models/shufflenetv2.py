@@ -333,6 +333,7 @@ def _calc_width(net):
 
 def _test():
     import torch
+    from .common import fold_channel_shuffles
 
     pretrained = False
 
@@ -361,6 +362,20 @@ def _test():
         y.sum().backward()
         assert (tuple(y.size()) == (1, 1000))
 
+        for module in net.modules():
+            if isinstance(module, nn.BatchNorm2d):
+                module.running_mean.uniform_(-0.5, 0.5)
+                module.running_var.uniform_(0.5, 2.0)
+                module.weight.data.uniform_(0.5, 1.5)
+                module.bias.data.uniform_(-0.5, 0.5)
+        x = torch.randn(2, 3, 224, 224)
+        with torch.no_grad():
+            y_ref = net(x)
+            y = fold_channel_shuffles(net)(x)
+            y_orig = net(x)
+        assert ((y - y_ref).abs().max() < 1e-4 * y_ref.abs().max())
+        assert torch.equal(y_orig, y_ref)
+
 
 if __name__ == "__main__":
     _test()
@@ -147,7 +147,8 @@ def calc_net_weight_count(net):
 def validate(metric,
              net,
              val_data,
-             use_cuda):
+             use_cuda,
+             ema=None):
     """
     Core validation/testing routine.
 
@@ -161,12 +162,21 @@ def validate(metric,
         Data loader.
     use_cuda : bool
         Whether to use CUDA.
+    ema : ModelEma or None, default None
+        EMA of model weights, which are used instead of the model weights if not None.
 
     Returns
     -------
     EvalMetric
         Metric object instance.
     """
+    if ema is not None:
+        with ema.average_parameters():
+            return validate(
+                metric=metric,
+                net=net,
+                val_data=val_data,
+                use_cuda=use_cuda)
     net.eval()
     metric.reset()
     with torch.no_grad():
@@ -0,0 +1,37 @@
+"""
+    Dataset weighted random sampler.
+"""
+
+__all__ = ['WeightedRandomSampler']
+
+from torch.utils.data.sampler import Sampler
+from common.alias_sampler import AliasSampler
+
+
+class WeightedRandomSampler(Sampler):
+    """
+    Samples elements from [0, len(weights)) randomly with replacement according to weights (by the alias method).
+
+    Parameters:
+    ----------
+    weights : np.array of float
+        Weights of samples (not necessarily normalized).
+    num_samples : int
+        Number of samples to draw per epoch.
+    prefetch_epochs : int, default 0
+        Number of epochs for which index streams are precomputed in a background thread.
+    """
+    def __init__(self,
+                 weights,
+                 num_samples,
+                 prefetch_epochs=0):
+        self._sampler = AliasSampler(
+            weights=weights,
+            num_samples=num_samples,
+            prefetch_epochs=prefetch_epochs)
+
+    def __iter__(self):
+        return iter(self._sampler)
+
+    def __len__(self):
+        return len(self._sampler)
@@ -0,0 +1,213 @@
+"""
+    Activation checkpointing (gradient checkpointing) for models with `features.stageN` containers.
+"""
+
+__all__ = ['enable_checkpointing', 'disable_checkpointing', 'CheckpointedStageMixin']
+
+import re
+import tensorflow as tf
+
+
+def _get_children(layer):
+    """
+    Get child layers of a sequential container (`tf.keras.Sequential` or `SimpleSequential`).
+
+    Parameters:
+    ----------
+    layer : Layer
+        Container.
+
+    Returns
+    -------
+    list of Layer or None
+        Child layers.
+    """
+    if isinstance(getattr(layer, "children", None), list):
+        return layer.children
+    if isinstance(layer, tf.keras.Sequential):
+        return layer.layers
+    return None
+
+
+def _get_stages(net):
+    """
+    Get stage containers of the model (`features.stageN`).
+
+    Parameters:
+    ----------
+    net : Model
+        Model.
+
+    Returns
+    -------
+    list of Layer
+        Stage containers.
+    """
+    if not hasattr(net, "features"):
+        return []
+    children = _get_children(net.features)
+    if children is None:
+        return []
+    return [layer for layer in children if re.search(r"(^|/)stage\d+$", layer.name)]
+
+
+class CheckpointedStageMixin(object):
+    """
+    Mixin for stage containers with activation checkpointing. It's injected as a dynamic subclass of the original
+    container class, so the model structure and weight names are kept.
+    """
+    def call(self, x, training=None, **kwargs):
+        call = super(CheckpointedStageMixin, self).call
+        if not training:
+            return call(x, training=training, **kwargs)
+        children = _get_children(self)
+        segments = self.checkpoint_segments
+        if (children is None) or (len(kwargs) > 0) or (type(self).__mro__[2].call not in _plain_calls) or\
+                (segments <= 1):
+            return tf.recompute_grad(_RecomputedFunction(lambda y: call(y, training=training, **kwargs), [self]))(x)
+        segment_size = (len(children) + segments - 1) // segments
+        for start in range(0, len(children), segment_size):
+            blocks = children[start:start + segment_size]
+            x = tf.recompute_grad(_RecomputedFunction(_SegmentFunction(blocks, training), blocks))(x)
+        return x
+
+
+class _SegmentFunction(object):
+    """
+    Sequential execution of a segment of blocks.
+    """
+    def __init__(self, blocks, training):
+        self.blocks = blocks
+        self.training = training
+
+    def __call__(self, x):
+        for block in self.blocks:
+            x = block(x, training=self.training)
+        return x
+
+
+class _RecomputedFunction(object):
+    """
+    Checkpointed function, which keeps non-trainable variables (batch normalization moving statistics) intact during
+    recomputation in backward pass (so they are updated once, as without checkpointing).
+    """
+    def __init__(self, function, layers):
+        self.function = function
+        self.variables = [v for layer in layers for v in layer.non_trainable_variables]
+        self.num_calls = 0
+
+    def __call__(self, x):
+        self.num_calls += 1
+        if (self.num_calls == 1) or (len(self.variables) == 0):
+            return self.function(x)
+        states = [tf.identity(v) for v in self.variables]
+        y = self.function(x)
+        with tf.control_dependencies([y]):
+            for v, state in zip(self.variables, states):
+                v.assign(state)
+        return y
+
+
+_plain_calls = [tf.keras.Sequential.call]
+_checkpointed_classes = {}
+
+
+def _get_checkpointed_class(cls):
+    """
+    Get (cached) checkpointed subclass for a container class.
+    """
+    if cls not in _checkpointed_classes:
+        _checkpointed_classes[cls] = type("Checkpointed" + cls.__name__, (CheckpointedStageMixin, cls), {})
+    return _checkpointed_classes[cls]
+
+
+def enable_checkpointing(net,
+                         segments=1):
+    """
+    Enable activation checkpointing (`tf.recompute_grad`) for all `features.stageN` containers of the model.
+    Activations inside a checkpointed segment are not stored during forward pass and are recomputed during backward
+    pass. Checkpointing is active in the training mode only. Batch normalization moving statistics are restored after
+    recomputation, so the trained model is the same as without checkpointing. The model should be built before the
+    call.
+
+    Parameters:
+    ----------
+    net : Model
+        Model.
+    segments : int, default 1
+        Number of checkpointed segments per stage (for plain sequential stages only, others are checkpointed as a
+        whole).
+
+    Returns
+    -------
+    int
+        Number of checkpointed stages.
+    """
+    from .tf2cv.models.common import SimpleSequential
+    if SimpleSequential.call not in _plain_calls:
+        _plain_calls.append(SimpleSequential.call)
+
+    assert (segments > 0)
+    stages = _get_stages(net)
+    if len(stages) == 0:
+        raise ValueError("Model doesn't contain `features.stageN` containers")
+    for stage in stages:
+        if not isinstance(stage, CheckpointedStageMixin):
+            stage.__class__ = _get_checkpointed_class(stage.__class__)
+        stage.checkpoint_segments = segments
+    return len(stages)
+
+
+def disable_checkpointing(net):
+    """
+    Disable activation checkpointing for the model.
+
+    Parameters:
+    ----------
+    net : Model
+        Model.
+    """
+    for stage in _get_stages(net):
+        if isinstance(stage, CheckpointedStageMixin):
+            stage.__class__ = stage.__class__.__mro__[2]
+
+
+def _test():
+    import numpy as np
+    from .tf2cv.models.resnet import resnet10
+
+    net = resnet10()
+    x = tf.random.normal((2, 224, 224, 3))
+    net(x)
+    init_state = [v.numpy() for v in net.non_trainable_variables]
+
+    def calc_grads(grad_fn):
+        for v, value in zip(net.non_trainable_variables, init_state):
+            v.assign(value)
+        y, grads = grad_fn()
+        return y.numpy(), [g.numpy() for g in grads], [v.numpy() for v in net.non_trainable_variables]
+
+    def eager_grads():
+        with tf.GradientTape() as tape:
+            y = net(x, training=True)
+            loss = tf.reduce_sum(y)
+        return y, tape.gradient(loss, net.trainable_variables)
+
+    for segments in [2, 1]:
+        for use_function in [False, True]:
+            grad_fn = tf.function(eager_grads) if use_function else eager_grads
+            disable_checkpointing(net)
+            y1, grads1, state1 = calc_grads(grad_fn)
+            assert (enable_checkpointing(net, segments=segments) == 4)
+            grad_fn = tf.function(eager_grads) if use_function else eager_grads
+            y2, grads2, state2 = calc_grads(grad_fn)
+            assert (np.abs(y1 - y2).max() < 1e-4)
+            assert all([np.abs(g1 - g2).max() < 1e-3 for g1, g2 in zip(grads1, grads2)])
+            assert all([np.abs(s1 - s2).max() < 1e-5 for s1, s2 in zip(state1, state2)])
+            assert any([np.abs(s1 - s0).max() > 0.0 for s1, s0 in zip(state1, init_state)])
+    disable_checkpointing(net)
+    print("ok")
+
+
+if __name__ == "__main__":
+    _test()
@@ -0,0 +1,270 @@
+"""
+    XLA-compiled (`jit_compile`) train/eval step functions with shape bucketing and retrace counting.
+"""
+
+__all__ = ['ShapeBucketer', 'CompiledStep', 'get_eval_step', 'get_train_step']
+
+import logging
+import tensorflow as tf
+
+
+class ShapeBucketer(object):
+    """
+    Shape bucketing for compiled step functions. Each new input shape leads to a new trace (and XLA compilation), so
+    the batch dimension is padded up to the full batch size (the last partial batch doesn't produce a new trace), and
+    optionally spatial dimensions are padded up to a multiple of `spatial_multiple` (bottom/right zero padding, so
+    images of varying size share a small number of traces).
+
+    Padded samples are masked by zero weights and stripped from outputs. Note that spatial padding changes outputs of
+    classification models (global pooling sees the padding), so it's intended for variable-size segmentation inputs.
+
+    Parameters:
+    ----------
+    batch_size : int or None, default None
+        Bucket for the batch dimension (None for no batch padding).
+    spatial_multiple : int, default 0
+        Bucket multiple for spatial dimensions (0 for no spatial padding).
+    data_format : str, default 'channels_last'
+        The ordering of the dimensions in tensors.
+    """
+    def __init__(self,
+                 batch_size=None,
+                 spatial_multiple=0,
+                 data_format="channels_last"):
+        super(ShapeBucketer, self).__init__()
+        self.batch_size = batch_size
+        self.spatial_multiple = spatial_multiple
+        self.data_format = data_format
+
+    def _spatial_axes(self):
+        return (2, 3) if self.data_format == "channels_first" else (1, 2)
+
+    def pad(self, images, labels):
+        """
+        Pad a batch up to the bucket shape.
+
+        Parameters:
+        ----------
+        images : Tensor
+            Input images.
+        labels : Tensor
+            Labels.
+
+        Returns
+        -------
+        Tensor
+            Padded images.
+        Tensor
+            Padded labels.
+        Tensor
+            Sample weights (zero for padded samples).
+        tuple of int
+            Original batch size and spatial size.
+        """
+        images = tf.convert_to_tensor(images)
+        labels = tf.convert_to_tensor(labels)
+        shape = images.shape.as_list()
+        axes = self._spatial_axes()
+        orig_size = (shape[0], shape[axes[0]], shape[axes[1]])
+
+        batch = shape[0]
+        weights = tf.ones((batch,), dtype=tf.float32)
+        if (self.batch_size is not None) and (batch < self.batch_size):
+            # Padded rows repeat real samples (so batch statistics are less distorted) and have zero weights:
+            indices = tf.range(self.batch_size) % batch
+            images = tf.gather(images, indices)
+            labels = tf.gather(labels, indices)
+            weights = tf.concat([weights, tf.zeros((self.batch_size - batch,), dtype=tf.float32)], axis=0)
+
+        if self.spatial_multiple > 0:
+            paddings = [[0, 0] for _ in shape]
+            label_paddings = [[0, 0] for _ in labels.shape]
+            for i, axis in enumerate(axes):
+                size = shape[axis]
+                pad = (-size) % self.spatial_multiple
+                paddings[axis][1] = pad
+                if len(labels.shape) >= 3:
+                    label_paddings[i + 1][1] = pad
+            if any([p[1] > 0 for p in paddings]):
+                images = tf.pad(images, paddings)
+                if len(labels.shape) >= 3:
+                    labels = tf.pad(labels, label_paddings)
+        return images, labels, weights, orig_size
+
+    def unpad(self, outputs, orig_size):
+        """
+        Strip padding from step outputs (predictions).
+
+        Parameters:
+        ----------
+        outputs : Tensor
+            Outputs of the step.
+        orig_size : tuple of int
+            Original batch size and spatial size.
+
+        Returns
+        -------
+        Tensor
+            Outputs for real samples.
+        """
+        batch, height, width = orig_size
+        outputs = outputs[:batch]
+        if (self.spatial_multiple > 0) and (len(outputs.shape) == 4):
+            if self.data_format == "channels_first":
+                outputs = outputs[:, :, :height, :width]
+            else:
+                outputs = outputs[:, :height, :width, :]
+        return outputs
+
+
+class CompiledStep(object):
+    """
+    Step function compiled as `tf.function` (with XLA if `jit_compile`) with a retrace counter.
+
+    Parameters:
+    ----------
+    step_fn : function
+        Step function.
+    jit_compile : bool, default True
+        Whether to compile with XLA.
+    name : str, default 'step'
+        Name of the step for logging.
+    max_traces : int, default 8
+        Number of traces after which a warning is logged (a sign of unbucketed shapes).
+    """
+    def __init__(self,
+                 step_fn,
+                 jit_compile=True,
+                 name="step",
+                 max_traces=8):
+        super(CompiledStep, self).__init__()
+        self.name = name
+        self.max_traces = max_traces
+        self.num_traces = 0
+        self.traced_shapes = []
+
+        def traced_step_fn(*args):
+            # Python code is executed only during tracing:
+            self.num_traces += 1
+            self.traced_shapes.append(tuple([tuple(arg.shape.as_list()) for arg in args]))
+            if self.num_traces == self.max_traces + 1:
+                logging.warning("Step `{}` was traced {} times, last input shapes: {}".format(
+                    self.name, self.num_traces, self.traced_shapes[-1]))
+            return step_fn(*args)
+
+        self.fn = tf.function(traced_step_fn, jit_compile=jit_compile)
+
+    def __call__(self, *args):
+        return self.fn(*args)
+
+
+def get_eval_step(net,
+                  jit_compile=True,
+                  bucketer=None):
+    """
+    Create evaluation step: `predictions = step(images)`.
+
+    Parameters:
+    ----------
+    net : Model
+        Model.
+    jit_compile : bool, default True
+        Whether to compile with XLA.
+    bucketer : ShapeBucketer or None, default None
+        Shape bucketing.
+
+    Returns
+    -------
+    function
+        Evaluation step (with `compiled_step` attribute).
+    """
+    compiled_step = CompiledStep(
+        step_fn=(lambda images: net(images, training=False)),
+        jit_compile=jit_compile,
+        name="eval")
+
+    def eval_step(images):
+        if bucketer is None:
+            return compiled_step(tf.convert_to_tensor(images))
+        images, _, _, orig_size = bucketer.pad(images, tf.zeros((images.shape[0],)))
+        return bucketer.unpad(compiled_step(images), orig_size)
+
+    eval_step.compiled_step = compiled_step
+    return eval_step
+
+
+def get_train_step(net,
+                   optimizer,
+                   jit_compile=True,
+                   bucketer=None):
+    """
+    Create training step with sparse categorical cross-entropy loss: `loss, predictions = step(images, labels)`.
+
+    Parameters:
+    ----------
+    net : Model
+        Model.
+    optimizer : Optimizer
+        Optimizer.
+    jit_compile : bool, default True
+        Whether to compile with XLA.
+    bucketer : ShapeBucketer or None, default None
+        Shape bucketing.
+
+    Returns
+    -------
+    function
+        Training step (with `compiled_step` attribute).
+    """
+    def step_fn(images, labels, weights):
+        with tf.GradientTape() as tape:
+            predictions = net(images, training=True)
+            losses = tf.keras.losses.sparse_categorical_crossentropy(labels, predictions)
+            loss = tf.reduce_sum(losses * weights) / tf.reduce_sum(weights)
+        gradients = tape.gradient(loss, net.trainable_variables)
+        optimizer.apply_gradients(zip(gradients, net.trainable_variables))
+        return loss, predictions
+
+    compiled_step = CompiledStep(
+        step_fn=step_fn,
+        jit_compile=jit_compile,
+        name="train")
+
+    def train_step(images, labels):
+        if bucketer is None:
+            images = tf.convert_to_tensor(images)
+            weights = tf.ones((images.shape[0],), dtype=tf.float32)
+            return compiled_step(images, tf.convert_to_tensor(labels), weights)
+        images, labels, weights, orig_size = bucketer.pad(images, labels)
+        loss, predictions = compiled_step(images, labels, weights)
+        return loss, bucketer.unpad(predictions, orig_size)
+
+    train_step.compiled_step = compiled_step
+    return train_step
+
+
+def _test():
+    import numpy as np
+    from .tf2cv.model_provider import get_model
+
+    net = get_model("resnet18", pretrained=False)
+    bucketer = ShapeBucketer(batch_size=4)
+    eval_step = get_eval_step(net, bucketer=bucketer)
+    x = np.random.rand(4, 224, 224, 3).astype(np.float32)
+    y = net(x, training=False).numpy()
+    for batch in [4, 3, 1]:
+        y_compiled = eval_step(x[:batch]).numpy()
+        assert (y_compiled.shape == (batch, 1000))
+        assert (np.abs(y[:batch] - y_compiled).max() < 1e-4)
+    assert (eval_step.compiled_step.num_traces == 1)
+
+    train_step = get_train_step(net, tf.keras.optimizers.SGD(learning_rate=0.01), bucketer=bucketer)
+    labels = np.array([1, 2, 3, 4], np.float32)
+    for batch in [4, 2]:
+        loss, predictions = train_step(x[:batch], labels[:batch])
+        assert (predictions.shape == (batch, 1000))
+    assert (train_step.compiled_step.num_traces == 1)
+
+
+if __name__ == "__main__":
+    _test()
@@ -2,8 +2,10 @@
     Dataset routines.
 """
 
-__all__ = ['get_dataset_metainfo', 'get_train_data_source', 'get_val_data_source', 'get_test_data_source']
+__all__ = ['get_dataset_metainfo', 'get_train_data_source', 'get_val_data_source', 'get_test_data_source',
+           'get_data_pipeline', 'get_train_data_pipeline', 'get_val_data_pipeline', 'get_test_data_pipeline']
 
+import os
 import tensorflow as tf
 from .datasets.imagenet1k_cls_dataset import ImageNet1KMetaInfo
 from .datasets.cub200_2011_cls_dataset import CUB200MetaInfo
@@ -156,3 +158,200 @@ def get_test_data_source(ds_metainfo,
         generator=lambda: generator,
         output_types=(tf.float32, tf.float32)),\
            generator.n
+
+
+def get_data_pipeline(ds_metainfo,
+                      subset,
+                      batch_size,
+                      data_format="channels_last",
+                      cache_mode="",
+                      cache_dir="",
+                      num_shards=1,
+                      shard_index=0,
+                      shuffle_buffer_size=10000,
+                      seed=None):
+    """
+    Get tf.data pipeline for a dataset subset (a tf.data-native alternative to the generator based data sources).
+
+    Samples are sharded before shuffling (so shards are disjoint and don't depend on the seed), decoded in parallel
+    `map` calls with a deterministic order, optionally cached (after decoding, before random augmentation),
+    transformed, batched, and prefetched.
+
+    Parameters:
+    ----------
+    ds_metainfo : DatasetMetaInfo
+        Dataset metainfo.
+    subset : str
+        Data subset ('train', 'val', or 'test').
+    batch_size : int
+        Batch size.
+    data_format : str, default 'channels_last'
+        The ordering of the dimensions in tensors.
+    cache_mode : str, default ''
+        Caching of decoded samples: '' (no caching), 'memory', 'disk', or 'snapshot'.
+    cache_dir : str, default ''
+        Directory for 'disk' and 'snapshot' cache modes.
+    num_shards : int, default 1
+        Number of shards (workers) for multi-worker runs.
+    shard_index : int, default 0
+        Index of the shard for this worker.
+    shuffle_buffer_size : int, default 10000
+        Size of shuffle buffer for training subset (over undecoded samples without caching, over decoded ones with
+        caching).
+    seed : int or None, default None
+        Random seed for shuffling.
+
+    Returns
+    -------
+    tf.data.Dataset
+        Data source.
+    int
+        Dataset size (for this shard).
+    """
+    assert (subset in ("train", "val", "test"))
+    assert (0 <= shard_index < num_shards)
+    tfdata_transform = {
+        "train": ds_metainfo.train_tfdata_transform,
+        "val": ds_metainfo.val_tfdata_transform,
+        "test": ds_metainfo.test_tfdata_transform}[subset]
+    if (ds_metainfo.tfdata_source is None) or (tfdata_transform is None):
+        raise ValueError("tf.data pipeline isn't supported for {} subset of dataset {}".format(subset, ds_metainfo.label))
+    transform = tfdata_transform(ds_metainfo=ds_metainfo)
+
+    samples, size, decode = ds_metainfo.tfdata_source(
+        ds_metainfo=ds_metainfo,
+        subset=subset)
+    if num_shards > 1:
+        samples = samples.shard(num_shards=num_shards, index=shard_index)
+        size = len(range(shard_index, size, num_shards))
+
+    shuffle_buffer_size = min(shuffle_buffer_size, size)
+    if (subset == "train") and (not cache_mode):
+        # Light samples (file paths or indices) are shuffled before decoding, so the buffer doesn't hold decoded images:
+        samples = samples.shuffle(
+            buffer_size=shuffle_buffer_size,
+            seed=seed,
+            reshuffle_each_iteration=True)
+
+    dataset = samples.map(decode, num_parallel_calls=tf.data.experimental.AUTOTUNE, deterministic=True)
+
+    if cache_mode:
+        cache_name = "{}_{}_{}of{}".format(ds_metainfo.short_label, subset, shard_index, num_shards)
+        if cache_mode == "memory":
+            dataset = dataset.cache()
+        elif cache_mode == "disk":
+            os.makedirs(cache_dir, exist_ok=True)
+            dataset = dataset.cache(os.path.join(cache_dir, cache_name))
+        elif cache_mode == "snapshot":
+            dataset = dataset.snapshot(os.path.join(cache_dir, cache_name))
+        else:
+            raise ValueError("Unsupported cache mode: {}".format(cache_mode))
+
+    if (subset == "train") and cache_mode:
+        # Cached decoded samples are shuffled after the cache (so each epoch gets a new order):
+        dataset = dataset.shuffle(
+            buffer_size=shuffle_buffer_size,
+            seed=seed,
+            reshuffle_each_iteration=True)
+
+    dataset = dataset.map(transform, num_parallel_calls=tf.data.experimental.AUTOTUNE, deterministic=(subset != "train"))
+    if data_format == "channels_first":
+        dataset = dataset.map(
+            lambda image, label: (tf.transpose(image, perm=(2, 0, 1)), label),
+            num_parallel_calls=tf.data.experimental.AUTOTUNE)
+    dataset = dataset.batch(batch_size)
+    dataset = dataset.prefetch(tf.data.experimental.AUTOTUNE)
+    return dataset, size
+
+
+def get_train_data_pipeline(ds_metainfo,
+                            batch_size,
+                            data_format="channels_last",
+                            **kwargs):
+    """
+    Get tf.data pipeline for training subset.
+
+    Parameters:
+    ----------
+    ds_metainfo : DatasetMetaInfo
+        Dataset metainfo.
+    batch_size : int
+        Batch size.
+    data_format : str, default 'channels_last'
+        The ordering of the dimensions in tensors.
+
+    Returns
+    -------
+    tf.data.Dataset
+        Data source.
+    int
+        Dataset size.
+    """
+    return get_data_pipeline(
+        ds_metainfo=ds_metainfo,
+        subset="train",
+        batch_size=batch_size,
+        data_format=data_format,
+        **kwargs)
+
+
+def get_val_data_pipeline(ds_metainfo,
+                          batch_size,
+                          data_format="channels_last",
+                          **kwargs):
+    """
+    Get tf.data pipeline for validation subset.
+
+    Parameters:
+    ----------
+    ds_metainfo : DatasetMetaInfo
+        Dataset metainfo.
+    batch_size : int
+        Batch size.
+    data_format : str, default 'channels_last'
+        The ordering of the dimensions in tensors.
+
+    Returns
+    -------
+    tf.data.Dataset
+        Data source.
+    int
+        Dataset size.
+    """
+    return get_data_pipeline(
+        ds_metainfo=ds_metainfo,
+        subset="val",
+        batch_size=batch_size,
+        data_format=data_format,
+        **kwargs)
+
+
+def get_test_data_pipeline(ds_metainfo,
+                           batch_size,
+                           data_format="channels_last",
+                           **kwargs):
+    """
+    Get tf.data pipeline for testing subset.
+
+    Parameters:
+    ----------
+    ds_metainfo : DatasetMetaInfo
+        Dataset metainfo.
+    batch_size : int
+        Batch size.
+    data_format : str, default 'channels_last'
+        The ordering of the dimensions in tensors.
+
+    Returns
+    -------
+    tf.data.Dataset
+        Data source.
+    int
+        Dataset size.
+    """
+    return get_data_pipeline(
+        ds_metainfo=ds_metainfo,
+        subset="test",
+        batch_size=batch_size,
+        data_format=data_format,
+        **kwargs)
@@ -5,8 +5,8 @@
 import os
 import numpy as np
 from PIL import Image
-from .seg_dataset import SegDataset
-from .voc_seg_dataset import VOCMetaInfo
+from .seg_dataset import SegDataset, seg_tfdata_source
+from .voc_seg_dataset import VOCMetaInfo, voc_test_tfdata_transform
 
 
 class ADE20KSegDataset(SegDataset):
@@ -120,3 +120,6 @@ class ADE20KMetaInfo(VOCMetaInfo):
              "bg_idx": ADE20KSegDataset.background_idx,
              "ignore_bg": ADE20KSegDataset.ignore_bg,
              "macro_average": False}]
+        self.tfdata_source = seg_tfdata_source
+        self.val_tfdata_transform = voc_test_tfdata_transform
+        self.test_tfdata_transform = voc_test_tfdata_transform
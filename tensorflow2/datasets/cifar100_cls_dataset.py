@@ -3,7 +3,7 @@
 """
 
 from tensorflow.keras.datasets import cifar100
-from .cifar10_cls_dataset import CIFAR10MetaInfo
+from .cifar10_cls_dataset import CIFAR10MetaInfo, array_tfdata_source
 
 
 class CIFAR100MetaInfo(CIFAR10MetaInfo):
@@ -15,6 +15,7 @@ class CIFAR100MetaInfo(CIFAR10MetaInfo):
         self.train_generator = cifar100_train_generator
         self.val_generator = cifar100_val_generator
         self.test_generator = cifar100_val_generator
+        self.tfdata_source = cifar100_tfdata_source
 
 
 def cifar100_train_generator(data_generator,
@@ -75,3 +76,32 @@ def cifar100_val_generator(data_generator,
         batch_size=batch_size,
         shuffle=False)
     return generator
+
+
+def cifar100_tfdata_source(ds_metainfo,
+                           subset):
+    """
+    Create tf.data source for CIFAR-100.
+
+    Parameters:
+    ----------
+    ds_metainfo : DatasetMetaInfo
+        CIFAR-100 dataset metainfo.
+    subset : str
+        Data subset ('train', 'val', or 'test').
+
+    Returns
+    -------
+    tf.data.Dataset
+        Samples (image and label).
+    int
+        Dataset size.
+    function
+        Sample decoder.
+    """
+    assert(ds_metainfo is not None)
+    (x_train, y_train), (x_test, y_test) = cifar100.load_data()
+    if subset == "train":
+        return array_tfdata_source(x_train, y_train)
+    else:
+        return array_tfdata_source(x_test, y_test)
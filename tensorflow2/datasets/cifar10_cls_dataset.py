@@ -2,10 +2,12 @@
     CIFAR-10 classification dataset.
 """
 
+import numpy as np
+import tensorflow as tf
 from tensorflow.keras.datasets import cifar10
 from tensorflow.keras.preprocessing.image import ImageDataGenerator
 from .dataset_metainfo import DatasetMetaInfo
-from .cls_dataset import img_normalization
+from .cls_dataset import img_normalization, cls_train_tfdata_transform, cls_val_tfdata_transform
 
 
 class CIFAR10MetaInfo(DatasetMetaInfo):
@@ -32,6 +34,10 @@ class CIFAR10MetaInfo(DatasetMetaInfo):
         self.train_generator = cifar10_train_generator
         self.val_generator = cifar10_val_generator
         self.test_generator = cifar10_val_generator
+        self.tfdata_source = cifar10_tfdata_source
+        self.train_tfdata_transform = cls_train_tfdata_transform
+        self.val_tfdata_transform = cls_val_tfdata_transform
+        self.test_tfdata_transform = cls_val_tfdata_transform
         self.ml_type = "imgcls"
         self.mean_rgb = (0.4914, 0.4822, 0.4465)
         self.std_rgb = (0.2023, 0.1994, 0.2010)
@@ -151,3 +157,57 @@ def cifar10_val_generator(data_generator,
         batch_size=batch_size,
         shuffle=False)
     return generator
+
+
+def array_tfdata_source(x,
+                        y):
+    """
+    Create tf.data source for in-memory images.
+
+    Parameters:
+    ----------
+    x : np.array
+        Images (uint8, NHWC).
+    y : np.array
+        Labels.
+
+    Returns
+    -------
+    tf.data.Dataset
+        Samples (image and label).
+    int
+        Dataset size.
+    function
+        Sample decoder.
+    """
+    samples = tf.data.Dataset.from_tensor_slices((x, y.astype(np.float32)))
+    return samples, len(x), (lambda image, label: (image, label))
+
+
+def cifar10_tfdata_source(ds_metainfo,
+                          subset):
+    """
+    Create tf.data source for CIFAR-10.
+
+    Parameters:
+    ----------
+    ds_metainfo : DatasetMetaInfo
+        CIFAR-10 dataset metainfo.
+    subset : str
+        Data subset ('train', 'val', or 'test').
+
+    Returns
+    -------
+    tf.data.Dataset
+        Samples (image and label).
+    int
+        Dataset size.
+    function
+        Sample decoder.
+    """
+    assert(ds_metainfo is not None)
+    (x_train, y_train), (x_test, y_test) = cifar10.load_data()
+    if subset == "train":
+        return array_tfdata_source(x_train, y_train)
+    else:
+        return array_tfdata_source(x_test, y_test)
@@ -2,9 +2,12 @@
     Classification dataset routines.
 """
 
-__all__ = ['img_normalization']
+__all__ = ['img_normalization', 'img_normalization_tfdata', 'decode_image_tfdata', 'random_zoom_flip_tfdata',
+           'cls_train_tfdata_transform', 'cls_val_tfdata_transform']
 
+import math
 import numpy as np
+import tensorflow as tf
 
 
 def img_normalization(img,
@@ -32,3 +35,159 @@ def img_normalization(img,
     std_rgb = np.array(std_rgb, np.float32) * 255.0
     img = (img - mean_rgb) / std_rgb
     return img
+
+
+def img_normalization_tfdata(image,
+                             mean_rgb,
+                             std_rgb):
+    """
+    Normalization as in the ImageNet-1K validation procedure (tf.data version).
+
+    Parameters
+    ----------
+    image : tf.Tensor
+        Input image (uint8, HWC).
+    mean_rgb : tuple of 3 float
+        Mean of RGB channels in the dataset.
+    std_rgb : tuple of 3 float
+        STD of RGB channels in the dataset.
+
+    Returns
+    -------
+    tf.Tensor
+        Output image.
+    """
+    mean_rgb = tf.constant(mean_rgb, tf.float32) * 255.0
+    std_rgb = tf.constant(std_rgb, tf.float32) * 255.0
+    return (tf.cast(image, tf.float32) - mean_rgb) / std_rgb
+
+
+def decode_image_tfdata(file_path,
+                        image_size,
+                        interpolation="bilinear",
+                        resize_inv_factor=None):
+    """
+    Read, decode and resize an image file (tf.data version of the Keras loader with ImageNet-1K crop procedure, see
+    `load_image_imagenet1k_val`). The result is deterministic and may be cached.
+
+    Parameters
+    ----------
+    file_path : tf.Tensor
+        Path to image file.
+    image_size : tuple of 2 int
+        Spatial size of the output image (height, width).
+    interpolation : str, default 'bilinear'
+        Interpolation method for resizing.
+    resize_inv_factor : float or None, default None
+        Inverted ratio for input image crop (None for resizing without crop).
+
+    Returns
+    -------
+    tf.Tensor
+        Output image (uint8, HWC).
+    """
+    method = {"nearest": "nearest", "bilinear": "bilinear", "bicubic": "bicubic", "lanczos": "lanczos3"}[interpolation]
+    image = tf.io.decode_image(tf.io.read_file(file_path), channels=3, expand_animations=False)
+    th, tw = image_size
+    if resize_inv_factor is None:
+        image = tf.image.resize(image, size=(th, tw), method=method)
+    else:
+        size = int(math.ceil(float(th) / resize_inv_factor))
+        shape = tf.shape(image)
+        h, w = shape[0], shape[1]
+        oh, ow = tf.cond(
+            w < h,
+            lambda: ((size * h) // w, size),
+            lambda: (size, (size * w) // h))
+        image = tf.cond(
+            tf.logical_or(tf.logical_and(w <= h, w == size), tf.logical_and(h <= w, h == size)),
+            lambda: tf.cast(image, tf.float32),
+            lambda: tf.image.resize(image, size=(oh, ow), method=method))
+        shape = tf.shape(image)
+        i = tf.cast(tf.round(tf.cast(shape[0] - th, tf.float32) / 2.0), tf.int32)
+        j = tf.cast(tf.round(tf.cast(shape[1] - tw, tf.float32) / 2.0), tf.int32)
+        image = image[i:(i + th), j:(j + tw)]
+    image = tf.cast(tf.clip_by_value(tf.round(image), 0.0, 255.0), tf.uint8)
+    image.set_shape((th, tw, 3))
+    return image
+
+
+def random_zoom_flip_tfdata(image,
+                            zoom_range=0.2,
+                            seed=None):
+    """
+    Random zoom and horizontal flip augmentation (tf.data version of the Keras `ImageDataGenerator` augmentation).
+
+    Parameters
+    ----------
+    image : tf.Tensor
+        Input image (uint8, HWC).
+    zoom_range : float, default 0.2
+        Range for random zoom, the zoom factor is picked from `[1 - zoom_range, 1 + zoom_range]`.
+    seed : int or None, default None
+        Random seed.
+
+    Returns
+    -------
+    tf.Tensor
+        Output image (uint8, HWC).
+    """
+    image_shape = image.shape
+    zoom = tf.random.uniform((2,), 1.0 - zoom_range, 1.0 + zoom_range, seed=seed)
+    boxes = tf.stack([0.5 - 0.5 * zoom[0], 0.5 - 0.5 * zoom[1], 0.5 + 0.5 * zoom[0], 0.5 + 0.5 * zoom[1]])
+    image = tf.image.crop_and_resize(
+        image=tf.expand_dims(tf.cast(image, tf.float32), axis=0),
+        boxes=tf.expand_dims(boxes, axis=0),
+        box_indices=[0],
+        crop_size=tf.shape(image)[:2])[0]
+    image = tf.image.random_flip_left_right(image, seed=seed)
+    image = tf.cast(tf.clip_by_value(tf.round(image), 0.0, 255.0), tf.uint8)
+    image.set_shape(image_shape)
+    return image
+
+
+def cls_train_tfdata_transform(ds_metainfo):
+    """
+    Create tf.data image transform for training subset of a classification dataset.
+
+    Parameters
+    ----------
+    ds_metainfo : DatasetMetaInfo
+        Dataset metainfo.
+
+    Returns
+    -------
+    function
+        Image transform.
+    """
+    def transform(image, label):
+        image = random_zoom_flip_tfdata(image)
+        image = img_normalization_tfdata(
+            image=image,
+            mean_rgb=ds_metainfo.mean_rgb,
+            std_rgb=ds_metainfo.std_rgb)
+        return image, label
+    return transform
+
+
+def cls_val_tfdata_transform(ds_metainfo):
+    """
+    Create tf.data image transform for validation/testing subset of a classification dataset.
+
+    Parameters
+    ----------
+    ds_metainfo : DatasetMetaInfo
+        Dataset metainfo.
+
+    Returns
+    -------
+    function
+        Image transform.
+    """
+    def transform(image, label):
+        image = img_normalization_tfdata(
+            image=image,
+            mean_rgb=ds_metainfo.mean_rgb,
+            std_rgb=ds_metainfo.std_rgb)
+        return image, label
+    return transform
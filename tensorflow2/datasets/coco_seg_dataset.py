@@ -7,8 +7,8 @@ import logging
 import numpy as np
 from PIL import Image
 from tqdm import trange
-from .seg_dataset import SegDataset
-from .voc_seg_dataset import VOCMetaInfo
+from .seg_dataset import SegDataset, seg_tfdata_source
+from .voc_seg_dataset import VOCMetaInfo, voc_test_tfdata_transform
 
 
 class CocoSegDataset(SegDataset):
@@ -158,3 +158,6 @@ class CocoSegMetaInfo(VOCMetaInfo):
              "bg_idx": CocoSegDataset.background_idx,
              "ignore_bg": CocoSegDataset.ignore_bg,
              "macro_average": False}]
+        self.tfdata_source = seg_tfdata_source
+        self.val_tfdata_transform = voc_test_tfdata_transform
+        self.test_tfdata_transform = voc_test_tfdata_transform
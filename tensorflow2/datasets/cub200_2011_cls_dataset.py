@@ -8,7 +8,83 @@ import pandas as pd
 import threading
 from tensorflow.keras.preprocessing.image import ImageDataGenerator, DirectoryIterator
 from .cls_dataset import img_normalization
-from .imagenet1k_cls_dataset import ImageNet1KMetaInfo
+from .imagenet1k_cls_dataset import ImageNet1KMetaInfo, image_files_tfdata_source
+
+
+def get_cub200_image_list(root_dir_path,
+                          mode):
+    """
+    Get image file paths and class labels for CUB-200-2011 subset.
+
+    Parameters:
+    ----------
+    root_dir_path : str
+        Path to CUB-200-2011 folder.
+    mode : str
+        'train', 'val', or 'test'.
+
+    Returns
+    -------
+    list of str
+        Paths to image files.
+    list of int
+        Class labels.
+    """
+    root_dir_path = os.path.expanduser(root_dir_path)
+    assert os.path.exists(root_dir_path)
+
+    images_file_name = "images.txt"
+    images_file_path = os.path.join(root_dir_path, images_file_name)
+    if not os.path.exists(images_file_path):
+        raise Exception("Images file doesn't exist: {}".format(images_file_name))
+
+    class_file_name = "image_class_labels.txt"
+    class_file_path = os.path.join(root_dir_path, class_file_name)
+    if not os.path.exists(class_file_path):
+        raise Exception("Image class file doesn't exist: {}".format(class_file_name))
+
+    split_file_name = "train_test_split.txt"
+    split_file_path = os.path.join(root_dir_path, split_file_name)
+    if not os.path.exists(split_file_path):
+        raise Exception("Split file doesn't exist: {}".format(split_file_name))
+
+    images_df = pd.read_csv(
+        images_file_path,
+        sep="\s+",
+        header=None,
+        index_col=False,
+        names=["image_id", "image_path"],
+        dtype={"image_id": np.int32, "image_path": str})
+    class_df = pd.read_csv(
+        class_file_path,
+        sep="\s+",
+        header=None,
+        index_col=False,
+        names=["image_id", "class_id"],
+        dtype={"image_id": np.int32, "class_id": np.uint8})
+    split_df = pd.read_csv(
+        split_file_path,
+        sep="\s+",
+        header=None,
+        index_col=False,
+        names=["image_id", "split_flag"],
+        dtype={"image_id": np.int32, "split_flag": np.uint8})
+    df = images_df.join(class_df, rsuffix="_class_df").join(split_df, rsuffix="_split_df")
+    split_flag = 1 if mode == "train" else 0
+    subset_df = df[df.split_flag == split_flag]
+
+    image_ids = subset_df["image_id"].values.astype(np.int32)
+    class_ids = subset_df["class_id"].values.astype(np.int32) - 1
+    image_file_names = subset_df["image_path"].values.astype(str)
+
+    images_dir_name = "images"
+    images_dir_path = os.path.join(root_dir_path, images_dir_name)
+    assert os.path.exists(images_dir_path)
+    assert (len(image_ids) == len(class_ids))
+
+    file_paths = [os.path.join(images_dir_path, image_file_name) for image_file_name in image_file_names]
+    labels = [int(class_id) for class_id in class_ids]
+    return file_paths, labels
 
 
 class CUBDirectoryIterator(DirectoryIterator):
@@ -44,64 +120,14 @@ class CUBDirectoryIterator(DirectoryIterator):
             subset,
             interpolation)
 
-        root_dir_path = os.path.expanduser(directory)
-        assert os.path.exists(root_dir_path)
-
-        images_file_name = "images.txt"
-        images_file_path = os.path.join(root_dir_path, images_file_name)
-        if not os.path.exists(images_file_path):
-            raise Exception("Images file doesn't exist: {}".format(images_file_name))
-
-        class_file_name = "image_class_labels.txt"
-        class_file_path = os.path.join(root_dir_path, class_file_name)
-        if not os.path.exists(class_file_path):
-            raise Exception("Image class file doesn't exist: {}".format(class_file_name))
-
-        split_file_name = "train_test_split.txt"
-        split_file_path = os.path.join(root_dir_path, split_file_name)
-        if not os.path.exists(split_file_path):
-            raise Exception("Split file doesn't exist: {}".format(split_file_name))
-
-        images_df = pd.read_csv(
-            images_file_path,
-            sep="\s+",
-            header=None,
-            index_col=False,
-            names=["image_id", "image_path"],
-            dtype={"image_id": np.int32, "image_path": np.unicode})
-        class_df = pd.read_csv(
-            class_file_path,
-            sep="\s+",
-            header=None,
-            index_col=False,
-            names=["image_id", "class_id"],
-            dtype={"image_id": np.int32, "class_id": np.uint8})
-        split_df = pd.read_csv(
-            split_file_path,
-            sep="\s+",
-            header=None,
-            index_col=False,
-            names=["image_id", "split_flag"],
-            dtype={"image_id": np.int32, "split_flag": np.uint8})
-        df = images_df.join(class_df, rsuffix="_class_df").join(split_df, rsuffix="_split_df")
-        split_flag = 1 if mode == "train" else 0
-        subset_df = df[df.split_flag == split_flag]
-
-        image_ids = subset_df["image_id"].values.astype(np.int32)
-        class_ids = subset_df["class_id"].values.astype(np.int32) - 1
-        image_file_names = subset_df["image_path"].values.astype(np.unicode)
-
-        images_dir_name = "images"
-        self.images_dir_path = os.path.join(root_dir_path, images_dir_name)
-        assert os.path.exists(self.images_dir_path)
-        assert (len(image_ids) == len(class_ids))
+        self._filepaths, self.classes = get_cub200_image_list(
+            root_dir_path=directory,
+            mode=mode)
 
         self.class_mode = class_mode
         self.dtype = dtype
-        self._filepaths = [os.path.join(self.images_dir_path, image_file_name) for image_file_name in image_file_names]
-        self.classes = [int(class_id) for class_id in class_ids]
 
-        self.n = len(class_ids)
+        self.n = len(self.classes)
         self.batch_size = batch_size
         self.seed = seed
         self.shuffle = shuffle
@@ -172,6 +198,7 @@ class CUB200MetaInfo(ImageNet1KMetaInfo):
         self.train_generator = cub200_train_generator
         self.val_generator = cub200_val_generator
         self.test_generator = cub200_val_generator
+        self.tfdata_source = cub200_tfdata_source
         self.net_extra_kwargs = {"aux": False}
         self.load_ignore_extra = True
 
@@ -310,3 +337,33 @@ def cub200_val_generator(data_generator,
         interpolation=ds_metainfo.interpolation_msg,
         mode="val")
     return generator
+
+
+def cub200_tfdata_source(ds_metainfo,
+                         subset):
+    """
+    Create tf.data source for CUB-200-2011.
+
+    Parameters:
+    ----------
+    ds_metainfo : DatasetMetaInfo
+        CUB-200-2011 dataset metainfo.
+    subset : str
+        Data subset ('train', 'val', or 'test').
+
+    Returns
+    -------
+    tf.data.Dataset
+        Samples (image file path and label).
+    int
+        Dataset size.
+    function
+        Sample decoder.
+    """
+    file_paths, labels = get_cub200_image_list(
+        root_dir_path=ds_metainfo.root_dir_path,
+        mode=subset)
+    return image_files_tfdata_source(
+        file_paths=file_paths,
+        labels=labels,
+        ds_metainfo=ds_metainfo)
@@ -36,6 +36,10 @@ class DatasetMetaInfo(object):
         self.allow_hybridize = True
         self.net_extra_kwargs = None
         self.load_ignore_extra = False
+        self.tfdata_source = None
+        self.train_tfdata_transform = None
+        self.val_tfdata_transform = None
+        self.test_tfdata_transform = None
 
     def add_dataset_parser_arguments(self,
                                      parser,
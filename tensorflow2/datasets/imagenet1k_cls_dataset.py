@@ -2,17 +2,18 @@
     ImageNet-1K classification dataset.
 """
 
-__all__ = ['ImageNet1KMetaInfo', 'load_image_imagenet1k_val']
+__all__ = ['ImageNet1KMetaInfo', 'load_image_imagenet1k_val', 'image_files_tfdata_source']
 
 import os
 import math
 import cv2
 import numpy as np
 from PIL import Image
+import tensorflow as tf
 from tensorflow.keras.preprocessing.image import ImageDataGenerator
 import keras_preprocessing as keras_prep
 from .dataset_metainfo import DatasetMetaInfo
-from .cls_dataset import img_normalization
+from .cls_dataset import img_normalization, decode_image_tfdata, cls_train_tfdata_transform, cls_val_tfdata_transform
 
 
 class ImageNet1KMetaInfo(DatasetMetaInfo):
@@ -44,6 +45,10 @@ class ImageNet1KMetaInfo(DatasetMetaInfo):
         self.train_generator = imagenet_train_generator
         self.val_generator = imagenet_val_generator
         self.test_generator = imagenet_val_generator
+        self.tfdata_source = imagenet_tfdata_source
+        self.train_tfdata_transform = cls_train_tfdata_transform
+        self.val_tfdata_transform = cls_val_tfdata_transform
+        self.test_tfdata_transform = cls_val_tfdata_transform
         self.ml_type = "imgcls"
         self.mean_rgb = (0.485, 0.456, 0.406)
         self.std_rgb = (0.229, 0.224, 0.225)
@@ -378,3 +383,84 @@ def imagenet_val_generator(data_generator,
         shuffle=False,
         interpolation=ds_metainfo.interpolation_msg)
     return generator
+
+
+def image_files_tfdata_source(file_paths,
+                              labels,
+                              ds_metainfo):
+    """
+    Create tf.data source for a list of image files.
+
+    Parameters:
+    ----------
+    file_paths : list of str
+        Paths to image files.
+    labels : list of int
+        Class labels.
+    ds_metainfo : DatasetMetaInfo
+        Dataset metainfo.
+
+    Returns
+    -------
+    tf.data.Dataset
+        Samples (image file path and label).
+    int
+        Dataset size.
+    function
+        Sample decoder.
+    """
+    interpolation, resize_inv_factor = ds_metainfo.interpolation_msg.split(":")\
+        if ":" in ds_metainfo.interpolation_msg else (ds_metainfo.interpolation_msg, None)
+
+    def decode(file_path, label):
+        image = decode_image_tfdata(
+            file_path=file_path,
+            image_size=ds_metainfo.input_image_size,
+            interpolation=interpolation,
+            resize_inv_factor=(float(resize_inv_factor) if resize_inv_factor is not None else None))
+        return image, label
+
+    samples = tf.data.Dataset.from_tensor_slices((
+        tf.constant(file_paths, tf.string),
+        tf.constant(labels, tf.float32)))
+    return samples, len(file_paths), decode
+
+
+def imagenet_tfdata_source(ds_metainfo,
+                           subset):
+    """
+    Create tf.data source for ImageNet-1K (the same class indexing and file order as in
+    `ImageDataGenerator.flow_from_directory`).
+
+    Parameters:
+    ----------
+    ds_metainfo : DatasetMetaInfo
+        ImageNet-1K dataset metainfo.
+    subset : str
+        Data subset ('train', 'val', or 'test').
+
+    Returns
+    -------
+    tf.data.Dataset
+        Samples (image file path and label).
+    int
+        Dataset size.
+    function
+        Sample decoder.
+    """
+    split = "train" if subset == "train" else "val"
+    root = os.path.join(ds_metainfo.root_dir_path, split)
+    white_list_formats = (".png", ".jpg", ".jpeg", ".bmp", ".ppm", ".tif", ".tiff")
+    class_names = sorted([name for name in os.listdir(root) if os.path.isdir(os.path.join(root, name))])
+    file_paths = []
+    labels = []
+    for class_id, class_name in enumerate(class_names):
+        for dir_path, _, file_names in sorted(os.walk(os.path.join(root, class_name)), key=lambda x: x[0]):
+            for file_name in sorted(file_names):
+                if file_name.lower().endswith(white_list_formats):
+                    file_paths.append(os.path.join(dir_path, file_name))
+                    labels.append(class_id)
+    return image_files_tfdata_source(
+        file_paths=file_paths,
+        labels=labels,
+        ds_metainfo=ds_metainfo)
@@ -1,6 +1,7 @@
 import random
 import threading
 import numpy as np
+import tensorflow as tf
 from PIL import Image, ImageOps, ImageFilter
 from tensorflow.keras.preprocessing.image import ImageDataGenerator, DirectoryIterator
 
@@ -219,3 +220,46 @@ class SegImageDataGenerator(ImageDataGenerator):
             subset=subset,
             interpolation=interpolation,
             dataset=dataset)
+
+
+def seg_tfdata_source(ds_metainfo,
+                      subset):
+    """
+    Create tf.data source for a segmentation dataset. Samples are decoded by the dataset class itself (so dataset
+    specific mask transforms are kept) in parallel `map` calls.
+
+    Parameters:
+    ----------
+    ds_metainfo : DatasetMetaInfo
+        Dataset metainfo.
+    subset : str
+        Data subset ('val' or 'test').
+
+    Returns
+    -------
+    tf.data.Dataset
+        Samples (indices).
+    int
+        Dataset size.
+    function
+        Sample decoder.
+    """
+    assert (subset in ("val", "test"))
+    dataset = ds_metainfo.dataset_class(
+        root=ds_metainfo.root_dir_path,
+        mode="test",
+        transform=None)
+    ds_metainfo.update_from_dataset(dataset)
+
+    def get_sample(index):
+        image, mask = dataset[int(index)]
+        return np.asarray(image, np.uint8), mask.astype(np.float32)
+
+    def decode(index):
+        image, mask = tf.numpy_function(get_sample, [index], (tf.uint8, tf.float32))
+        image.set_shape((None, None, 3))
+        mask.set_shape((None, None))
+        return image, mask
+
+    samples = tf.data.Dataset.range(len(dataset))
+    return samples, len(dataset), decode
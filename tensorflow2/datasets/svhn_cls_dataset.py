@@ -5,7 +5,7 @@
 import os
 import hashlib
 import numpy as np
-from .cifar10_cls_dataset import CIFAR10MetaInfo
+from .cifar10_cls_dataset import CIFAR10MetaInfo, array_tfdata_source
 
 
 def _download(url, path=None, overwrite=False, sha1_hash=None, retries=5, verify_ssl=True):
@@ -168,6 +168,7 @@ class SVHNMetaInfo(CIFAR10MetaInfo):
         self.train_generator = svhn_train_generator
         self.val_generator = svhn_val_generator
         self.test_generator = svhn_val_generator
+        self.tfdata_source = svhn_tfdata_source
 
 
 def svhn_train_generator(data_generator,
@@ -232,3 +233,31 @@ def svhn_val_generator(data_generator,
         batch_size=batch_size,
         shuffle=False)
     return generator
+
+
+def svhn_tfdata_source(ds_metainfo,
+                       subset):
+    """
+    Create tf.data source for SVHN.
+
+    Parameters:
+    ----------
+    ds_metainfo : DatasetMetaInfo
+        SVHN dataset metainfo.
+    subset : str
+        Data subset ('train', 'val', or 'test').
+
+    Returns
+    -------
+    tf.data.Dataset
+        Samples (image and label).
+    int
+        Dataset size.
+    function
+        Sample decoder.
+    """
+    assert(ds_metainfo is not None)
+    x, y = get_svhn_data(
+        root=ds_metainfo.root_dir_path,
+        mode=("train" if subset == "train" else "val"))
+    return array_tfdata_source(x, y)
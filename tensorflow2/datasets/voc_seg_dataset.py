@@ -4,9 +4,10 @@
 
 import os
 import numpy as np
+import tensorflow as tf
 from PIL import Image
 from chainer import get_dtype
-from .seg_dataset import SegDataset, SegImageDataGenerator
+from .seg_dataset import SegDataset, SegImageDataGenerator, seg_tfdata_source
 from .dataset_metainfo import DatasetMetaInfo
 
 
@@ -182,6 +183,9 @@ class VOCMetaInfo(DatasetMetaInfo):
         self.train_generator = voc_train_generator
         self.val_generator = voc_val_generator
         self.test_generator = voc_test_generator
+        self.tfdata_source = seg_tfdata_source
+        self.val_tfdata_transform = voc_test_tfdata_transform
+        self.test_tfdata_transform = voc_test_tfdata_transform
         self.ml_type = "imgseg"
         self.allow_hybridize = False
         self.net_extra_kwargs = {"aux": False, "fixed_size": False}
@@ -365,3 +369,28 @@ def voc_test_generator(data_generator,
             transform=VOCSegTestTransform(
                 ds_metainfo=ds_metainfo)))
     return generator
+
+
+def voc_test_tfdata_transform(ds_metainfo):
+    """
+    Create tf.data image transform for validation/testing subset (the same normalization as in
+    `VOCSegTestTransform`).
+
+    Parameters:
+    ----------
+    ds_metainfo : DatasetMetaInfo
+        Pascal VOC2012 dataset metainfo.
+
+    Returns
+    -------
+    function
+        Image transform.
+    """
+    test_transform = ds_metainfo.test_transform2(ds_metainfo=ds_metainfo)
+    mean = tf.constant(test_transform.mean, tf.float32)
+    std = tf.constant(test_transform.std, tf.float32)
+
+    def transform(image, mask):
+        image = (tf.cast(image, tf.float32) * (1.0 / 255.0) - mean) / std
+        return image, mask
+    return transform
@@ -5,8 +5,8 @@
     - 'Adversarial Examples Improve Image Recognition,' https://arxiv.org/abs/1911.09665.
 """
 
-__all__ = ['EfficientNet', 'calc_tf_padding', 'EffiInvResUnit', 'EffiInitBlock', 'efficientnet_b0', 'efficientnet_b1',
-           'efficientnet_b2', 'efficientnet_b3', 'efficientnet_b4', 'efficientnet_b5', 'efficientnet_b6',
+__all__ = ['EfficientNet', 'calc_tf_padding', 'apply_tf_padding', 'EffiInvResUnit', 'EffiInitBlock', 'efficientnet_b0',
+           'efficientnet_b1', 'efficientnet_b2', 'efficientnet_b3', 'efficientnet_b4', 'efficientnet_b5', 'efficientnet_b6',
            'efficientnet_b7', 'efficientnet_b8', 'efficientnet_b0b', 'efficientnet_b1b', 'efficientnet_b2b',
            'efficientnet_b3b', 'efficientnet_b4b', 'efficientnet_b5b', 'efficientnet_b6b', 'efficientnet_b7b',
            'efficientnet_b0c', 'efficientnet_b1c', 'efficientnet_b2c', 'efficientnet_b3c', 'efficientnet_b4c',
@@ -46,7 +46,7 @@ def calc_tf_padding(x,
     tuple of 4 int
         The size of the padding.
     """
-    height, width = x.shape[2:]
+    height, width = x.shape[2:] if is_channels_first(data_format) else x.shape[1:3]
     oh = math.ceil(height / strides)
     ow = math.ceil(width / strides)
     pad_h = max((oh - 1) * strides + (kernel_size - 1) * dilation + 1 - height, 0)
@@ -58,6 +58,58 @@ def calc_tf_padding(x,
     return paddings_tf
 
 
+def apply_tf_padding(x,
+                     conv,
+                     cache,
+                     kernel_size,
+                     strides=1,
+                     dilation=1,
+                     fold=True,
+                     data_format="channels_last"):
+    """
+    Apply TF-same like padding for the convolution. The padding is calculated once per input resolution and cached.
+    In the folding mode the convolution itself uses 'same' padding, so no padded copy of the input is made.
+
+    Parameters:
+    ----------
+    x : tensor
+        Input tensor.
+    conv : Conv2d
+        Convolution layer (the padding mode of the underlying Keras layer is updated).
+    cache : dict
+        Cache of paddings for input resolutions.
+    kernel_size : int
+        Convolution window size.
+    strides : int, default 1
+        Strides of the convolution.
+    dilation : int, default 1
+        Dilation value for convolution layer.
+    fold : bool, default True
+        Whether to fold padding into the convolution.
+    data_format : str, default 'channels_last'
+        The ordering of the dimensions in tensors.
+
+    Returns
+    -------
+    tensor
+        Padded (if required) input tensor.
+    """
+    keras_conv = conv.conv if conv.use_conv else conv.dw_conv
+    if fold:
+        keras_conv.padding = "same"
+        return x
+    keras_conv.padding = "valid"
+    key = tuple(x.shape[2:] if is_channels_first(data_format) else x.shape[1:3])
+    if key not in cache:
+        paddings_tf = calc_tf_padding(x, kernel_size=kernel_size, strides=strides, dilation=dilation,
+                                      data_format=data_format)
+        cache[key] = paddings_tf if any([sum(p) > 0 for p in paddings_tf]) else None
+    paddings_tf = cache[key]
+    if paddings_tf is not None:
+        x = tf.pad(x, paddings=paddings_tf)
+    return x
+
+
 class EffiDwsConvUnit(nn.Layer):
     """
     EfficientNet specific depthwise separable convolution block/unit with BatchNorms and activations at each convolution
@@ -91,6 +143,8 @@ class EffiDwsConvUnit(nn.Layer):
                  **kwargs):
         super(EffiDwsConvUnit, self).__init__(**kwargs)
         self.tf_mode = tf_mode
+        self.fold_tf_padding = True
+        self.tf_paddings = {}
         self.data_format = data_format
         self.residual = (in_channels == out_channels) and (strides == 1)
 
@@ -120,7 +174,8 @@ class EffiDwsConvUnit(nn.Layer):
         if self.residual:
             identity = x
         if self.tf_mode:
-            x = tf.pad(x, paddings=calc_tf_padding(x, kernel_size=3, data_format=self.data_format))
+            x = apply_tf_padding(x, self.dw_conv.conv, self.tf_paddings, kernel_size=3, fold=self.fold_tf_padding,
+                                 data_format=self.data_format)
         x = self.dw_conv(x, training=training)
         x = self.se(x)
         x = self.pw_conv(x, training=training)
@@ -172,6 +227,8 @@ class EffiInvResUnit(nn.Layer):
         self.kernel_size = kernel_size
         self.strides = strides
         self.tf_mode = tf_mode
+        self.fold_tf_padding = True
+        self.tf_paddings = {}
         self.data_format = data_format
         self.residual = (in_channels == out_channels) and (strides == 1)
         self.use_se = se_factor > 0
@@ -214,8 +271,8 @@ class EffiInvResUnit(nn.Layer):
             identity = x
         x = self.conv1(x, training=training)
         if self.tf_mode:
-            x = tf.pad(x, paddings=calc_tf_padding(x, kernel_size=self.kernel_size, strides=self.strides,
-                                                   data_format=self.data_format))
+            x = apply_tf_padding(x, self.conv2.conv, self.tf_paddings, kernel_size=self.kernel_size,
+                                 strides=self.strides, fold=self.fold_tf_padding, data_format=self.data_format)
         x = self.conv2(x, training=training)
         if self.use_se:
             x = self.se(x)
@@ -254,6 +311,8 @@ class EffiInitBlock(nn.Layer):
                  **kwargs):
         super(EffiInitBlock, self).__init__(**kwargs)
         self.tf_mode = tf_mode
+        self.fold_tf_padding = True
+        self.tf_paddings = {}
         self.data_format = data_format
 
         self.conv = conv3x3_block(
@@ -268,7 +327,8 @@ class EffiInitBlock(nn.Layer):
 
     def call(self, x, training=None):
         if self.tf_mode:
-            x = tf.pad(x, paddings=calc_tf_padding(x, kernel_size=3, strides=2, data_format=self.data_format))
+            x = apply_tf_padding(x, self.conv.conv, self.tf_paddings, kernel_size=3, strides=2,
+                                 fold=self.fold_tf_padding, data_format=self.data_format)
         x = self.conv(x, training=training)
         return x
 
@@ -1058,6 +1118,18 @@ def _test():
         assert (model != efficientnet_b6b or weight_count == 43040704)
         assert (model != efficientnet_b7b or weight_count == 66347960)
 
+    net = efficientnet_b0b(pretrained=pretrained, data_format=data_format)
+    tf_layers = [layer for layer in net._flatten_layers() if hasattr(layer, "fold_tf_padding")]
+    for in_size in [(224, 224), (225, 225), (240, 240), (256, 200)]:
+        x = tf.random.normal((1, 3) + in_size if is_channels_first(data_format) else (1,) + in_size + (3,))
+        y = net(x)
+        for layer in tf_layers:
+            layer.fold_tf_padding = False
+        y_ref = net(x)
+        for layer in tf_layers:
+            layer.fold_tf_padding = True
+        assert (np.abs(y.numpy() - y_ref.numpy()).max() < 1e-4)
+
 
 if __name__ == "__main__":
     _test()
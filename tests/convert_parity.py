@@ -0,0 +1,640 @@
+"""
+    Numerical parity suite for layers and whole models across Gluon/PyTorch/Chainer/TF2/Keras (on CPU). All frameworks
+    get shared random inputs and the same (converted) weights. The suite reports max/mean abs errors against the
+    reference framework and forward latency for each framework. Run as `python tests/convert_parity.py` or
+    `python -m tests.convert_parity`.
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import importlib
+import numpy as np
+
+# The script is also runnable as `python tests/convert_parity.py` (the repo root is required for the repo's packages):
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Layer cases. Weights are generated in the canonical (Gluon/PyTorch) layout.
+LAYER_CASES = [
+    {"name": "conv2d", "type": "conv", "in_channels": 3, "out_channels": 64, "kernel_size": 7, "stride": 2,
+     "padding": 3, "groups": 1, "use_bias": True, "in_size": (224, 256)},
+    {"name": "conv1x1", "type": "conv", "in_channels": 64, "out_channels": 128, "kernel_size": 1, "stride": 1,
+     "padding": 0, "groups": 1, "use_bias": False, "in_size": (56, 56)},
+    {"name": "dwconv2d", "type": "conv", "in_channels": 64, "out_channels": 64, "kernel_size": 3, "stride": 2,
+     "padding": 1, "groups": 64, "use_bias": False, "in_size": (56, 56)},
+    {"name": "gconv2d", "type": "conv", "in_channels": 64, "out_channels": 128, "kernel_size": 3, "stride": 1,
+     "padding": 1, "groups": 8, "use_bias": True, "in_size": (28, 28)},
+    {"name": "dense", "type": "dense", "in_channels": 1024, "out_channels": 1000},
+    {"name": "batchnorm", "type": "batchnorm", "in_channels": 64, "epsilon": 1e-5, "in_size": (56, 56)},
+    {"name": "avgpool2d", "type": "avgpool", "in_channels": 64, "kernel_size": 3, "stride": 2, "padding": 1,
+     "in_size": (56, 56)},
+    # Max pooling follows activations in the zoo models (TF2/Keras pad with zeros), so the input is non-negative:
+    {"name": "maxpool2d", "type": "maxpool", "in_channels": 64, "kernel_size": 3, "stride": 2, "padding": 1,
+     "in_size": (56, 56), "non_negative": True},
+]
+
+ALL_FWKS = ["gluon", "pytorch", "chainer", "tf2", "keras"]
+
+# Modules of frameworks themselves (Keras models of the repo require Keras 2 API) and of the repo's packages:
+_fwk_modules = {"gluon": "mxnet", "pytorch": "torch", "chainer": "chainer", "tf2": "tensorflow",
+                "keras": "keras.engine.base_layer"}
+_fwk_repo_modules = {"tf2": "tensorflow2.tf2cv.models.common", "keras": "keras_.kerascv.models.common"}
+
+# Pairs of frameworks (source, destination) supported by `convert_models.convert_params`:
+CONVERSIONS = [
+    ("gluon", "gluon"), ("gluon", "pytorch"), ("gluon", "chainer"), ("gluon", "keras"), ("gluon", "tensorflow"),
+    ("gluon", "tf2"), ("pytorch", "pytorch"), ("pytorch", "gluon"), ("mxnet", "gluon"), ("tensorflow", "tensorflow"),
+    ("tensorflow", "gluon")]
+
+
+def parse_args():
+    """
+    Create python script parameters.
+
+    Returns
+    -------
+    ArgumentParser
+        Resulted args.
+    """
+    parser = argparse.ArgumentParser(
+        description="Numerical parity of layers and models across frameworks",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument(
+        "--fwks",
+        type=str,
+        default=",".join(ALL_FWKS),
+        help="comma-separated list of frameworks (the first available one is the reference for layers)")
+    parser.add_argument(
+        "--layers",
+        type=str,
+        default=",".join([case["name"] for case in LAYER_CASES]),
+        help="comma-separated list of layer cases (empty for skipping)")
+    parser.add_argument(
+        "--models",
+        type=str,
+        default="resnet18,mobilenet_w1",
+        help="comma-separated list of models (empty for skipping)")
+    parser.add_argument(
+        "--src-fwk",
+        type=str,
+        default="gluon",
+        help="source framework for model conversions")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=2,
+        help="batch size of random inputs")
+    parser.add_argument(
+        "--num-iters",
+        type=int,
+        default=5,
+        help="number of measured iterations (the best one is reported)")
+    parser.add_argument(
+        "--tol",
+        type=float,
+        default=1e-4,
+        help="tolerance for max abs error")
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="random seed")
+    args = parser.parse_args()
+    return args
+
+
+def is_fwk_available(fwk):
+    """
+    Check whether framework can be imported. Only absence of the framework itself means unavailability, import errors
+    of the repo's own packages are raised.
+    """
+    if fwk not in _fwk_modules:
+        return False
+    try:
+        importlib.import_module(_fwk_modules[fwk])
+    except ImportError:
+        return False
+    if fwk in _fwk_repo_modules:
+        importlib.import_module(_fwk_repo_modules[fwk])
+    return True
+
+
+def generate_layer_data(case,
+                        batch_size,
+                        rs):
+    """
+    Generate random input and canonical parameters for a layer case.
+
+    Parameters:
+    ----------
+    case : dict
+        Layer case.
+    batch_size : int
+        Batch size.
+    rs : np.random.RandomState
+        Random state.
+
+    Returns
+    -------
+    np.array
+        Input in NCHW (or NC) layout.
+    dict
+        Parameters.
+    """
+    in_channels = case["in_channels"]
+    if case["type"] == "dense":
+        x = rs.randn(batch_size, in_channels).astype(np.float32)
+    else:
+        x = rs.randn(batch_size, in_channels, case["in_size"][0], case["in_size"][1]).astype(np.float32)
+    if case.get("non_negative", False):
+        x = np.abs(x)
+
+    params = {}
+    if case["type"] == "conv":
+        kernel_size = case["kernel_size"]
+        params["weight"] = rs.randn(
+            case["out_channels"], in_channels // case["groups"], kernel_size, kernel_size).astype(np.float32)
+        if case["use_bias"]:
+            params["bias"] = rs.randn(case["out_channels"]).astype(np.float32)
+    elif case["type"] == "dense":
+        params["weight"] = rs.randn(case["out_channels"], in_channels).astype(np.float32)
+        params["bias"] = rs.randn(case["out_channels"]).astype(np.float32)
+    elif case["type"] == "batchnorm":
+        params["gamma"] = rs.uniform(0.5, 1.5, in_channels).astype(np.float32)
+        params["beta"] = rs.uniform(-0.5, 0.5, in_channels).astype(np.float32)
+        params["running_mean"] = rs.uniform(-0.5, 0.5, in_channels).astype(np.float32)
+        params["running_var"] = rs.uniform(0.5, 2.0, in_channels).astype(np.float32)
+    return x, params
+
+
+def get_tf_weights(case,
+                   params,
+                   channels_first=False):
+    """
+    Convert canonical parameters into the list of TF2/Keras weights (in the order of layer weights).
+    """
+    if case["type"] == "conv":
+        groups = case["groups"]
+        weight = params["weight"]
+        bias = params.get("bias")
+        if (groups > 1) and (groups == case["in_channels"]) and (groups == case["out_channels"]):
+            weights = [np.transpose(weight, (2, 3, 0, 1))]
+            return weights + ([bias] if bias is not None else [])
+        weights = []
+        out_group = case["out_channels"] // groups
+        for i in range(groups):
+            weights.append(np.transpose(weight[i * out_group:(i + 1) * out_group], (2, 3, 1, 0)))
+            if bias is not None:
+                weights.append(bias[i * out_group:(i + 1) * out_group])
+        return weights
+    elif case["type"] == "dense":
+        return [params["weight"].T, params["bias"]]
+    elif case["type"] == "batchnorm":
+        return [params["gamma"], params["beta"], params["running_mean"], params["running_var"]]
+    return []
+
+
+def build_layer(fwk,
+                case,
+                params,
+                x):
+    """
+    Build a layer with the given parameters.
+
+    Parameters:
+    ----------
+    fwk : str
+        Framework name.
+    case : dict
+        Layer case.
+    params : dict
+        Canonical parameters.
+    x : np.array
+        Input in NCHW (or NC) layout.
+
+    Returns
+    -------
+    function
+        Function for calculation of the layer output (in NCHW layout) for the prepared input.
+    """
+    layer_type = case["type"]
+    if fwk == "gluon":
+        import mxnet as mx
+        ctx = mx.cpu()
+        if layer_type == "conv":
+            layer = mx.gluon.nn.Conv2D(
+                channels=case["out_channels"],
+                kernel_size=case["kernel_size"],
+                strides=case["stride"],
+                padding=case["padding"],
+                groups=case["groups"],
+                use_bias=case["use_bias"],
+                in_channels=case["in_channels"])
+        elif layer_type == "dense":
+            layer = mx.gluon.nn.Dense(
+                units=case["out_channels"],
+                in_units=case["in_channels"])
+        elif layer_type == "batchnorm":
+            layer = mx.gluon.nn.BatchNorm(
+                epsilon=case["epsilon"],
+                in_channels=case["in_channels"])
+        elif layer_type == "avgpool":
+            layer = mx.gluon.nn.AvgPool2D(
+                pool_size=case["kernel_size"],
+                strides=case["stride"],
+                padding=case["padding"])
+        else:
+            layer = mx.gluon.nn.MaxPool2D(
+                pool_size=case["kernel_size"],
+                strides=case["stride"],
+                padding=case["padding"])
+        layer_params = layer._collect_params_with_prefix()
+        for name, value in params.items():
+            layer_params[name]._load_init(mx.nd.array(value, ctx), ctx)
+        gl_x = mx.nd.array(x, ctx)
+
+        def run():
+            return layer(gl_x).asnumpy()
+
+    elif fwk == "pytorch":
+        import torch
+        if layer_type == "conv":
+            layer = torch.nn.Conv2d(
+                in_channels=case["in_channels"],
+                out_channels=case["out_channels"],
+                kernel_size=case["kernel_size"],
+                stride=case["stride"],
+                padding=case["padding"],
+                groups=case["groups"],
+                bias=case["use_bias"])
+        elif layer_type == "dense":
+            layer = torch.nn.Linear(
+                in_features=case["in_channels"],
+                out_features=case["out_channels"])
+        elif layer_type == "batchnorm":
+            layer = torch.nn.BatchNorm2d(
+                num_features=case["in_channels"],
+                eps=case["epsilon"])
+        elif layer_type == "avgpool":
+            layer = torch.nn.AvgPool2d(
+                kernel_size=case["kernel_size"],
+                stride=case["stride"],
+                padding=case["padding"])
+        else:
+            layer = torch.nn.MaxPool2d(
+                kernel_size=case["kernel_size"],
+                stride=case["stride"],
+                padding=case["padding"])
+        name_map = {"gamma": "weight", "beta": "bias"}
+        layer.load_state_dict({name_map.get(k, k): torch.from_numpy(v) for k, v in params.items()}, strict=False)
+        layer.eval()
+        pt_x = torch.from_numpy(x)
+
+        def run():
+            with torch.no_grad():
+                return layer(pt_x).numpy()
+
+    elif fwk == "chainer":
+        import chainer
+        import chainer.functions as F
+        import chainer.links as L
+        if layer_type == "conv":
+            layer = L.Convolution2D(
+                in_channels=case["in_channels"],
+                out_channels=case["out_channels"],
+                ksize=case["kernel_size"],
+                stride=case["stride"],
+                pad=case["padding"],
+                nobias=(not case["use_bias"]),
+                groups=case["groups"])
+            layer.W.array[:] = params["weight"]
+            if case["use_bias"]:
+                layer.b.array[:] = params["bias"]
+        elif layer_type == "dense":
+            layer = L.Linear(
+                in_size=case["in_channels"],
+                out_size=case["out_channels"])
+            layer.W.array[:] = params["weight"]
+            layer.b.array[:] = params["bias"]
+        elif layer_type == "batchnorm":
+            layer = L.BatchNormalization(
+                size=case["in_channels"],
+                eps=case["epsilon"])
+            layer.gamma.array[:] = params["gamma"]
+            layer.beta.array[:] = params["beta"]
+            layer.avg_mean[:] = params["running_mean"]
+            layer.avg_var[:] = params["running_var"]
+        elif layer_type == "avgpool":
+            def layer(z):
+                return F.average_pooling_2d(z, ksize=case["kernel_size"], stride=case["stride"], pad=case["padding"])
+        else:
+            def layer(z):
+                return F.max_pooling_2d(z, ksize=case["kernel_size"], stride=case["stride"], pad=case["padding"],
+                                        cover_all=False)
+
+        def run():
+            with chainer.using_config("train", False), chainer.no_backprop_mode():
+                return layer(x).array
+
+    elif fwk == "tf2":
+        import tensorflow as tf
+        from tensorflow2.tf2cv.models.common import Conv2d, BatchNorm, AvgPool2d, MaxPool2d
+        data_format = "channels_last"
+        if layer_type == "conv":
+            layer = Conv2d(
+                in_channels=case["in_channels"],
+                out_channels=case["out_channels"],
+                kernel_size=case["kernel_size"],
+                strides=case["stride"],
+                padding=case["padding"],
+                groups=case["groups"],
+                use_bias=case["use_bias"],
+                data_format=data_format)
+        elif layer_type == "dense":
+            layer = tf.keras.layers.Dense(units=case["out_channels"])
+        elif layer_type == "batchnorm":
+            layer = BatchNorm(
+                epsilon=case["epsilon"],
+                data_format=data_format)
+        elif layer_type == "avgpool":
+            layer = AvgPool2d(
+                pool_size=case["kernel_size"],
+                strides=case["stride"],
+                padding=case["padding"],
+                data_format=data_format)
+        else:
+            layer = MaxPool2d(
+                pool_size=case["kernel_size"],
+                strides=case["stride"],
+                padding=case["padding"],
+                data_format=data_format)
+        tf2_x = tf.convert_to_tensor(x.transpose((0, 2, 3, 1)) if x.ndim == 4 else x)
+        layer(tf2_x)
+        if params:
+            layer.set_weights(get_tf_weights(case, params))
+
+        def run():
+            y = layer(tf2_x, training=False) if layer_type == "batchnorm" else layer(tf2_x)
+            y = y.numpy()
+            return y.transpose((0, 3, 1, 2)) if y.ndim == 4 else y
+
+    elif fwk == "keras":
+        import keras
+        from keras_.kerascv.models.common import is_channels_first, conv2d, batchnorm, avgpool2d, maxpool2d
+        channels_first = is_channels_first()
+        if x.ndim == 4:
+            ke_x = x if channels_first else x.transpose((0, 2, 3, 1))
+        else:
+            ke_x = x
+        input = keras.layers.Input(shape=ke_x.shape[1:])
+        if layer_type == "conv":
+            y = conv2d(
+                x=input,
+                in_channels=case["in_channels"],
+                out_channels=case["out_channels"],
+                kernel_size=case["kernel_size"],
+                strides=case["stride"],
+                padding=case["padding"],
+                groups=case["groups"],
+                use_bias=case["use_bias"],
+                name="conv")
+        elif layer_type == "dense":
+            y = keras.layers.Dense(units=case["out_channels"])(input)
+        elif layer_type == "batchnorm":
+            y = batchnorm(
+                x=input,
+                epsilon=case["epsilon"],
+                name="bn")
+        elif layer_type == "avgpool":
+            y = avgpool2d(
+                x=input,
+                pool_size=case["kernel_size"],
+                strides=case["stride"],
+                padding=case["padding"],
+                name="pool")
+        else:
+            y = maxpool2d(
+                x=input,
+                pool_size=case["kernel_size"],
+                strides=case["stride"],
+                padding=case["padding"],
+                name="pool")
+        layer = keras.models.Model(inputs=input, outputs=y)
+        if params:
+            layer.set_weights(get_tf_weights(case, params, channels_first))
+
+        def run():
+            y = layer.predict(ke_x, verbose=0)
+            return y.transpose((0, 3, 1, 2)) if (y.ndim == 4) and (not channels_first) else y
+
+    else:
+        raise ValueError("Unsupported fwk: {}".format(fwk))
+    return run
+
+
+def measure(run,
+            num_iters):
+    """
+    Calculate output and the best forward latency.
+    """
+    y = run()
+    best_time = float("inf")
+    for _ in range(num_iters):
+        tic = time.time()
+        run()
+        best_time = min(best_time, time.time() - tic)
+    return y, best_time
+
+
+def calc_errors(y_ref,
+                y):
+    """
+    Calculate max and mean absolute errors.
+    """
+    if y_ref.shape != y.shape:
+        raise ValueError("Shape mismatch: {} vs {}".format(y_ref.shape, y.shape))
+    diff = np.abs(y_ref - y)
+    return float(diff.max()), float(diff.mean())
+
+
+def check_layers(args,
+                 fwks):
+    """
+    Check parity of layers.
+
+    Parameters:
+    ----------
+    args : ArgumentParser
+        Main script arguments.
+    fwks : list of str
+        Available frameworks (the first is the reference).
+
+    Returns
+    -------
+    list of tuple
+        Results (name, fwk, max error, mean error, time, status).
+    """
+    cases = {case["name"]: case for case in LAYER_CASES}
+    rs = np.random.RandomState(args.seed)
+    results = []
+    for name in [name for name in args.layers.split(",") if name]:
+        case = cases[name]
+        x, params = generate_layer_data(case, args.batch_size, rs)
+        y_ref = None
+        for fwk in fwks:
+            try:
+                y, fwk_time = measure(build_layer(fwk, case, params, x), args.num_iters)
+                if y_ref is None:
+                    y_ref = y
+                max_err, mean_err = calc_errors(y_ref, y)
+                results.append((name, fwk, max_err, mean_err, fwk_time, "ok" if max_err <= args.tol else "FAIL"))
+            except Exception as e:
+                results.append((name, fwk, None, None, None, "error: {}: {}".format(
+                    type(e).__name__, str(e).split("\n")[0])))
+    return results
+
+
+def check_models(args,
+                 fwks):
+    """
+    Check parity of whole models converted from the source framework (see convert_models.py).
+
+    Parameters:
+    ----------
+    args : ArgumentParser
+        Main script arguments.
+    fwks : list of str
+        Available frameworks.
+
+    Returns
+    -------
+    list of tuple
+        Results (name, fwk, max error, mean error, time, status).
+    """
+    from convert_models import prepare_src_model, prepare_dst_model, convert_params
+    from convert_models_batch import get_dst_params_file_path, load_dst_params, run_net
+
+    ctx = None
+    if "gluon" in [args.src_fwk] + fwks:
+        import mxnet as mx
+        ctx = mx.cpu()
+    rs = np.random.RandomState(args.seed)
+    save_dir = tempfile.mkdtemp()
+    results = []
+    for model_name in [name for name in args.models.split(",") if name]:
+        src_params, src_param_keys, ext_src_param_keys, ext_src_param_keys2, src_net = prepare_src_model(
+            src_fwk=args.src_fwk,
+            src_model=model_name,
+            src_params_file_path="",
+            dst_fwk=args.src_fwk,
+            ctx=ctx,
+            use_cuda=False,
+            remove_module=False,
+            num_classes=1000,
+            in_channels=3)
+        in_size = src_net.in_size if hasattr(src_net, "in_size") else (224, 224)
+        x = rs.randn(args.batch_size, 3, in_size[0], in_size[1]).astype(np.float32)
+        y_ref, src_time = measure(lambda: run_net(args.src_fwk, src_net, x, ctx), args.num_iters)
+        results.append((model_name, args.src_fwk, 0.0, 0.0, src_time, "ok"))
+        for fwk in fwks:
+            if fwk == args.src_fwk:
+                continue
+            if (args.src_fwk, fwk) not in CONVERSIONS:
+                results.append((model_name, fwk, None, None, None, "no conversion"))
+                continue
+            try:
+                dst_params, dst_param_keys, dst_net = prepare_dst_model(
+                    dst_fwk=fwk,
+                    dst_model=model_name,
+                    src_fwk=args.src_fwk,
+                    ctx=ctx,
+                    use_cuda=False,
+                    num_classes=1000,
+                    in_channels=3)
+                model_args = argparse.Namespace(
+                    src_fwk=args.src_fwk,
+                    dst_fwk=fwk,
+                    src_model=model_name,
+                    dst_model=model_name,
+                    dst_params=os.path.join(save_dir, os.path.basename(get_dst_params_file_path(
+                        argparse.Namespace(dst_params_ext="", dst_fwk=fwk, save_dir=save_dir), model_name))),
+                    src_num_classes=1000,
+                    dst_num_classes=1000,
+                    src_in_channels=3,
+                    dst_in_channels=3,
+                    key_map_cache_dir="")
+                convert_params(
+                    args=model_args,
+                    ctx=ctx,
+                    src_params=src_params,
+                    src_param_keys=list(src_param_keys),
+                    ext_src_param_keys=ext_src_param_keys,
+                    ext_src_param_keys2=ext_src_param_keys2,
+                    dst_params=dst_params,
+                    dst_param_keys=dst_param_keys,
+                    dst_net=dst_net)
+                load_dst_params(fwk, dst_net, model_args.dst_params, ctx)
+                y, fwk_time = measure(lambda: run_net(fwk, dst_net, x, ctx), args.num_iters)
+                max_err, mean_err = calc_errors(y_ref, y)
+                results.append((model_name, fwk, max_err, mean_err, fwk_time, "ok" if max_err <= args.tol else "FAIL"))
+            except NotImplementedError:
+                results.append((model_name, fwk, None, None, None, "no conversion"))
+            except Exception as e:
+                results.append((model_name, fwk, None, None, None, "error: {}: {}".format(
+                    type(e).__name__, str(e).split("\n")[0])))
+    return results
+
+
+def print_results(title,
+                  results):
+    """
+    Print table of results.
+    """
+    print(title)
+    print("{:>16} {:>8} {:>12} {:>12} {:>10}  {}".format("name", "fwk", "max_err", "mean_err", "time, ms", "status"))
+    for name, fwk, max_err, mean_err, fwk_time, status in results:
+        print("{:>16} {:>8} {:>12} {:>12} {:>10}  {}".format(
+            name, fwk,
+            "{:.3g}".format(max_err) if max_err is not None else "-",
+            "{:.3g}".format(mean_err) if mean_err is not None else "-",
+            "{:.2f}".format(fwk_time * 1000) if fwk_time is not None else "-",
+            status))
+
+
+def main():
+    """
+    Main body of script.
+    """
+    args = parse_args()
+
+    fwks = []
+    for fwk in args.fwks.split(","):
+        if is_fwk_available(fwk):
+            fwks.append(fwk)
+        else:
+            print("Framework `{}` isn't available, skipped.".format(fwk))
+
+    success = True
+    if args.layers:
+        results = check_layers(args, fwks)
+        print_results("Layers (reference is `{}`):".format(fwks[0]), results)
+        success = success and all([result[-1] == "ok" for result in results])
+    if args.models:
+        if args.src_fwk in fwks:
+            results = check_models(args, fwks)
+            print_results("Models (converted from `{}`):".format(args.src_fwk), results)
+            success = success and all([result[-1] in ["ok", "no conversion"] for result in results])
+        else:
+            print("Source framework `{}` isn't available, models are skipped.".format(args.src_fwk))
+
+    if success:
+        print("All ok.")
+    else:
+        print("Some checks failed.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
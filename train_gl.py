@@ -15,6 +15,7 @@ from mxnet import autograd as ag
 
 from common.logger_utils import initialize_logging
 from common.train_log_param_saver import TrainLogParamSaver
+from common.train_step_profiler import TrainStepProfiler
 from gluon.lr_scheduler import LRScheduler
 from gluon.utils import prepare_mx_context, prepare_model, validate
 from gluon.utils import report_accuracy, get_composite_metric, get_metric_name, get_initializer
@@ -211,6 +212,20 @@ def add_train_cls_parser_arguments(parser):
         type=int,
         default=50,
         help="number of batches to wait before logging")
+    parser.add_argument(
+        "--profile-steps",
+        action="store_true",
+        help="enable step-level profiling (data wait, H2D copy, forward, backward, optimizer, metric)")
+    parser.add_argument(
+        "--profile-window",
+        type=int,
+        default=200,
+        help="number of the last steps for rolling percentiles of step profiler")
+    parser.add_argument(
+        "--profile-stall-ratio",
+        type=float,
+        default=0.3,
+        help="share of step time spent waiting for data that is reported as data stall")
     parser.add_argument(
         "--save-interval",
         type=int,
@@ -478,7 +493,8 @@ def train_epoch(epoch,
                 num_classes,
                 num_epochs,
                 grad_clip_value,
-                batch_size_scale):
+                batch_size_scale,
+                profiler):
     """
     Train model on particular epoch.
 
@@ -524,6 +540,8 @@ def train_epoch(epoch,
         Threshold for gradient clipping.
     batch_size_scale : int
         Manual batch-size increasing factor.
+    profiler : TrainStepProfiler
+        Step-level profiler.
 
     Returns
     -------
@@ -540,7 +558,7 @@ def train_epoch(epoch,
 
     i = 0
     btic = time.time()
-    for i, batch in enumerate(train_data):
+    for i, batch in enumerate(profiler.wrap(train_data)):
         data_list, labels_list = batch_fn(batch, ctx)
 
         if label_smoothing:
@@ -558,12 +576,15 @@ def train_epoch(epoch,
                 lam = np.random.beta(alpha, alpha)
                 data_list = [lam * X + (1 - lam) * X[::-1] for X in data_list]
                 labels_list = [lam * Y + (1 - lam) * Y[::-1] for Y in labels_list]
+        profiler.mark("h2d")
 
         with ag.record():
             outputs_list = [net(X.astype(dtype, copy=False)) for X in data_list]
             loss_list = [loss_func(yhat, y.astype(dtype, copy=False)) for yhat, y in zip(outputs_list, labels_list)]
+        profiler.mark("forward")
         for loss in loss_list:
             loss.backward()
+        profiler.mark("backward")
         lr_scheduler.update(i, epoch)
 
         if grad_clip_value is not None:
@@ -580,12 +601,14 @@ def train_epoch(epoch,
                     p.zero_grad()
             else:
                 batch_size_extend_count += 1
+        profiler.mark("optimizer")
 
         train_loss += sum([loss.mean().asscalar() for loss in loss_list]) / len(loss_list)
 
         train_metric.update(
             labels=(labels_list if not (mixup or label_smoothing) else labels_list_inds),
             preds=outputs_list)
+        profiler.mark("metric")
 
         if log_interval and not (i + 1) % log_interval:
             speed = batch_size * log_interval / (time.time() - btic)
@@ -593,6 +616,8 @@ def train_epoch(epoch,
             train_accuracy_msg = report_accuracy(metric=train_metric)
             logging.info("Epoch[{}] Batch [{}]\tSpeed: {:.2f} samples/sec\t{}\tlr={:.5f}".format(
                 epoch + 1, i, speed, train_accuracy_msg, trainer.learning_rate))
+            if profiler.enabled:
+                logging.info("Epoch[{}] Batch [{}]\t{}".format(epoch + 1, i, profiler.report()))
 
     if (batch_size_scale != 1) and (batch_size_extend_count > 0):
         trainer.step(batch_size * batch_size_extend_count)
@@ -602,6 +627,8 @@ def train_epoch(epoch,
     throughput = int(batch_size * (i + 1) / (time.time() - tic))
     logging.info("[Epoch {}] speed: {:.2f} samples/sec\ttime cost: {:.2f} sec".format(
         epoch + 1, throughput, time.time() - tic))
+    if profiler.enabled:
+        logging.info("[Epoch {}] {}".format(epoch + 1, profiler.report()))
 
     train_loss /= (i + 1)
     train_accuracy_msg = report_accuracy(metric=train_metric)
@@ -632,7 +659,8 @@ def train_net(batch_size,
               batch_size_scale,
               val_metric,
               train_metric,
-              ctx):
+              ctx,
+              profiler=None):
     """
     Main procedure for training model.
 
@@ -682,7 +710,12 @@ def train_net(batch_size,
         Metric object instance (training subset).
     ctx : Context
         MXNet context.
+    profiler : TrainStepProfiler or None, default None
+        Step-level profiler.
     """
+    if profiler is None:
+        profiler = TrainStepProfiler(enabled=False)
+
     if batch_size_scale != 1:
         for p in net.collect_params().values():
             p.grad_req = "add"
@@ -729,7 +762,8 @@ def train_net(batch_size,
             num_classes=num_classes,
             num_epochs=num_epochs,
             grad_clip_value=grad_clip_value,
-            batch_size_scale=batch_size_scale)
+            batch_size_scale=batch_size_scale,
+            profiler=profiler)
 
         validate(
             metric=val_metric,
@@ -876,7 +910,12 @@ def main():
         batch_size_scale=args.batch_size_scale,
         val_metric=get_composite_metric(ds_metainfo.val_metric_names, ds_metainfo.val_metric_extra_kwargs),
         train_metric=get_composite_metric(ds_metainfo.train_metric_names, ds_metainfo.train_metric_extra_kwargs),
-        ctx=ctx)
+        ctx=ctx,
+        profiler=TrainStepProfiler(
+            enabled=args.profile_steps,
+            window_size=args.profile_window,
+            sync_fn=mx.nd.waitall,
+            stall_ratio=args.profile_stall_ratio))
 
 
 if __name__ == "__main__":
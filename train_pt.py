@@ -7,6 +7,7 @@ import time
 import logging
 import argparse
 import random
+from contextlib import contextmanager
 import numpy as np
 
 import torch.nn as nn
@@ -15,8 +16,11 @@ import torch.utils.data
 
 from common.logger_utils import initialize_logging
 from common.train_log_param_saver import TrainLogParamSaver
+from common.train_step_profiler import TrainStepProfiler
 from pytorch.utils import prepare_pt_context, prepare_model, validate
 from pytorch.utils import report_accuracy, get_composite_metric, get_metric_name
+from pytorch.model_ema import ModelEma
+from pytorch.activation_checkpointing import enable_checkpointing
 
 from pytorch.dataset_utils import get_dataset_metainfo
 from pytorch.dataset_utils import get_train_data_source, get_val_data_source
@@ -73,7 +77,7 @@ def add_train_cls_parser_arguments(parser):
         "--batch-size-scale",
         type=int,
         default=1,
-        help="manual batch-size increasing factor")
+        help="manual batch-size increasing factor (number of gradient accumulation steps)")
     parser.add_argument(
         "--num-epochs",
         type=int,
@@ -180,6 +184,22 @@ def add_train_cls_parser_arguments(parser):
         action="store_true",
         help="use label smoothing")
 
+    parser.add_argument(
+        "--checkpoint-segments",
+        type=int,
+        default=0,
+        help="number of activation checkpointing segments per model stage. default is 0 to disable")
+    parser.add_argument(
+        "--ema-decay",
+        type=float,
+        default=0.0,
+        help="decay rate for exponential moving average of model weights. default is 0 to disable")
+    parser.add_argument(
+        "--ema-update-period",
+        type=int,
+        default=1,
+        help="number of training steps between updates of exponential moving average of model weights")
+
     parser.add_argument(
         "--mixup",
         action="store_true",
@@ -195,6 +215,35 @@ def add_train_cls_parser_arguments(parser):
         type=int,
         default=50,
         help="number of batches to wait before logging")
+    parser.add_argument(
+        "--profile-steps",
+        action="store_true",
+        help="enable step-level profiling (data wait, H2D copy, forward, backward, optimizer, metric)")
+    parser.add_argument(
+        "--profile-window",
+        type=int,
+        default=200,
+        help="number of the last steps for rolling percentiles of step profiler")
+    parser.add_argument(
+        "--profile-stall-ratio",
+        type=float,
+        default=0.3,
+        help="share of step time spent waiting for data that is reported as data stall")
+    parser.add_argument(
+        "--profile-trace-dir",
+        type=str,
+        default="",
+        help="directory for torch.profiler trace of a window of steps (disabled if empty)")
+    parser.add_argument(
+        "--profile-trace-start",
+        type=int,
+        default=10,
+        help="number of steps to skip before torch.profiler trace recording")
+    parser.add_argument(
+        "--profile-trace-steps",
+        type=int,
+        default=5,
+        help="number of steps recorded in torch.profiler trace")
     parser.add_argument(
         "--save-interval",
         type=int,
@@ -397,6 +446,64 @@ def prepare_trainer(net,
     return optimizer, lr_scheduler, start_epoch
 
 
+def prepare_step_profiler(enabled,
+                          window_size,
+                          stall_ratio,
+                          trace_dir_path,
+                          trace_start,
+                          trace_steps,
+                          use_cuda):
+    """
+    Prepare step-level profiler.
+
+    Parameters:
+    ----------
+    enabled : bool
+        Whether to profile training steps.
+    window_size : int
+        Number of the last steps for rolling percentiles.
+    stall_ratio : float
+        Share of step time spent waiting for data that is reported as data stall.
+    trace_dir_path : str
+        Directory for torch.profiler trace (disabled if empty).
+    trace_start : int
+        Number of steps to skip before trace recording.
+    trace_steps : int
+        Number of steps recorded in trace.
+    use_cuda : bool
+        Whether to use CUDA.
+
+    Returns
+    -------
+    TrainStepProfiler
+        Step profiler.
+    profile or None
+        torch.profiler instance (should be entered before training).
+    """
+    torch_profiler = None
+    step_callbacks = None
+    if enabled and trace_dir_path:
+        activities = [torch.profiler.ProfilerActivity.CPU]
+        if use_cuda:
+            activities.append(torch.profiler.ProfilerActivity.CUDA)
+        torch_profiler = torch.profiler.profile(
+            activities=activities,
+            schedule=torch.profiler.schedule(
+                wait=max(0, trace_start - 1),
+                warmup=min(1, trace_start),
+                active=trace_steps,
+                repeat=1),
+            on_trace_ready=torch.profiler.tensorboard_trace_handler(trace_dir_path))
+        step_callbacks = [torch_profiler.step]
+    profiler = TrainStepProfiler(
+        enabled=enabled,
+        window_size=window_size,
+        sync_fn=(torch.cuda.synchronize if use_cuda else None),
+        stall_ratio=stall_ratio,
+        step_callbacks=step_callbacks)
+    return profiler, torch_profiler
+
+
 def save_params(file_stem,
                 state):
     """
@@ -414,11 +521,36 @@ def save_params(file_stem,
     torch.save(
         obj=state["state_dict"],
         f=(file_stem + ".pth"))
+    if "ema_state_dict" in state:
+        torch.save(
+            obj=state["ema_state_dict"],
+            f=(file_stem + ".ema.pth"))
     torch.save(
         obj=state,
         f=(file_stem + ".states"))
 
 
+@contextmanager
+def grad_sync_context(net,
+                      sync):
+    """
+    Context for forward/backward pass of a micro-batch. If gradients shouldn't be synchronized and the model is
+    wrapped by `DistributedDataParallel`, gradient all-reduce is skipped.
+
+    Parameters:
+    ----------
+    net : Module
+        Model.
+    sync : bool
+        Whether to synchronize gradients.
+    """
+    if (not sync) and hasattr(net, "no_sync"):
+        with net.no_sync():
+            yield
+    else:
+        yield
+
+
 def train_epoch(epoch,
                 net,
                 train_metric,
@@ -428,7 +560,10 @@ def train_epoch(epoch,
                 optimizer,
                 # lr_scheduler,
                 batch_size,
-                log_interval):
+                batch_size_scale,
+                log_interval,
+                profiler,
+                ema):
     """
     Train model on particular epoch.
 
@@ -450,8 +585,14 @@ def train_epoch(epoch,
         Optimizer.
     batch_size : int
         Training batch size.
+    batch_size_scale : int
+        Manual batch-size increasing factor (number of gradient accumulation steps).
     log_interval : int
         Batch count period for logging.
+    profiler : TrainStepProfiler
+        Step-level profiler.
+    ema : ModelEma or None
+        EMA of model weights.
 
     Returns
     -------
@@ -463,33 +604,63 @@ def train_epoch(epoch,
     train_metric.reset()
     train_loss = 0.0
 
+    num_batches = len(train_data)
+    optimizer.zero_grad()
+
     btic = time.time()
-    for i, (data, target) in enumerate(train_data):
+    for i, (data, target) in enumerate(profiler.wrap(train_data)):
         if use_cuda:
             data = data.cuda(non_blocking=True)
             target = target.cuda(non_blocking=True)
-        output = net(data)
-        loss = L(output, target)
-        optimizer.zero_grad()
-        loss.backward()
-        optimizer.step()
+        profiler.mark("h2d")
+        num_accumulated = (i % batch_size_scale) + 1
+        do_step = (num_accumulated == batch_size_scale) or (i + 1 == num_batches)
+        with grad_sync_context(net, sync=do_step):
+            output = net(data)
+            loss = L(output, target)
+            profiler.mark("forward")
+            if batch_size_scale == 1:
+                loss.backward()
+            else:
+                (loss / batch_size_scale).backward()
+        profiler.mark("backward")
+        if do_step:
+            if num_accumulated != batch_size_scale:
+                for param in net.parameters():
+                    if param.grad is not None:
+                        param.grad.mul_(float(batch_size_scale) / num_accumulated)
+            optimizer.step()
+            optimizer.zero_grad()
+            if ema is not None:
+                ema.update()
+        profiler.mark("optimizer")
 
         train_loss += loss.item()
 
         train_metric.update(
             labels=target,
             preds=output)
+        profiler.mark("metric")
 
         if log_interval and not (i + 1) % log_interval:
             speed = batch_size * log_interval / (time.time() - btic)
             btic = time.time()
             train_accuracy_msg = report_accuracy(metric=train_metric)
-            logging.info("Epoch[{}] Batch [{}]\tSpeed: {:.2f} samples/sec\t{}\tlr={:.5f}".format(
-                epoch + 1, i, speed, train_accuracy_msg, optimizer.param_groups[0]["lr"]))
+            if batch_size_scale == 1:
+                logging.info("Epoch[{}] Batch [{}]\tSpeed: {:.2f} samples/sec\t{}\tlr={:.5f}".format(
+                    epoch + 1, i, speed, train_accuracy_msg, optimizer.param_groups[0]["lr"]))
+            else:
+                logging.info("Epoch[{}] Batch [{}]\tSpeed: {:.2f} samples/sec ({:.3f} effective batches/sec)\t{}\t"
+                             "lr={:.5f}".format(epoch + 1, i, speed, speed / (batch_size * batch_size_scale),
+                                                train_accuracy_msg, optimizer.param_groups[0]["lr"]))
+            if profiler.enabled:
+                logging.info("Epoch[{}] Batch [{}]\t{}".format(epoch + 1, i, profiler.report()))
 
     throughput = int(batch_size * (i + 1) / (time.time() - tic))
     logging.info("[Epoch {}] speed: {:.2f} samples/sec\ttime cost: {:.2f} sec".format(
         epoch + 1, throughput, time.time() - tic))
+    if profiler.enabled:
+        logging.info("[Epoch {}] {}".format(epoch + 1, profiler.report()))
 
     train_loss /= (i + 1)
     train_accuracy_msg = report_accuracy(metric=train_metric)
@@ -500,6 +671,7 @@ def train_epoch(epoch,
 
 
 def train_net(batch_size,
+              batch_size_scale,
               num_epochs,
               start_epoch1,
               train_data,
@@ -512,7 +684,9 @@ def train_net(batch_size,
               num_classes,
               val_metric,
               train_metric,
-              use_cuda):
+              use_cuda,
+              profiler=None,
+              ema=None):
     """
     Main procedure for training model.
 
@@ -520,6 +694,8 @@ def train_net(batch_size,
     ----------
     batch_size : int
         Training batch size.
+    batch_size_scale : int
+        Manual batch-size increasing factor (number of gradient accumulation steps).
     num_epochs : int
         Number of training epochs.
     start_epoch1 : int
@@ -546,8 +722,18 @@ def train_net(batch_size,
         Metric object instance (training subset).
     use_cuda : bool
         Whether to use CUDA.
+    profiler : TrainStepProfiler or None, default None
+        Step-level profiler.
+    ema : ModelEma or None, default None
+        EMA of model weights.
     """
     assert (num_classes > 0)
+    if profiler is None:
+        profiler = TrainStepProfiler(enabled=False)
+    assert (batch_size_scale >= 1)
+    if batch_size_scale != 1:
+        logging.info("Gradient accumulation: {} micro-batches of {} samples, effective batch size is {}".format(
+            batch_size_scale, batch_size, batch_size * batch_size_scale))
 
     L = nn.CrossEntropyLoss()
     if use_cuda:
@@ -579,7 +765,20 @@ def train_net(batch_size,
             optimizer=optimizer,
             # lr_scheduler,
             batch_size=batch_size,
-            log_interval=log_interval)
+            batch_size_scale=batch_size_scale,
+            log_interval=log_interval,
+            profiler=profiler,
+            ema=ema)
+
+        if ema is not None:
+            validate(
+                metric=val_metric,
+                net=net,
+                val_data=val_data,
+                use_cuda=use_cuda,
+                ema=ema)
+            val_accuracy_msg = report_accuracy(metric=val_metric)
+            logging.info("[Epoch {}] validation (EMA): {}".format(epoch + 1, val_accuracy_msg))
 
         validate(
             metric=val_metric,
@@ -595,6 +794,8 @@ def train_net(batch_size,
                 "state_dict": net.state_dict(),
                 "optimizer": optimizer.state_dict(),
             }
+            if ema is not None:
+                state["ema_state_dict"] = ema.state_dict()
             lp_saver_kwargs = {"state": state}
             val_acc_values = val_metric.get()[1]
             train_acc_values = train_metric.get()[1]
@@ -638,6 +839,10 @@ def main():
     real_net = net.module if hasattr(net, "module") else net
     assert (hasattr(real_net, "num_classes"))
     num_classes = real_net.num_classes
+    if args.checkpoint_segments > 0:
+        enable_checkpointing(
+            net=real_net,
+            segments=args.checkpoint_segments)
 
     ds_metainfo = get_dataset_metainfo(dataset_name=args.dataset)
     ds_metainfo.update(args=args)
@@ -664,6 +869,18 @@ def main():
         num_epochs=args.num_epochs,
         state_file_path=args.resume_state)
 
+    if args.ema_decay > 0.0:
+        ema = ModelEma(
+            net=net,
+            decay=args.ema_decay,
+            update_period=args.ema_update_period)
+        if args.resume_state:
+            checkpoint = torch.load(args.resume_state)
+            if (type(checkpoint) == dict) and ("ema_state_dict" in checkpoint):
+                ema.load_state_dict(checkpoint["ema_state_dict"])
+    else:
+        ema = None
+
     if args.save_dir and args.save_interval:
         param_names = ds_metainfo.val_metric_capts + ds_metainfo.train_metric_capts + ["Train.Loss", "LR"]
         lp_saver = TrainLogParamSaver(
@@ -675,7 +892,7 @@ def main():
             last_checkpoint_file_count=2,
             best_checkpoint_file_count=2,
             checkpoint_file_save_callback=save_params,
-            checkpoint_file_exts=(".pth", ".states"),
+            checkpoint_file_exts=((".pth", ".states") if ema is None else (".pth", ".ema.pth", ".states")),
             save_interval=args.save_interval,
             num_epochs=args.num_epochs,
             param_names=param_names,
@@ -688,8 +905,20 @@ def main():
     else:
         lp_saver = None
 
+    profiler, torch_profiler = prepare_step_profiler(
+        enabled=args.profile_steps,
+        window_size=args.profile_window,
+        stall_ratio=args.profile_stall_ratio,
+        trace_dir_path=args.profile_trace_dir,
+        trace_start=args.profile_trace_start,
+        trace_steps=args.profile_trace_steps,
+        use_cuda=use_cuda)
+    if torch_profiler is not None:
+        torch_profiler.start()
+
     train_net(
         batch_size=batch_size,
+        batch_size_scale=args.batch_size_scale,
         num_epochs=args.num_epochs,
         start_epoch1=args.start_epoch,
         train_data=train_data,
@@ -702,7 +931,12 @@ def main():
         num_classes=num_classes,
         val_metric=get_composite_metric(ds_metainfo.val_metric_names, ds_metainfo.val_metric_extra_kwargs),
         train_metric=get_composite_metric(ds_metainfo.train_metric_names, ds_metainfo.train_metric_extra_kwargs),
-        use_cuda=use_cuda)
+        use_cuda=use_cuda,
+        profiler=profiler,
+        ema=ema)
+
+    if torch_profiler is not None:
+        torch_profiler.stop()
 
 
 if __name__ == "__main__":
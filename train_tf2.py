@@ -10,7 +10,9 @@ import random
 import tensorflow as tf
 from common.logger_utils import initialize_logging
 from tensorflow2.tf2cv.model_provider import get_model
+from tensorflow2.compiled_steps import ShapeBucketer, get_eval_step, get_train_step
 from tensorflow2.dataset_utils import get_dataset_metainfo, get_train_data_source, get_val_data_source
+from tensorflow2.dataset_utils import get_train_data_pipeline, get_val_data_pipeline
 
 
 def add_train_cls_parser_arguments(parser):
@@ -54,6 +56,39 @@ def add_train_cls_parser_arguments(parser):
         default=4,
         type=int,
         help="number of preprocessing workers")
+    parser.add_argument(
+        "--use-tfdata",
+        action="store_true",
+        help="use tf.data pipeline instead of Keras generators")
+    parser.add_argument(
+        "--tfdata-cache-mode",
+        type=str,
+        default="",
+        help="caching of decoded samples in tf.data pipeline. options are memory, disk, and snapshot")
+    parser.add_argument(
+        "--tfdata-cache-dir",
+        type=str,
+        default="",
+        help="directory for disk/snapshot cache of tf.data pipeline")
+    parser.add_argument(
+        "--jit-compile",
+        action="store_true",
+        help="compile step functions with XLA")
+    parser.add_argument(
+        "--spatial-bucket",
+        type=int,
+        default=0,
+        help="bucket multiple for padding of spatial input dimensions in compiled steps (0 for no padding)")
+    parser.add_argument(
+        "--num-shards",
+        type=int,
+        default=1,
+        help="number of data shards (workers) for tf.data pipeline")
+    parser.add_argument(
+        "--shard-index",
+        type=int,
+        default=0,
+        help="index of data shard for this worker")
 
     parser.add_argument(
         "--batch-size",
@@ -230,22 +265,45 @@ def main():
     test_loss = tf.keras.metrics.Mean(name="test_loss")
     test_accuracy = tf.keras.metrics.SparseCategoricalAccuracy(name="test_accuracy")
 
-    @tf.function
-    def train_step(images, labels):
-        with tf.GradientTape() as tape:
+    if args.jit_compile:
+        bucketer = ShapeBucketer(
+            batch_size=args.batch_size,
+            spatial_multiple=args.spatial_bucket,
+            data_format=data_format)
+        compiled_train_step = get_train_step(
+            net=net,
+            optimizer=optimizer,
+            bucketer=bucketer)
+        compiled_eval_step = get_eval_step(
+            net=net,
+            bucketer=bucketer)
+
+        def train_step(images, labels):
+            loss, predictions = compiled_train_step(images, labels)
+            train_loss(loss)
+            train_accuracy(labels, predictions)
+
+        def test_step(images, labels):
+            predictions = compiled_eval_step(images)
+            test_loss(loss_object(labels, predictions))
+            test_accuracy(labels, predictions)
+    else:
+        @tf.function
+        def train_step(images, labels):
+            with tf.GradientTape() as tape:
+                predictions = net(images)
+                loss = loss_object(labels, predictions)
+            gradients = tape.gradient(loss, net.trainable_variables)
+            optimizer.apply_gradients(zip(gradients, net.trainable_variables))
+            train_loss(loss)
+            train_accuracy(labels, predictions)
+
+        @tf.function
+        def test_step(images, labels):
             predictions = net(images)
-            loss = loss_object(labels, predictions)
-        gradients = tape.gradient(loss, net.trainable_variables)
-        optimizer.apply_gradients(zip(gradients, net.trainable_variables))
-        train_loss(loss)
-        train_accuracy(labels, predictions)
-
-    @tf.function
-    def test_step(images, labels):
-        predictions = net(images)
-        t_loss = loss_object(labels, predictions)
-        test_loss(t_loss)
-        test_accuracy(labels, predictions)
+            t_loss = loss_object(labels, predictions)
+            test_loss(t_loss)
+            test_accuracy(labels, predictions)
 
     ds_metainfo = get_dataset_metainfo(dataset_name=args.dataset)
     ds_metainfo.update(args=args)
@@ -254,14 +312,31 @@ def main():
 
     batch_size = args.batch_size
 
-    train_data, train_img_count = get_train_data_source(
-        ds_metainfo=ds_metainfo,
-        batch_size=batch_size,
-        data_format=data_format)
-    val_data, val_img_count = get_val_data_source(
-        ds_metainfo=ds_metainfo,
-        batch_size=batch_size,
-        data_format=data_format)
+    if args.use_tfdata:
+        train_data, train_img_count = get_train_data_pipeline(
+            ds_metainfo=ds_metainfo,
+            batch_size=batch_size,
+            data_format=data_format,
+            cache_mode=args.tfdata_cache_mode,
+            cache_dir=args.tfdata_cache_dir,
+            num_shards=args.num_shards,
+            shard_index=args.shard_index,
+            seed=args.seed)
+        val_data, val_img_count = get_val_data_pipeline(
+            ds_metainfo=ds_metainfo,
+            batch_size=batch_size,
+            data_format=data_format,
+            cache_mode=args.tfdata_cache_mode,
+            cache_dir=args.tfdata_cache_dir)
+    else:
+        train_data, train_img_count = get_train_data_source(
+            ds_metainfo=ds_metainfo,
+            batch_size=batch_size,
+            data_format=data_format)
+        val_data, val_img_count = get_val_data_source(
+            ds_metainfo=ds_metainfo,
+            batch_size=batch_size,
+            data_format=data_format)
 
     num_epochs = args.num_epochs
     for epoch in range(num_epochs):
@@ -273,6 +348,10 @@ def main():
             test_step(test_images, test_labels)
             # break
 
+        if args.jit_compile:
+            logging.info("Step traces: train {}, eval {}".format(
+                compiled_train_step.compiled_step.num_traces, compiled_eval_step.compiled_step.num_traces))
+
         template = "Epoch {}, Loss: {}, Accuracy: {}, Test Loss: {}, Test Accuracy: {}"
         logging.info(template.format(
             epoch + 1,